@@ -1,19 +1,41 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
-import sqlite3
-import os
-from datetime import datetime
-
-# Grade to GPA mapping
-grade_points = {
-    "A+": 4.0, "A": 4.0, "A-": 3.7, "B+": 3.3, "B": 3.0, "B-": 2.7,
-    "C+": 2.3, "C": 2.0, "C-": 1.7, "D+": 1.3, "D": 1.1,
-    "D-": 1.0, "F": 0.0
-}
+import argparse
+
+from gpa.aggregates import TermTotals, overlay_courses
+from gpa.db import delete_courses, upsert_courses
+from gpa.scales import ScaleCache, active_scale
+from gpa.scheduler import RecalcScheduler
+from gpa.snapshots import term_snapshot
+from gpa.startup import BackgroundLoader, StartupProfile
+from gpa.grades import SEMESTERS, YEARS, grade_points
+from gpa.grid import CourseGrid
+from gpa.history import HistoryWindow
+from gpa.instrument import Instrumentation, PerfOverlay
+from gpa.maintenance import MaintenanceScheduler
+from gpa.planner import PlannerDialog
+from gpa.profiles import DEFAULT_STUDENT, open_store
 
 class GPACalculator:
-    def __init__(self, root):
+    # Debounce window for live GPA updates, in milliseconds
+    RECALC_DELAY_MS = 150
+    # UI paths timed when instrumentation is enabled
+    INSTRUMENTED_METHODS = [
+        "refresh_course_display", "load_current_data", "add_course_row",
+        "remove_course_row", "snapshot_gpa_inputs", "compute_gpa_summary",
+        "show_gpa_summary", "save_data", "calculate_and_save_gpa", "view_all_records",
+        "undo_edit", "redo_edit", "switch_student",
+    ]
+
+    def __init__(self, root, profile=None, instrumentation=None, store=None, student_id=None,
+                 maintenance=True):
         self.root = root
+        self.profile = profile or StartupProfile()
+        self.instrumentation = instrumentation
+        if instrumentation is not None:
+            # Before any widget captures these methods as callbacks
+            instrumentation.instrument_methods(self, self.INSTRUMENTED_METHODS)
+            self.root.bind("<F12>", self.show_perf_overlay)
         self.root.title("Advanced Multi-Year GPA Calculator")
         self.root.geometry("800x700")
         self.root.config(bg="#f0f0f0")
@@ -21,47 +43,83 @@ class GPACalculator:
         self.dark_mode = False
         self.current_year = "Year 1"
         self.current_semester = "Semester 1"
-        self.entries = []
-        
-        # Initialize database
-        self.init_database()
-        
-        self.create_widgets()
-        self.load_current_data()
+        # Saved (grade, credits, points) per course name for the displayed term
+        self.saved_courses = {}
+        # Where profiles live (one file or one shard per student) and whose is shown
+        self.store = store or open_store()
+        self.student_id = student_id or DEFAULT_STUDENT
+        self.db_path = None
+        self.maintenance_enabled = maintenance
+        self.maintenance = None
+        # Set once the database is open; actions stay disabled until then
+        self.conn = None
+        self.action_buttons = []
+        
+        # Paint the window first; the database is opened in the background
+        with self.profile.phase("create widgets"):
+            self.create_widgets()
+        # Undo/redo of table edits; each step touches only the affected row
+        self.root.bind("<Control-z>", self.undo_edit)
+        self.root.bind("<Control-y>", self.redo_edit)
+        self.root.bind("<Control-Z>", self.redo_edit)
+        self.root.bind("<Map>", self.on_first_map, add="+")
+        self.loader = BackgroundLoader(self.root, self.init_database, self.finish_startup)
+
+    def on_first_map(self, event=None):
+        if event is None or event.widget is self.root:
+            self.root.unbind("<Map>")
+            self.profile.mark("window mapped")
 
     def init_database(self):
-        """Initialize SQLite database"""
-        self.conn = sqlite3.connect('data.db')
+        """Open and migrate the database and read the first term (loader thread)"""
+        profile = self.profile
+        student_id = self.student_id
+        # Opening also creates or upgrades tables and indexes; a no-op unless
+        # the schema changed.  Handed over to the Tk thread afterwards.
+        with profile.phase("connect"):
+            conn = self.store.connect(student_id, check_same_thread=False)
+        with profile.phase("load profiles"):
+            self.store.add_profile(student_id, conn)
+            profiles = self.store.profiles(conn)
+        with profile.phase("load totals"):
+            totals = TermTotals(conn.cursor(), student_id)
+            # New grades are entered and scored under the active grading scale
+            scale = active_scale(conn)
+        with profile.phase("load term"):
+            term = (self.current_year, self.current_semester)
+            courses, saved = self.read_saved_courses(conn, student_id, *term)
+        return conn, profiles, totals, scale, term, courses, saved
+
+    def finish_startup(self, result):
+        """Adopt the loader's results on the Tk thread and enable the window"""
+        self.conn, profiles, self.totals, self.scale, term, courses, saved = result
         self.cursor = self.conn.cursor()
-        
-        # Create tables
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS courses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id TEXT DEFAULT 'default_student',
-                year TEXT NOT NULL,
-                semester TEXT NOT NULL,
-                course_name TEXT NOT NULL,
-                grade TEXT NOT NULL,
-                credits REAL NOT NULL,
-                date_added TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS gpa_records (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                student_id TEXT DEFAULT 'default_student',
-                year TEXT NOT NULL,
-                semester TEXT NOT NULL,
-                semester_gpa REAL NOT NULL,
-                cumulative_gpa REAL NOT NULL,
-                total_credits REAL NOT NULL,
-                date_calculated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        self.conn.commit()
+        self.db_path = self.store.database_for(self.student_id)
+        self.course_grid.set_grade_values(self.scale.grades)
+        self.known_students = set(profiles)
+        self.student_combo.config(values=profiles)
+        
+        # Live GPA labels are recalculated off the Tk thread after edits settle
+        self.recalc = self.create_recalc_scheduler()
+        if self.maintenance_enabled:
+            # Dedup, ANALYZE, vacuum and backup on a worker once the window sits idle
+            self.maintenance = MaintenanceScheduler(self.root, self.db_path)
+        for button in self.action_buttons:
+            button.config(state="normal")
+        
+        if term == (self.current_year, self.current_semester):
+            self.saved_courses = saved
+            self.show_courses(courses)
+        else:
+            # The term was changed while loading
+            self.load_current_data()
+        self.profile.mark("ready")
+        self.profile.report()
+
+    def create_recalc_scheduler(self):
+        return RecalcScheduler(self.root, self.db_path, self.snapshot_gpa_inputs,
+                               self.compute_gpa_summary, self.show_gpa_summary,
+                               delay_ms=self.RECALC_DELAY_MS)
 
     def create_widgets(self):
         # Title
@@ -78,7 +136,7 @@ class GPACalculator:
         
         self.year_var = tk.StringVar(value=self.current_year)
         self.year_combo = ttk.Combobox(selection_frame, textvariable=self.year_var, 
-                                      values=["Year 1", "Year 2", "Year 3", "Year 4", "Year 5"], 
+                                      values=YEARS, 
                                       width=10)
         self.year_combo.grid(row=0, column=1, padx=5)
         self.year_combo.bind("<<ComboboxSelected>>", self.on_year_semester_change)
@@ -88,10 +146,21 @@ class GPACalculator:
         
         self.semester_var = tk.StringVar(value=self.current_semester)
         self.semester_combo = ttk.Combobox(selection_frame, textvariable=self.semester_var,
-                                          values=["Semester 1", "Semester 2", "Summer"], 
+                                          values=SEMESTERS, 
                                           width=12)
         self.semester_combo.grid(row=0, column=3, padx=5)
         self.semester_combo.bind("<<ComboboxSelected>>", self.on_year_semester_change)
+        
+        tk.Label(selection_frame, text="Student:", font=("Arial", 12, "bold"), 
+                bg="#f0f0f0").grid(row=0, column=4, padx=5)
+        
+        # Pick a profile, or type a new student id and press Enter
+        self.student_var = tk.StringVar(value=self.student_id)
+        self.student_combo = ttk.Combobox(selection_frame, textvariable=self.student_var,
+                                          width=18)
+        self.student_combo.grid(row=0, column=5, padx=5)
+        self.student_combo.bind("<<ComboboxSelected>>", self.switch_student)
+        self.student_combo.bind("<Return>", self.switch_student)
 
         # Table Headers
         header_frame = tk.Frame(self.root, bg="#f0f0f0")
@@ -105,26 +174,15 @@ class GPACalculator:
         tk.Label(header_frame, text="Action", font=("Arial", 12, "bold"), 
                 width=8, bg="#f0f0f0").grid(row=0, column=3, padx=2)
         
-        # Courses Container with Scrollbar
+        # Courses Container: only visible rows get widgets
         canvas_frame = tk.Frame(self.root, bg="#f0f0f0")
         canvas_frame.pack(pady=5, fill=tk.BOTH, expand=True)
         
-        self.canvas = tk.Canvas(canvas_frame, bg="#f0f0f0", height=200)
-        scrollbar = ttk.Scrollbar(canvas_frame, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = tk.Frame(self.canvas, bg="#f0f0f0")
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
-        
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-        
-        self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        
-        self.course_frame = self.scrollable_frame
+        # Grades of the active scale replace these once the database is open
+        self.course_grid = CourseGrid(canvas_frame, grade_values=list(grade_points),
+                                      on_change=self.calculate_current_gpa,
+                                      on_delete=self.remove_course_row)
+        self.course_grid.frame.pack(fill="both", expand=True)
 
         # Current Semester GPA Display
         gpa_frame = tk.Frame(self.root, bg="#f0f0f0")
@@ -142,255 +200,202 @@ class GPACalculator:
         button_frame = tk.Frame(self.root, bg="#f0f0f0")
         button_frame.pack(pady=15)
 
-        tk.Button(button_frame, text="Add Course", command=self.add_course_row, 
-                 bg="lightblue", font=("Arial", 10)).grid(row=0, column=0, padx=5)
-        tk.Button(button_frame, text="Save Data", command=self.save_data, 
-                 bg="lightgreen", font=("Arial", 10)).grid(row=0, column=1, padx=5)
-        tk.Button(button_frame, text="View All Records", command=self.view_all_records, 
-                 bg="lightyellow", font=("Arial", 10)).grid(row=0, column=2, padx=5)
-        tk.Button(button_frame, text="Calculate GPA", command=self.calculate_and_save_gpa, 
-                 bg="lightcoral", font=("Arial", 10)).grid(row=0, column=3, padx=5)
+        buttons = [
+            ("Add Course", self.add_course_row, "lightblue"),
+            ("Save Data", self.save_data, "lightgreen"),
+            ("View All Records", self.view_all_records, "lightyellow"),
+            ("Calculate GPA", self.calculate_and_save_gpa, "lightcoral"),
+        ]
+        for column, (text, command, color) in enumerate(buttons):
+            button = tk.Button(button_frame, text=text, command=command, bg=color,
+                               font=("Arial", 10), state="disabled")
+            button.grid(row=0, column=column, padx=5)
+            self.action_buttons.append(button)
         tk.Button(button_frame, text="Toggle Dark Mode", command=self.toggle_theme, 
                  bg="gray", font=("Arial", 10)).grid(row=0, column=4, padx=5)
+        plan_button = tk.Button(button_frame, text="Plan Target GPA", command=self.plan_target_gpa, 
+                                bg="plum", font=("Arial", 10), state="disabled")
+        plan_button.grid(row=0, column=5, padx=5)
+        self.action_buttons.append(plan_button)
 
         # Statistics Frame
         stats_frame = tk.Frame(self.root, bg="#f0f0f0")
         stats_frame.pack(pady=10)
         
-        self.stats_label = tk.Label(stats_frame, text="Total Credits Completed: 0", 
+        self.stats_label = tk.Label(stats_frame, text="Loading saved courses...", 
                                    font=("Arial", 12), bg="#f0f0f0")
         self.stats_label.pack()
 
     def add_course_row(self, course="", grade="A", credits=""):
-        row = len(self.entries)
-        
-        course_name = tk.Entry(self.course_frame, width=25, font=("Arial", 10))
-        course_name.grid(row=row, column=0, padx=2, pady=2)
-        course_name.insert(0, course)
-
-        grade_var = tk.StringVar(value=grade)
-        grade_dropdown = ttk.Combobox(self.course_frame, textvariable=grade_var, 
-                                     values=list(grade_points.keys()), width=8)
-        grade_dropdown.grid(row=row, column=1, padx=2, pady=2)
-
-        credits_entry = tk.Entry(self.course_frame, width=8, font=("Arial", 10))
-        credits_entry.grid(row=row, column=2, padx=2, pady=2)
-        credits_entry.insert(0, credits)
-
-        delete_button = tk.Button(self.course_frame, text="Delete", 
-                                 command=lambda: self.remove_course_row(row), 
-                                 bg="red", fg="white", font=("Arial", 8))
-        delete_button.grid(row=row, column=3, padx=2, pady=2)
-
-        self.entries.append((course_name, grade_var, credits_entry, delete_button))
-        
-        # Bind events for real-time calculation
-        grade_var.trace("w", lambda *args: self.calculate_current_gpa())
-        credits_entry.bind("<KeyRelease>", lambda event: self.calculate_current_gpa())
-        
-        # Update canvas scroll region
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        self.course_grid.append(course, grade, credits)
 
     def remove_course_row(self, index):
-        if index < len(self.entries):
-            # Remove widgets
-            for widget in self.entries[index]:
-                if hasattr(widget, 'destroy'):
-                    widget.destroy()
-            
-            # Remove from list
-            self.entries.pop(index)
-            
-            # Refresh the display
-            self.refresh_course_display()
+        if index < len(self.course_grid.rows):
+            # Drop the row from the model; visible slots are rebound in place
+            self.course_grid.delete(index)
             self.calculate_current_gpa()
 
+    def undo_edit(self, event=None):
+        self.course_grid.undo()
+        return "break"
+
+    def redo_edit(self, event=None):
+        self.course_grid.redo()
+        return "break"
+
     def refresh_course_display(self):
-        # Clear all entries
-        for entry_set in self.entries:
-            for widget in entry_set:
-                if hasattr(widget, 'destroy'):
-                    widget.destroy()
-        
-        # Recreate entries
-        course_data = []
-        for course_name, grade_var, credits_entry, _ in self.entries:
-            course_data.append((course_name.get(), grade_var.get(), credits_entry.get()))
-        
-        self.entries.clear()
-        
-        for course, grade, credits in course_data:
-            self.add_course_row(course, grade, credits)
+        self.course_grid.render()
 
     def on_year_semester_change(self, event=None):
         self.current_year = self.year_var.get()
         self.current_semester = self.semester_var.get()
+        if self.conn is not None:
+            self.load_current_data()
+
+    def switch_student(self, event=None):
+        """Show another profile; unsaved edits on screen are discarded like a term change"""
+        student_id = self.student_var.get().strip()
+        if not student_id or student_id == self.student_id or self.conn is None:
+            return
+        
+        db_path = self.store.database_for(student_id)
+        if db_path != self.db_path:
+            # Sharded layout: each profile has its own file and connection
+            self.recalc.close()
+            self.conn.close()
+            self.conn = self.store.connect(student_id)
+            self.cursor = self.conn.cursor()
+            self.db_path = db_path
+            if self.maintenance is not None:
+                self.maintenance.db_path = db_path
+            self.scale = active_scale(self.conn)
+            self.course_grid.set_grade_values(self.scale.grades)
+            self.recalc = self.create_recalc_scheduler()
+        
+        if student_id not in self.known_students:
+            self.store.add_profile(student_id, self.conn)
+            self.known_students.add(student_id)
+            self.student_combo.config(values=sorted(self.known_students))
+        self.student_id = student_id
+        self.totals = TermTotals(self.cursor, student_id)
         self.load_current_data()
 
     def calculate_current_gpa(self):
+        # Coalesce bursts of edits; the sums run on the recalc worker thread
+        self.recalc.schedule()
+
+    def snapshot_gpa_inputs(self):
+        """Capture what the worker needs from the widgets (runs on the Tk thread)"""
         total_credits = 0
         total_points = 0
 
-        for course_name, grade_var, credits_entry, _ in self.entries:
-            grade = grade_var.get()
+        for _, grade, credits_text in self.course_grid.rows:
             try:
-                credits = float(credits_entry.get()) if credits_entry.get() else 0
+                credits = float(credits_text) if credits_text else 0
             except ValueError:
                 continue
 
             if credits > 0:
                 total_credits += credits
-                total_points += grade_points.get(grade, 0) * credits
-
-        if total_credits == 0:
-            semester_gpa = 0.00
-        else:
-            semester_gpa = total_points / total_credits
+                total_points += self.scale.quality_points(grade, credits)
 
-        self.semester_gpa_label.config(text=f"Current Semester GPA: {semester_gpa:.2f}")
-        
-        # Calculate cumulative GPA
-        self.calculate_cumulative_gpa()
-        
-        # Update statistics
-        total_completed_credits = self.get_total_completed_credits()
-        self.stats_label.config(text=f"Total Credits Completed: {total_completed_credits:.1f}")
+        on_screen = {course: (grade, credits) for course, grade, credits in self.collect_courses()}
+        # Every row's name, as save_data uses to find deleted courses
+        names = self.row_names()
+        return (self.student_id, (total_credits, total_points), on_screen, names,
+                dict(self.saved_courses))
 
-    def calculate_cumulative_gpa(self):
-        # Get all courses from database
-        self.cursor.execute('''
-            SELECT grade, credits FROM courses 
-            WHERE student_id = 'default_student'
-        ''')
-        
-        all_courses = self.cursor.fetchall()
-        
-        # Add current semester courses if they have valid data
-        current_courses = []
-        for course_name, grade_var, credits_entry, _ in self.entries:
-            course = course_name.get().strip()
-            grade = grade_var.get()
-            try:
-                credits = float(credits_entry.get()) if credits_entry.get() else 0
-                if course and credits > 0:
-                    current_courses.append((grade, credits))
-            except ValueError:
-                continue
+    def compute_gpa_summary(self, conn, inputs):
+        """Semester GPA, cumulative GPA and completed credits (runs on the worker)"""
+        student_id, (semester_credits, semester_points), on_screen, names, saved = inputs
         
-        # Combine all courses
-        all_courses.extend(current_courses)
-        
-        total_credits = 0
-        total_points = 0
+        if semester_credits == 0:
+            semester_gpa = 0.00
+        else:
+            semester_gpa = semester_points / semester_credits
         
-        for grade, credits in all_courses:
-            total_credits += credits
-            total_points += grade_points.get(grade, 0) * credits
+        # Start from the saved totals and overlay unsaved edits on screen
+        totals = TermTotals(conn.cursor(), student_id)
+        total_credits, total_points = overlay_courses(totals.credits, totals.points,
+                                                      on_screen, saved, self.scale, names)
         
-        if total_credits == 0:
+        if total_credits <= 0:
             cumulative_gpa = 0.00
         else:
             cumulative_gpa = total_points / total_credits
         
+        return semester_gpa, cumulative_gpa, totals.credits
+
+    def show_gpa_summary(self, summary):
+        semester_gpa, cumulative_gpa, total_completed_credits = summary
+        self.semester_gpa_label.config(text=f"Current Semester GPA: {semester_gpa:.2f}")
         self.cumulative_gpa_label.config(text=f"Cumulative GPA: {cumulative_gpa:.2f}")
+        self.stats_label.config(text=f"Total Credits Completed: {total_completed_credits:.1f}")
 
-    def get_total_completed_credits(self):
-        self.cursor.execute('''
-            SELECT SUM(credits) FROM courses 
-            WHERE student_id = 'default_student'
-        ''')
-        result = self.cursor.fetchone()[0]
-        return result if result else 0
+    def row_names(self):
+        """Names of every row on screen, including incomplete ones"""
+        return {course.strip() for course, _, _ in self.course_grid.rows}
 
-    def save_data(self):
-        saved_count = 0
-        for course_name, grade_var, credits_entry, _ in self.entries:
-            course = course_name.get().strip()
-            grade = grade_var.get()
+    def collect_courses(self):
+        """Return (course, grade, credits) for every complete row on screen"""
+        courses = []
+        for course, grade, credits_text in self.course_grid.rows:
+            course = course.strip()
             try:
-                credits = float(credits_entry.get()) if credits_entry.get() else 0
+                credits = float(credits_text) if credits_text else 0
             except ValueError:
                 continue
             
             if course and credits > 0:
-                # Check if course already exists
-                self.cursor.execute('''
-                    SELECT id FROM courses 
-                    WHERE student_id = 'default_student' AND year = ? AND semester = ? AND course_name = ?
-                ''', (self.current_year, self.current_semester, course))
-                
-                existing = self.cursor.fetchone()
-                
-                if existing:
-                    # Update existing course
-                    self.cursor.execute('''
-                        UPDATE courses 
-                        SET grade = ?, credits = ?, date_added = CURRENT_TIMESTAMP
-                        WHERE id = ?
-                    ''', (grade, credits, existing[0]))
-                else:
-                    # Insert new course
-                    self.cursor.execute('''
-                        INSERT INTO courses (student_id, year, semester, course_name, grade, credits)
-                        VALUES ('default_student', ?, ?, ?, ?, ?)
-                    ''', (self.current_year, self.current_semester, course, grade, credits))
-                
-                saved_count += 1
-        
-        self.conn.commit()
-        messagebox.showinfo("Saved", f"Saved {saved_count} courses to database.")
+                courses.append((course, grade, credits))
+        return courses
+
+    def save_data(self):
+        courses = self.collect_courses()
+        
+        # Upsert every row in one transaction; term totals are updated alongside
+        saved_count = upsert_courses(self.conn, [
+            (self.student_id, self.current_year, self.current_semester, course, grade, credits)
+            for course, grade, credits in courses
+        ])
+        
+        # Saved courses whose row was deleted (or renamed) on screen
+        on_screen = self.row_names()
+        removed_count = delete_courses(self.conn, [
+            (self.student_id, self.current_year, self.current_semester, course)
+            for course in self.saved_courses if course not in on_screen
+        ])
+        
+        self.totals.load()
+        self.load_saved_courses()
+        
+        message = f"Saved {saved_count} courses to database."
+        if removed_count:
+            message += f"\nRemoved {removed_count} deleted courses."
+        messagebox.showinfo("Saved", message)
         self.calculate_current_gpa()
 
     def calculate_and_save_gpa(self):
         # First save current data
         self.save_data()
         
-        # Calculate current semester GPA
-        total_credits = 0
-        total_points = 0
-        
-        self.cursor.execute('''
-            SELECT grade, credits FROM courses 
-            WHERE student_id = 'default_student' AND year = ? AND semester = ?
-        ''', (self.current_year, self.current_semester))
-        
-        semester_courses = self.cursor.fetchall()
-        
-        for grade, credits in semester_courses:
-            total_credits += credits
-            total_points += grade_points.get(grade, 0) * credits
-        
-        if total_credits > 0:
-            semester_gpa = total_points / total_credits
-        else:
-            semester_gpa = 0.0
-        
-        # Calculate cumulative GPA
-        self.cursor.execute('''
-            SELECT grade, credits FROM courses 
-            WHERE student_id = 'default_student'
-        ''')
-        
-        all_courses = self.cursor.fetchall()
-        
-        total_all_credits = 0
-        total_all_points = 0
-        
-        for grade, credits in all_courses:
-            total_all_credits += credits
-            total_all_points += grade_points.get(grade, 0) * credits
-        
-        if total_all_credits > 0:
-            cumulative_gpa = total_all_points / total_all_credits
-        else:
-            cumulative_gpa = 0.0
+        # Semester GPA and the running cumulative GPA through this term
+        snapshot = term_snapshot(self.cursor, self.student_id,
+                                 self.current_year, self.current_semester)
+        semester_gpa, cumulative_gpa, total_all_credits = snapshot or (0.0, 0.0, 0.0)
         
         # Save GPA record
         self.cursor.execute('''
-            INSERT OR REPLACE INTO gpa_records 
+            INSERT INTO gpa_records 
             (student_id, year, semester, semester_gpa, cumulative_gpa, total_credits)
-            VALUES ('default_student', ?, ?, ?, ?, ?)
-        ''', (self.current_year, self.current_semester, semester_gpa, cumulative_gpa, total_all_credits))
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (student_id, year, semester) DO UPDATE SET
+                semester_gpa = excluded.semester_gpa,
+                cumulative_gpa = excluded.cumulative_gpa,
+                total_credits = excluded.total_credits,
+                date_calculated = CURRENT_TIMESTAMP
+        ''', (self.student_id, self.current_year, self.current_semester,
+              semester_gpa, cumulative_gpa, total_all_credits))
         
         self.conn.commit()
         
@@ -399,69 +404,52 @@ class GPACalculator:
                            f"Cumulative GPA: {cumulative_gpa:.2f}\n"
                            f"Total Credits: {total_all_credits:.1f}")
 
+    def read_saved_courses(self, conn, student_id, year, semester):
+        """Return a term's (course, grade, credits) rows and their saved values"""
+        rows = conn.execute('''
+            SELECT course_name, grade, credits, scale_id FROM courses
+            WHERE student_id = ? AND year = ? AND semester = ?
+            ORDER BY date_added
+        ''', (student_id, year, semester)).fetchall()
+        
+        # Saved points use the scale each row was graded under
+        scales = ScaleCache(conn)
+        saved = {
+            course_name: (grade, credits,
+                          scales[scale_id].quality_points(grade, credits))
+            for course_name, grade, credits, scale_id in rows
+        }
+        return [(course_name, grade, credits) for course_name, grade, credits, _ in rows], saved
+
+    def load_saved_courses(self):
+        """Read the displayed term's rows and remember their saved values"""
+        courses, self.saved_courses = self.read_saved_courses(
+            self.conn, self.student_id, self.current_year, self.current_semester)
+        return courses
+
     def load_current_data(self):
-        # Clear current entries
-        for entry_set in self.entries:
-            for widget in entry_set:
-                if hasattr(widget, 'destroy'):
-                    widget.destroy()
-        self.entries.clear()
-        
         # Load data for current year/semester
-        self.cursor.execute('''
-            SELECT course_name, grade, credits FROM courses
-            WHERE student_id = 'default_student' AND year = ? AND semester = ?
-            ORDER BY date_added
-        ''', (self.current_year, self.current_semester))
-        
-        courses = self.cursor.fetchall()
-        
+        self.show_courses(self.load_saved_courses())
+
+    def show_courses(self, courses):
         if courses:
-            for course_name, grade, credits in courses:
-                self.add_course_row(course_name, grade, str(credits))
+            self.course_grid.set_rows(courses)
         else:
             # Add one empty row if no data
-            self.add_course_row()
+            self.course_grid.set_rows([("", "A", "")])
         
         self.calculate_current_gpa()
 
     def view_all_records(self):
-        # Create new window for viewing all records
-        records_window = tk.Toplevel(self.root)
-        records_window.title("All GPA Records")
-        records_window.geometry("700x500")
-        
-        # Create Treeview for displaying records
-        columns = ("Year", "Semester", "Semester GPA", "Cumulative GPA", "Total Credits", "Date")
-        tree = ttk.Treeview(records_window, columns=columns, show="headings", height=15)
-        
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=100)
-        
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(records_window, orient="vertical", command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
-        
-        # Pack widgets
-        tree.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-        
-        # Fetch and display data
-        self.cursor.execute('''
-            SELECT year, semester, semester_gpa, cumulative_gpa, total_credits, date_calculated
-            FROM gpa_records 
-            WHERE student_id = 'default_student'
-            ORDER BY year, semester, date_calculated DESC
-        ''')
-        
-        records = self.cursor.fetchall()
-        
-        for record in records:
-            year, semester, sem_gpa, cum_gpa, credits, date = record
-            date_formatted = date.split()[0] if date else "N/A"  # Just show date part
-            tree.insert("", "end", values=(year, semester, f"{sem_gpa:.2f}", 
-                                         f"{cum_gpa:.2f}", f"{credits:.1f}", date_formatted))
+        # Records are paged in from SQL as the list is scrolled
+        HistoryWindow(self.root, self.conn, self.student_id)
+
+    def show_perf_overlay(self, event=None):
+        PerfOverlay(self.root, self.instrumentation)
+
+    def plan_target_gpa(self):
+        # Plans start from the saved transcript, scored under the active scale
+        PlannerDialog(self.root, self.totals.credits, self.totals.points, self.scale)
 
     def toggle_theme(self):
         if self.dark_mode:
@@ -488,25 +476,52 @@ class GPACalculator:
                 widget.config(bg=bg_color)
         
         # Update background only for frame widgets
-        frame_widgets = [self.root, self.course_frame]
+        frame_widgets = [self.root]
         for widget in frame_widgets:
             try:
                 widget.config(bg=bg_color)
             except tk.TclError:
                 pass
         
-        # Update canvas background
-        try:
-            self.canvas.config(bg=bg_color)
-        except tk.TclError:
-            pass
+        # Update course grid background
+        self.course_grid.set_background(bg_color)
 
     def __del__(self):
-        if hasattr(self, 'conn'):
+        if hasattr(self, 'recalc'):
+            self.recalc.close()
+        if getattr(self, 'maintenance', None) is not None:
+            self.maintenance.close()
+        if getattr(self, 'conn', None) is not None:
             self.conn.close()
 
 # Run the App
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = GPACalculator(root)
+    parser = argparse.ArgumentParser(description="Multi-Year GPA Calculator")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print how long each startup phase took")
+    parser.add_argument("--instrument", action="store_true",
+                        help="time SQL and UI paths; press F12 for the overlay")
+    parser.add_argument("--instrument-dump", metavar="PATH",
+                        help="instrument and write the stats as JSON on exit")
+    parser.add_argument("--db", default=None,
+                        help="single database holding every profile (default data.db)")
+    parser.add_argument("--data-dir", default=None,
+                        help="directory with one database per student instead of --db")
+    parser.add_argument("--student", default=DEFAULT_STUDENT, help="profile to open")
+    parser.add_argument("--no-maintenance", action="store_true",
+                        help="don't run database maintenance when the window is idle")
+    args = parser.parse_args()
+    
+    instrumentation = None
+    if args.instrument or args.instrument_dump:
+        instrumentation = Instrumentation()
+        instrumentation.install()
+    
+    profile = StartupProfile(args.profile_startup)
+    with profile.phase("create Tk root"):
+        root = tk.Tk()
+    app = GPACalculator(root, profile, instrumentation, open_store(args.db, args.data_dir),
+                        args.student, maintenance=not args.no_maintenance)
     root.mainloop()
+    if args.instrument_dump:
+        instrumentation.dump(args.instrument_dump)
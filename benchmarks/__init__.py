@@ -0,0 +1 @@
+"""Performance benchmarks for the GPA calculator (not shipped with the app)."""
@@ -0,0 +1,231 @@
+"""Latency and peak memory of the GPA app's hot paths, without a display.
+
+GPACalculator runs against a synthetic database with tkinter replaced by
+benchmarks.tkstub, so only the app's own Python and SQL are timed.  Results
+are written as JSON for comparing runs over time::
+
+    python -m benchmarks.bench_app --students 2000 --courses 8 --output after.json
+    python -m benchmarks.bench_app --compare before.json after.json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks import tkstub
+from benchmarks.synthetic import generate
+from gpa.grades import SEMESTERS, YEARS
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "V2.0.py")
+
+
+def load_app_module():
+    """Import V2.0.py against the stub tkinter"""
+    tkstub.install()
+    spec = importlib.util.spec_from_file_location("gpa_app", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def wait_until_ready(app, timeout=60.0):
+    """Pump the stub event loop until the app's background startup finishes"""
+    deadline = time.perf_counter() + timeout
+    while app.conn is None:
+        if time.perf_counter() > deadline:
+            raise RuntimeError("app did not finish loading")
+        tkstub.run_pending()
+        time.sleep(0.001)
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "min_ms": ordered[0] * 1000,
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+class Operations:
+    """The user-facing actions being measured, each safe to repeat"""
+
+    def __init__(self, app):
+        self.app = app
+        self.terms = [(year, semester) for year in YEARS for semester in SEMESTERS]
+        self.calls = 0
+
+    def _next_term(self):
+        self.calls += 1
+        return self.terms[self.calls % len(self.terms)]
+
+    def load_current_data(self):
+        self.app.current_year, self.app.current_semester = self._next_term()
+        self.app.load_current_data()
+
+    def recalculate_gpa(self):
+        # What one debounced live update costs, run inline instead of on the worker
+        app = self.app
+        app.show_gpa_summary(app.compute_gpa_summary(app.conn, app.snapshot_gpa_inputs()))
+
+    def save_data(self):
+        # Regrade the first row so every save writes a changed course
+        app = self.app
+        self.calls += 1
+        course, _, credits = app.course_grid.rows[0]
+        grades = app.scale.grades
+        app.course_grid.set_row(0, (course, grades[self.calls % len(grades)], credits))
+        app.save_data()
+
+    def calculate_and_save_gpa(self):
+        self.app.calculate_and_save_gpa()
+
+    def view_all_records(self):
+        self.app.view_all_records()
+
+
+OPERATIONS = ["load_current_data", "recalculate_gpa", "save_data",
+              "calculate_and_save_gpa", "view_all_records"]
+
+
+def measure(func, runs, warmup):
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+        # Keep the stub's after() queue from growing between samples
+        tkstub.run_pending()
+    result = summarize(samples)
+
+    # Peak memory is measured separately so tracing doesn't skew the timings
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result["peak_kb"] = peak / 1024
+    return result
+
+
+def run(args):
+    workdir = args.dir or tempfile.mkdtemp(prefix="bench_app_")
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.join(workdir, "data.db")
+    reused = args.reuse and os.path.exists(db_path)
+    if reused:
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute('SELECT COUNT(*) FROM courses').fetchone()[0]
+        conn.close()
+    else:
+        rows = generate(db_path, args.students, args.years, args.semesters, args.courses,
+                        seed=args.seed, app_student=True)
+    print(f"{rows:,} course rows in {db_path}", file=sys.stderr)
+
+    module = load_app_module()
+    # The app opens data.db relative to the working directory
+    previous_dir = os.getcwd()
+    os.chdir(workdir)
+    try:
+        started = time.perf_counter()
+        # The stub fires after() timers at once, so idle maintenance would run mid-benchmark
+        app = module.GPACalculator(module.tk.Tk(), maintenance=False)
+        shell = time.perf_counter() - started
+        wait_until_ready(app)
+        startup = time.perf_counter() - started
+        ops = Operations(app)
+        results = {"window_shell": {"runs": 1, "p50_ms": shell * 1000},
+                   "startup": {"runs": 1, "p50_ms": startup * 1000}}
+        for name in args.operations or OPERATIONS:
+            results[name] = measure(getattr(ops, name), args.runs, args.warmup)
+            print(f"{name:<24} p50 {results[name]['p50_ms']:>9.3f} ms  "
+                  f"p99 {results[name]['p99_ms']:>9.3f} ms  "
+                  f"peak {results[name]['peak_kb']:>9.1f} KB", file=sys.stderr)
+        app.recalc.close()
+        app.conn.close()
+    finally:
+        os.chdir(previous_dir)
+
+    meta = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "course_rows": rows,
+        "runs": args.runs,
+    }
+    if not reused:
+        meta.update(students=args.students, years=args.years, semesters=args.semesters,
+                    courses=args.courses, seed=args.seed)
+    return {"meta": meta, "results": results}
+
+
+def compare(before_path, after_path):
+    with open(before_path, encoding="utf-8") as source:
+        before = json.load(source)["results"]
+    with open(after_path, encoding="utf-8") as source:
+        after = json.load(source)["results"]
+    print(f"{'operation':<24} {'p50 before':>11} {'p50 after':>11} {'p99 before':>11} "
+          f"{'p99 after':>11} {'change':>8}")
+    for name in after:
+        if name not in before or "p99_ms" not in after[name]:
+            continue
+        old, new = before[name], after[name]
+        change = (new["p50_ms"] / old["p50_ms"] - 1) * 100 if old["p50_ms"] else 0.0
+        print(f"{name:<24} {old['p50_ms']:>11.3f} {new['p50_ms']:>11.3f} "
+              f"{old['p99_ms']:>11.3f} {new['p99_ms']:>11.3f} {change:>+7.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--years", type=int, default=4)
+    parser.add_argument("--semesters", type=int, default=2)
+    parser.add_argument("--courses", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--operation", action="append", dest="operations",
+                        choices=OPERATIONS, help="only time these (repeatable)")
+    parser.add_argument("--dir", default=None, help="working directory for data.db")
+    parser.add_argument("--reuse", action="store_true",
+                        help="benchmark an existing data.db in --dir as-is")
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="print the difference between two results files")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return 0
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            out.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+"""Scaling of gpa.cohort across worker processes.
+
+Runs the same cohort analysis in-process and with 1, 2, 4, ... workers up
+to the CPU count, checks every run agrees, and reports speedup and
+parallel efficiency against one worker::
+
+    python -m benchmarks.bench_cohort --students 500000 --courses 6
+    python -m benchmarks.bench_cohort --db /tmp/cohort.db --workers 1 2 4 8
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import generate
+from gpa.cohort import analyze
+
+
+def worker_counts(limit):
+    counts = []
+    count = 1
+    while count < limit:
+        counts.append(count)
+        count *= 2
+    counts.append(limit)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=50000)
+    parser.add_argument("--courses", type=int, default=6)
+    parser.add_argument("--db", default=None, help="reuse an existing database")
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="worker counts to time (default: 1, 2, 4, ... CPU count)")
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    db_path = args.db
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="bench_cohort_"), "data.db")
+        print(f"Generating {args.students:,} students in {db_path}", file=sys.stderr)
+        generate(db_path, args.students, courses=args.courses)
+    cpus = os.cpu_count() or 1
+    counts = args.workers or worker_counts(cpus)
+
+    def best(workers):
+        times = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            report = analyze(db_path, workers)
+            times.append(time.perf_counter() - started)
+        return min(times), report
+
+    serial, expected = best(0)
+    results = []
+    for workers in counts:
+        elapsed, report = best(workers)
+        if report.gpas != expected.gpas or report.student_ids != expected.student_ids:
+            raise SystemExit(f"{workers} workers disagree with the in-process run")
+        results.append((workers, elapsed))
+
+    single = results[0][1] if results[0][0] == 1 else serial
+    print(f"{len(expected):,} students, {cpus} CPUs")
+    print(f"{'in-process':>12} {serial:>8.2f}s")
+    rows = []
+    for workers, elapsed in results:
+        speedup = single / elapsed
+        rows.append({"workers": workers, "seconds": elapsed, "speedup": speedup,
+                     "efficiency": speedup / workers})
+        print(f"{workers:>4} workers {elapsed:>8.2f}s  {speedup:>5.2f}x  "
+              f"{100 * speedup / workers:>5.0f}% efficiency")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            json.dump({"meta": {"db": db_path, "students": len(expected), "cpus": cpus},
+                       "in_process_seconds": serial, "results": rows}, out, indent=2)
+            out.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,104 @@
+"""Hot-query latency before and after the schema migrations.
+
+Builds a synthetic database on the original version-1 schema (no indexes),
+times the queries the app issues, upgrades it in place and times them again:
+
+    python -m benchmarks.bench_indexes --students 5000 --courses 25   # 1M rows
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.synthetic import generate, student_ids
+from gpa.db import connect
+from gpa.grades import SEMESTERS, YEARS
+from gpa.migrations import migrate
+
+# name -> (sql, parameter builder taking (student_id, year, semester))
+QUERIES = {
+    "load term": (
+        '''SELECT course_name, grade, credits FROM courses
+           WHERE student_id = ? AND year = ? AND semester = ? ORDER BY date_added''',
+        lambda s, y, m: (s, y, m)),
+    "find course": (
+        '''SELECT id FROM courses
+           WHERE student_id = ? AND year = ? AND semester = ? AND course_name = ?''',
+        lambda s, y, m: (s, y, m, "Course 000")),
+    "term grades": (
+        '''SELECT grade, credits FROM courses
+           WHERE student_id = ? AND year = ? AND semester = ?''',
+        lambda s, y, m: (s, y, m)),
+    "student credits": (
+        '''SELECT SUM(credits) FROM courses WHERE student_id = ?''',
+        lambda s, y, m: (s,)),
+    "gpa history": (
+        '''SELECT year, semester, semester_gpa, cumulative_gpa, total_credits, date_calculated
+           FROM gpa_records WHERE student_id = ?
+           ORDER BY year, semester, date_calculated DESC''',
+        lambda s, y, m: (s,)),
+}
+
+
+def time_queries(conn, samples, repeat):
+    """Return {query name: [latency in ms, ...]}"""
+    results = {}
+    for name, (sql, build) in QUERIES.items():
+        timings = []
+        for _ in range(repeat):
+            for sample in samples:
+                start = time.perf_counter()
+                conn.execute(sql, build(*sample)).fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+        results[name] = timings
+    return results
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return statistics.median(timings), p95
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=None, help="path for the synthetic database")
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--courses", type=int, default=25)
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "bench_indexes.db")
+    start = time.perf_counter()
+    rows = generate(path, students=args.students, courses=args.courses,
+                    gpa_copies=3, schema_version=1)
+    print(f"Generated {rows:,} course rows in {time.perf_counter() - start:.1f}s at {path}")
+
+    rng = random.Random(1)
+    samples = [(rng.choice(student_ids(args.students)), rng.choice(YEARS[:4]),
+                rng.choice(SEMESTERS[:2])) for _ in range(args.samples)]
+
+    conn = connect(path)
+    before = time_queries(conn, samples, args.repeat)
+
+    start = time.perf_counter()
+    applied = migrate(conn)
+    print(f"Applied migrations {applied} in {time.perf_counter() - start:.1f}s")
+    conn.execute('ANALYZE')
+    after = time_queries(conn, samples, args.repeat)
+    conn.close()
+
+    print(f"{'query':<16} {'before p50':>11} {'before p95':>11} {'after p50':>10} {'after p95':>10} {'speedup':>8}")
+    for name in QUERIES:
+        b50, b95 = summarize(before[name])
+        a50, a95 = summarize(after[name])
+        speedup = b50 / a50 if a50 > 0 else float("inf")
+        print(f"{name:<16} {b50:>9.3f}ms {b95:>9.3f}ms {a50:>8.3f}ms {a95:>8.3f}ms {speedup:>7.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
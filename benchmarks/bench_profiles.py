@@ -0,0 +1,137 @@
+"""Profile switching and maintenance cost of the two storage layouts.
+
+The same synthetic students are held once in a single data.db and once
+split into per-student shards.  For each layout the app (against
+benchmarks.tkstub) switches between random profiles and saves a regrade,
+then the whole store is vacuumed and read across profiles::
+
+    python -m benchmarks.bench_profiles --students 10000 --courses 6
+    python -m benchmarks.bench_profiles --dir /tmp/profiles --reuse --output profiles.json
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks import tkstub
+from benchmarks.bench_app import load_app_module, summarize, wait_until_ready
+from benchmarks.synthetic import generate
+from gpa.profiles import ShardedStore, SingleFileStore
+
+
+def store_size(paths):
+    total = 0
+    for path in paths:
+        for suffix in ("", "-wal"):
+            if os.path.exists(path + suffix):
+                total += os.path.getsize(path + suffix)
+    return total
+
+
+def timed(func):
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def vacuum(path):
+    conn = sqlite3.connect(path)
+    conn.execute('VACUUM')
+    conn.close()
+
+
+def measure_app(module, store, students, runs, seed):
+    """Time switch_student and save_data on a running app"""
+    rng = random.Random(seed)
+    app = module.GPACalculator(module.tk.Tk(), store=store, student_id=students[0],
+                               maintenance=False)
+    wait_until_ready(app)
+    module.messagebox.showinfo = lambda *args, **kwargs: None
+
+    switches = []
+    saves = []
+    for run in range(runs):
+        app.student_var.set(rng.choice(students))
+        switches.append(timed(app.switch_student))
+        course, _, credits = app.course_grid.rows[0]
+        grades = app.scale.grades
+        app.course_grid.set_row(0, (course or "Course 000", grades[run % len(grades)],
+                                    credits or "3"))
+        saves.append(timed(app.save_data))
+        # Keep the stub's after() queue from growing between samples
+        tkstub.run_pending()
+    app.recalc.close()
+    app.conn.close()
+    return {"switch_student": summarize(switches), "save_data": summarize(saves)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--courses", type=int, default=6)
+    parser.add_argument("--runs", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dir", default=None, help="working directory for both layouts")
+    parser.add_argument("--reuse", action="store_true",
+                        help="keep data.db and shards/ already in --dir")
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    workdir = args.dir or tempfile.mkdtemp(prefix="bench_profiles_")
+    os.makedirs(workdir, exist_ok=True)
+    db_path = os.path.join(workdir, "data.db")
+    shard_dir = os.path.join(workdir, "sharded")
+    results = {"meta": {"students": args.students, "courses": args.courses, "runs": args.runs}}
+
+    if not (args.reuse and os.path.exists(db_path)):
+        print(f"Generating {args.students:,} students in {db_path}", file=sys.stderr)
+        generate(db_path, args.students, courses=args.courses)
+    single = SingleFileStore(db_path)
+    students = single.profiles()
+    sharded = ShardedStore(shard_dir)
+    if not (args.reuse and len(sharded.profiles()) == len(students)):
+        print(f"Splitting into {shard_dir}", file=sys.stderr)
+        results["meta"]["split_seconds"] = timed(lambda: sharded.split(db_path, students))
+
+    module = load_app_module()
+    shard_paths = [sharded.database_for(student_id) for student_id in students]
+    layouts = [("single", single, [db_path]),
+               ("sharded", sharded, shard_paths + [os.path.join(shard_dir, "catalog.db")])]
+    for name, store, paths in layouts:
+        print(f"Timing the {name} layout", file=sys.stderr)
+        result = measure_app(module, store, students, args.runs, args.seed)
+        result["summaries_seconds"] = timed(store.summaries)
+        result["files"] = len(paths)
+        result["bytes"] = store_size(paths)
+        # Maintenance on one profile: the whole file, or just that student's shard
+        result["vacuum_one_profile_seconds"] = timed(lambda: vacuum(
+            store.database_for(students[0])))
+        results[name] = result
+    sharded.close()
+
+    print(f"{'':<26} {'single':>12} {'sharded':>12}")
+    for label, key in (("switch p50 (ms)", "switch_student"), ("save p50 (ms)", "save_data")):
+        print(f"{label:<26} {results['single'][key]['p50_ms']:>12.2f} "
+              f"{results['sharded'][key]['p50_ms']:>12.2f}")
+    for label, key in (("switch p99 (ms)", "switch_student"), ("save p99 (ms)", "save_data")):
+        print(f"{label:<26} {results['single'][key]['p99_ms']:>12.2f} "
+              f"{results['sharded'][key]['p99_ms']:>12.2f}")
+    for label, key, scale in (("vacuum one profile (s)", "vacuum_one_profile_seconds", 1),
+                              ("read all profiles (s)", "summaries_seconds", 1),
+                              ("size (MB)", "bytes", 1024 * 1024), ("files", "files", 1)):
+        print(f"{label:<26} {results['single'][key] / scale:>12.2f} "
+              f"{results['sharded'][key] / scale:>12.2f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            json.dump(results, out, indent=2)
+            out.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+"""Load test for gpa.service: requests/sec and latency percentiles.
+
+Starts a local server on a synthetic database (or targets a running one
+with --url) and drives it from concurrent keep-alive clients::
+
+    python -m benchmarks.bench_service --students 2000 --clients 16 --seconds 10
+    python -m benchmarks.bench_service --url http://127.0.0.1:8080 --students 2000
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+from benchmarks.bench_app import summarize
+from benchmarks.synthetic import generate, student_ids
+from gpa.grades import SEMESTERS, YEARS, grade_points
+from gpa.service import make_server
+
+
+def client(host, port, students, write_ratio, deadline, seed, samples, errors):
+    """Issue requests until ``deadline``, appending (kind, seconds) to samples"""
+    rng = random.Random(seed)
+    grades = list(grade_points)
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    while time.perf_counter() < deadline:
+        student = quote(rng.choice(students), safe="")
+        if rng.random() < write_ratio:
+            kind = "write"
+            term = f"{quote(rng.choice(YEARS))}/{quote(rng.choice(SEMESTERS))}"
+            body = json.dumps({"courses": [{"course_name": f"Course {rng.randrange(6):03d}",
+                                            "grade": rng.choice(grades), "credits": 3}]})
+            method, path = "PUT", f"/students/{student}/terms/{term}/courses"
+            headers = {"Content-Type": "application/json"}
+        else:
+            kind = "read"
+            method, path, body, headers = "GET", f"/students/{student}/gpa", None, {}
+
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body, headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException) as error:
+            status = type(error).__name__
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+        elapsed = time.perf_counter() - started
+        if status == 200:
+            samples.append((kind, elapsed))
+        else:
+            errors.append(status)
+    conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="target a running service instead")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--courses", type=int, default=6)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="bench_service_"), "data.db")
+        rows = generate(db_path, args.students, courses=args.courses)
+        print(f"{rows:,} course rows in {db_path}", file=sys.stderr)
+        server = make_server(db_path, port=0, readers=args.readers)
+        host, port = server.server_address[:2]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    students = student_ids(args.students)
+    samples, errors = [], []
+    deadline = time.perf_counter() + args.seconds
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client,
+                                args=(host, port, students, args.write_ratio, deadline,
+                                      seed, samples, errors))
+               for seed in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+    results = {"requests": len(samples), "errors": len(errors), "seconds": elapsed,
+               "requests_per_sec": len(samples) / elapsed}
+    for kind in ("all", "read", "write"):
+        latencies = [seconds for sample_kind, seconds in samples
+                     if kind == "all" or sample_kind == kind]
+        if latencies:
+            results[kind] = summarize(latencies)
+    report = {"meta": {"clients": args.clients, "readers": args.readers,
+                       "write_ratio": args.write_ratio, "students": args.students},
+              "results": results}
+
+    print(f"{results['requests']:,} requests in {elapsed:.1f}s: "
+          f"{results['requests_per_sec']:,.0f} req/s, {results['errors']} errors", file=sys.stderr)
+    for kind in ("all", "read", "write"):
+        if kind in results:
+            print(f"{kind:<6} p50 {results[kind]['p50_ms']:>8.2f} ms  "
+                  f"p99 {results[kind]['p99_ms']:>8.2f} ms", file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            json.dump(report, out, indent=2)
+            out.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
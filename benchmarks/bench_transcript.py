@@ -0,0 +1,105 @@
+"""Memory and aggregation speed of the transcript representations.
+
+Loads the same synthetic courses as fetchall() tuples, as CourseRecords
+and as TranscriptColumns, reporting retained memory (tracemalloc) and the
+time to compute every student's cumulative GPA from each::
+
+    python -m benchmarks.bench_transcript --students 20000 --courses 6
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import generate
+from gpa.db import connect
+from gpa.engine import cumulative_by_student
+from gpa.scales import ScaleCache
+from gpa.transcript import TranscriptColumns, load_records
+
+
+def retained(build):
+    """Return (result, bytes still allocated after build, seconds)"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def gpa_from_rows(rows, scales):
+    totals = {}
+    for student_id, _, _, _, grade, credits, scale_id in rows:
+        entry = totals.setdefault(student_id, [0.0, 0.0])
+        entry[0] += credits
+        entry[1] += scales[scale_id].quality_points(grade, credits)
+    return {student_id: (points / credits if credits > 0 else 0.0, credits)
+            for student_id, (credits, points) in totals.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--courses", type=int, default=6)
+    parser.add_argument("--db", default=None, help="reuse an existing database")
+    args = parser.parse_args(argv)
+
+    db_path = args.db
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="bench_transcript_"), "data.db")
+        generate(db_path, args.students, courses=args.courses)
+    conn = connect(db_path)
+    count = conn.execute('SELECT COUNT(*) FROM courses').fetchone()[0]
+    print(f"{count:,} course rows in {db_path}", file=sys.stderr)
+
+    rows, tuple_bytes, tuple_secs = retained(lambda: conn.execute('''
+        SELECT student_id, year, semester, course_name, grade, credits, scale_id FROM courses
+    ''').fetchall())
+    started = time.perf_counter()
+    expected = gpa_from_rows(rows, ScaleCache(conn))
+    tuple_gpa = time.perf_counter() - started
+    del rows
+
+    records, record_bytes, record_secs = retained(lambda: load_records(conn))
+    del records
+
+    results = []
+    for with_names in (False, True):
+        columns, column_bytes, column_secs = retained(
+            lambda: TranscriptColumns.load(conn, with_names=with_names))
+        started = time.perf_counter()
+        gpa = columns.cumulative_gpa()
+        column_gpa = time.perf_counter() - started
+        assert gpa.keys() == expected.keys()
+        assert all(abs(gpa[key][0] - expected[key][0]) < 1e-9 for key in expected)
+        results.append((with_names, column_bytes, column_secs, column_gpa))
+        del columns
+
+    # The engine aggregates in SQL and holds no rows at all; shown for reference
+    started = time.perf_counter()
+    cumulative_by_student(conn)
+    sql_gpa = time.perf_counter() - started
+    conn.close()
+
+    def line(label, size, load_secs, gpa_secs=None):
+        ratio = tuple_bytes / size if size else float("inf")
+        gpa_text = f"{gpa_secs:>7.2f}s" if gpa_secs is not None else " " * 8
+        print(f"{label:<28} {size / 1024 / 1024:>9.1f} MB {size / count:>7.1f} B/row "
+              f"{ratio:>6.1f}x  load {load_secs:>6.2f}s  gpa {gpa_text}")
+
+    line("fetchall() tuples", tuple_bytes, tuple_secs, tuple_gpa)
+    line("CourseRecord (__slots__)", record_bytes, record_secs)
+    for with_names, size, load_secs, gpa_secs in results:
+        line("columns" + (" + names" if with_names else ""), size, load_secs, gpa_secs)
+    print(f"{'SQL aggregate (engine)':<28} {'':>24} {'':>7}  {'':>12}  gpa {sql_gpa:>7.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+"""Throughput and peak memory of the streaming import/export.
+
+    python -m benchmarks.bench_transfer --rows 1000000
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import generate_courses
+from gpa.db import connect
+from gpa.engine import recompute
+from gpa.migrations import migrate
+from gpa.transfer import COURSE_FIELDS, export_gpa_records, import_courses
+
+
+def write_csv(path, rows, courses_per_term=6):
+    """Write roughly ``rows`` synthetic course rows to a CSV file"""
+    students = max(1, rows // (4 * 2 * courses_per_term))
+    with open(path, "w", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        writer.writerow(COURSE_FIELDS)
+        count = 0
+        for row in generate_courses(students, 4, 2, courses_per_term):
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def measure(label, func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<8} {count:>10,} rows  {elapsed:>7.2f}s  "
+          f"{count / elapsed:>10,.0f} rows/sec  peak {peak / 1024 / 1024:>6.1f} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--dir", default=None)
+    args = parser.parse_args(argv)
+
+    workdir = args.dir or tempfile.mkdtemp()
+    os.makedirs(workdir, exist_ok=True)
+    source = os.path.join(workdir, "transcripts.csv")
+    db_path = os.path.join(workdir, "bench_transfer.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    rows = write_csv(source, args.rows)
+    print(f"Wrote {rows:,} rows to {source}")
+
+    conn = connect(db_path)
+    migrate(conn)
+    measure("import", lambda: import_courses(conn, source)["rows"])
+    recompute(conn)
+    measure("export", lambda: export_gpa_records(conn, os.path.join(workdir, "gpa.csv")))
+    measure("export", lambda: export_gpa_records(conn, os.path.join(workdir, "gpa.jsonl")))
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,119 @@
+"""Synthetic data.db generator for benchmarks.
+
+Data volume is students x years x semesters x courses rows::
+
+    python -m benchmarks.synthetic --db /tmp/bench.db --students 5000 --courses 25
+
+``--app-student`` names the first student ``default_student`` so the GUI
+(and benchmarks.bench_app) sees a populated transcript.
+"""
+import argparse
+import os
+import random
+import sqlite3
+
+from gpa.aggregates import rebuild_totals
+from gpa.grades import SEMESTERS, YEARS, grade_points
+from gpa.migrations import migrate
+
+CREDIT_CHOICES = [1.0, 2.0, 3.0, 3.0, 4.0]
+
+
+# The student the GUI reads and writes
+APP_STUDENT = "default_student"
+
+
+def student_ids(count, app_student=False):
+    ids = [f"student_{index:06d}" for index in range(count)]
+    if app_student and ids:
+        ids[0] = APP_STUDENT
+    return ids
+
+
+def generate_courses(students, years, semesters, courses, seed=0, app_student=False):
+    """Yield course rows (student_id, year, semester, course_name, grade, credits)"""
+    rng = random.Random(seed)
+    grades = list(grade_points)
+    for student_id in student_ids(students, app_student):
+        for year in YEARS[:years]:
+            for semester in SEMESTERS[:semesters]:
+                for index in range(courses):
+                    yield (student_id, year, semester, f"Course {index:03d}",
+                           rng.choice(grades), rng.choice(CREDIT_CHOICES))
+
+
+def generate(path, students=1000, years=4, semesters=2, courses=6,
+             gpa_copies=1, schema_version=None, seed=0, app_student=False):
+    """Write a fresh synthetic database and return the number of course rows
+
+    ``schema_version`` stops the migration chain early, e.g. 1 for the
+    original unindexed schema.  ``gpa_copies`` > 1 inserts duplicate
+    gpa_records per term the way old releases accumulated them; it is only
+    meaningful below the version that adds the unique gpa_records key.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = OFF')
+    migrate(conn, schema_version)
+
+    count = 0
+    batch = []
+    for row in generate_courses(students, years, semesters, courses, seed, app_student):
+        batch.append(row)
+        if len(batch) >= 10000:
+            conn.executemany('''
+                INSERT INTO courses (student_id, year, semester, course_name, grade, credits)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        conn.executemany('''
+            INSERT INTO courses (student_id, year, semester, course_name, grade, credits)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', batch)
+        count += len(batch)
+
+    conn.executemany('''
+        INSERT INTO gpa_records
+        (student_id, year, semester, semester_gpa, cumulative_gpa, total_credits)
+        VALUES (?, ?, ?, 3.0, 3.0, 30.0)
+    ''', ((student_id, year, semester)
+          for student_id in student_ids(students, app_student)
+          for year in YEARS[:years]
+          for semester in SEMESTERS[:semesters]
+          for _ in range(gpa_copies)))
+    conn.commit()
+
+    # Bring derived tables in line with the bulk-inserted rows
+    if schema_version is None or schema_version >= 2:
+        rebuild_totals(conn.cursor())
+        conn.commit()
+    conn.close()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic GPA database")
+    parser.add_argument("--db", required=True)
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--years", type=int, default=4)
+    parser.add_argument("--semesters", type=int, default=2)
+    parser.add_argument("--courses", type=int, default=6)
+    parser.add_argument("--gpa-copies", type=int, default=1)
+    parser.add_argument("--schema-version", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--app-student", action="store_true",
+                        help=f"name the first student {APP_STUDENT}")
+    args = parser.parse_args(argv)
+
+    count = generate(args.db, args.students, args.years, args.semesters, args.courses,
+                     args.gpa_copies, args.schema_version, args.seed, args.app_student)
+    print(f"Wrote {count} course rows to {args.db}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
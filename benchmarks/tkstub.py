@@ -0,0 +1,156 @@
+"""Minimal stand-in for tkinter so the app can be benchmarked without a display.
+
+Widgets accept any options and remember text, variables hold values and
+fire traces, and ``after`` callbacks are queued until ``run_pending()``.
+Only what V2.0.py and the gpa package touch is implemented.
+"""
+import sys
+import types
+
+_pending = {}
+_next_id = [0]
+
+
+def run_pending():
+    """Run every queued ``after`` callback once, in scheduling order"""
+    for after_id in sorted(_pending):
+        callback = _pending.pop(after_id, None)
+        if callback is not None:
+            callback[0](*callback[1])
+
+
+class Widget:
+    def __init__(self, master=None, **options):
+        self.options = dict(options)
+        self.text = ""
+        self.children = []
+
+    def _noop(self, *args, **kwargs):
+        return None
+
+    pack = grid = place = grid_remove = pack_forget = destroy = _noop
+    title = geometry = protocol = transient = focus_set = lift = _noop
+    heading = column = mainloop = update_idletasks = withdraw = _noop
+    event_generate = set = see = selection_set = unbind = _noop
+
+    def config(self, **options):
+        self.options.update(options)
+
+    configure = config
+
+    def cget(self, key):
+        return self.options.get(key)
+
+    def bind(self, sequence, func=None, add=None):
+        return None
+
+    bind_all = bind
+
+    def after(self, ms, func=None, *args):
+        if func is None:
+            return None
+        _next_id[0] += 1
+        _pending[_next_id[0]] = (func, args)
+        return _next_id[0]
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, after_id):
+        _pending.pop(after_id, None)
+
+    def insert(self, index, value, *args, **kwargs):
+        if isinstance(index, int):
+            self.text = self.text[:index] + value + self.text[index:]
+            return None
+        self.children.append(kwargs.get("values"))
+        return f"I{len(self.children)}"
+
+    def delete(self, *items):
+        if items and isinstance(items[0], int):
+            self.text = ""
+        else:
+            self.children = []
+
+    def get(self, *args):
+        return self.text
+
+    def get_children(self, *args):
+        return [f"I{index + 1}" for index in range(len(self.children))]
+
+    def yview(self, *args):
+        return (0.0, 1.0)
+
+    def winfo_reqheight(self):
+        return 24
+
+    def winfo_height(self):
+        return 200
+
+    def winfo_exists(self):
+        return True
+
+
+class Variable:
+    def __init__(self, master=None, value=""):
+        self.value = value
+        self.traces = []
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+        for callback in self.traces:
+            callback("", "", "write")
+
+    def trace_add(self, mode, callback):
+        self.traces.append(callback)
+        return str(len(self.traces))
+
+    def trace(self, mode, callback):
+        return self.trace_add(mode, callback)
+
+
+def install():
+    """Register stub tkinter modules; call before importing the app"""
+    tk = types.ModuleType("tkinter")
+    for name in ("Tk", "Toplevel", "Label", "Frame", "Canvas", "Entry", "Button",
+                 "Text", "Listbox", "Scrollbar", "Checkbutton", "Spinbox"):
+        setattr(tk, name, type(name, (Widget,), {}))
+    for name in ("StringVar", "IntVar", "DoubleVar", "BooleanVar"):
+        setattr(tk, name, type(name, (Variable,), {}))
+    tk.TclError = RuntimeError
+    for name in ("BOTH", "LEFT", "RIGHT", "TOP", "BOTTOM", "X", "Y", "END",
+                 "N", "S", "E", "W", "NW"):
+        setattr(tk, name, name.lower())
+
+    ttk = types.ModuleType("tkinter.ttk")
+    for name in ("Combobox", "Treeview", "Scrollbar", "Label", "Frame", "Button",
+                 "Entry", "Spinbox", "Progressbar"):
+        setattr(ttk, name, type(name, (Widget,), {}))
+
+    messagebox = types.ModuleType("tkinter.messagebox")
+    for name in ("showinfo", "showwarning", "showerror"):
+        setattr(messagebox, name, lambda *args, **kwargs: "ok")
+    messagebox.askyesno = lambda *args, **kwargs: True
+
+    simpledialog = types.ModuleType("tkinter.simpledialog")
+    simpledialog.askstring = lambda *args, **kwargs: None
+    simpledialog.askfloat = lambda *args, **kwargs: None
+    filedialog = types.ModuleType("tkinter.filedialog")
+    filedialog.asksaveasfilename = lambda *args, **kwargs: ""
+    filedialog.askopenfilename = lambda *args, **kwargs: ""
+
+    tk.ttk = ttk
+    tk.messagebox = messagebox
+    tk.simpledialog = simpledialog
+    tk.filedialog = filedialog
+    sys.modules.update({
+        "tkinter": tk,
+        "tkinter.ttk": ttk,
+        "tkinter.messagebox": messagebox,
+        "tkinter.simpledialog": simpledialog,
+        "tkinter.filedialog": filedialog,
+    })
+    return tk
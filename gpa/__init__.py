@@ -0,0 +1 @@
+"""Headless building blocks shared by the Tkinter GPA calculator."""
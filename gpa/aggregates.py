@@ -0,0 +1,235 @@
+"""Running credit and quality-point totals per student and term.
+
+The ``term_totals`` table mirrors ``SUM(credits)`` and ``SUM(points * credits)``
+from ``courses`` for every (student_id, year, semester).  Writers adjust it by
+delta in the same transaction as the course change, so readers get cumulative
+figures without rescanning ``courses``.  A term only has a row while it holds
+credits; removing its last course removes the row.
+"""
+import argparse
+import sqlite3
+
+from gpa.grades import quality_points
+from gpa.scales import ScaleCache
+from gpa.snapshots import rebuild_snapshots
+
+# Totals that differ by less than this are treated as equal
+TOLERANCE = 1e-6
+
+
+def table_exists(cursor, name):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+    return cursor.fetchone() is not None
+
+
+def create_table(cursor):
+    """Create term_totals, rebuilding it from courses if it is new"""
+    exists = table_exists(cursor, 'term_totals')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS term_totals (
+            student_id TEXT NOT NULL,
+            year TEXT NOT NULL,
+            semester TEXT NOT NULL,
+            credits REAL NOT NULL DEFAULT 0,
+            quality_points REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (student_id, year, semester)
+        )
+    ''')
+
+    if not exists:
+        rebuild_totals(cursor)
+
+
+def compute_totals(cursor, student_id=None):
+    """Aggregate courses into {(student_id, year, semester): [credits, points]}
+
+    Each row is scored under the grading scale it was recorded with.  Terms
+    without credits are left out, as they are from term_totals.
+    """
+    # Group by scale and grade so the lookup runs once per group, not per row.
+    # Schemas older than the grading-scale migration score with grade_points.
+    cursor.execute('PRAGMA table_info(courses)')
+    scale_column = 'scale_id' if 'scale_id' in [row[1] for row in cursor.fetchall()] else 'NULL'
+    query = f'''
+        SELECT student_id, year, semester, {scale_column}, grade, SUM(credits) FROM courses
+    '''
+    params = ()
+    if student_id is not None:
+        query += ' WHERE student_id = ?'
+        params = (student_id,)
+    query += f' GROUP BY student_id, year, semester, {scale_column}, grade'
+
+    scales = ScaleCache(cursor.connection)
+    totals = {}
+    for student, year, semester, scale_id, grade, credits in cursor.execute(query, params).fetchall():
+        entry = totals.setdefault((student, year, semester), [0.0, 0.0])
+        entry[0] += credits
+        if scale_id is None:
+            entry[1] += quality_points(grade, credits)
+        else:
+            entry[1] += scales[scale_id].quality_points(grade, credits)
+    return {key: values for key, values in totals.items() if abs(values[0]) >= TOLERANCE}
+
+
+def rebuild_totals(cursor, student_id=None):
+    """Recreate term_totals rows from the courses table"""
+    totals = compute_totals(cursor, student_id)
+    if student_id is None:
+        cursor.execute('DELETE FROM term_totals')
+    else:
+        cursor.execute('DELETE FROM term_totals WHERE student_id = ?', (student_id,))
+    cursor.executemany('''
+        INSERT INTO term_totals (student_id, year, semester, credits, quality_points)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [key + tuple(values) for key, values in totals.items()])
+    # Snapshots are derived from term_totals (schema version 7 onwards)
+    if table_exists(cursor, 'term_snapshots'):
+        rebuild_snapshots(cursor, student_id)
+    return len(totals)
+
+
+def check_totals(cursor, student_id=None, repair=False):
+    """Compare term_totals with courses and return the mismatched term keys"""
+    expected = compute_totals(cursor, student_id)
+
+    query = 'SELECT student_id, year, semester, credits, quality_points FROM term_totals'
+    params = ()
+    if student_id is not None:
+        query += ' WHERE student_id = ?'
+        params = (student_id,)
+    stored = {row[:3]: row[3:] for row in cursor.execute(query, params)}
+
+    mismatched = []
+    for key in set(expected) | set(stored):
+        want = expected.get(key)
+        have = stored.get(key)
+        # A missing row, or a stored row for a term without credits, is drift too
+        if want is None or have is None or abs(want[0] - have[0]) > TOLERANCE \
+                or abs(want[1] - have[1]) > TOLERANCE:
+            mismatched.append(key)
+
+    if mismatched and repair:
+        rebuild_totals(cursor, student_id)
+    return sorted(mismatched)
+
+
+def apply_deltas(cursor, deltas):
+    """Add {(student_id, year, semester): (credits, points)} deltas to term_totals
+
+    Terms left without credits are deleted.  The caller owns the surrounding
+    transaction, so the totals commit or roll back together with the course
+    rows that produced them.
+    """
+    changed = [key + tuple(delta) for key, delta in deltas.items() if delta[0] or delta[1]]
+    cursor.executemany('''
+        INSERT INTO term_totals (student_id, year, semester, credits, quality_points)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (student_id, year, semester) DO UPDATE SET
+            credits = credits + excluded.credits,
+            quality_points = quality_points + excluded.quality_points
+    ''', changed)
+    # Rounding can leave a term whose courses were all removed a hair off zero
+    cursor.executemany('''
+        DELETE FROM term_totals
+        WHERE student_id = ? AND year = ? AND semester = ? AND ABS(credits) < ?
+    ''', [row[:3] + (TOLERANCE,) for row in changed])
+
+
+def add_course_delta(deltas, key, old, new):
+    """Accumulate the change from one (credits, points) pair to another; either may be None"""
+    entry = deltas.setdefault(key, [0.0, 0.0])
+    if old is not None:
+        entry[0] -= old[0]
+        entry[1] -= old[1]
+    if new is not None:
+        entry[0] += new[0]
+        entry[1] += new[1]
+
+
+def overlay_courses(credits, points, courses, saved, scale, names=None):
+    """Combine saved totals with unsaved rows for the same term
+
+    ``courses`` maps course name to the (grade, credits) shown on screen,
+    scored under ``scale``; ``saved`` maps it to the (grade, credits, points)
+    the database holds.  Shown rows replace their saved version.  ``names``
+    holds the name of every row on screen, complete or not; saved courses
+    missing from it will be deleted on save (a deleted or renamed row), so
+    they are taken out.  Returns the adjusted (credits, points).
+    """
+    if names is not None:
+        for course, previous in saved.items():
+            if course not in names:
+                credits -= previous[1]
+                points -= previous[2]
+    for course, current in courses.items():
+        previous = saved.get(course)
+        if previous is not None and previous[:2] == current:
+            continue
+        if previous is not None:
+            credits -= previous[1]
+            points -= previous[2]
+        credits += current[1]
+        points += scale.quality_points(*current)
+    return credits, points
+
+
+class TermTotals:
+    """In-memory view of one student's term_totals rows"""
+
+    def __init__(self, cursor, student_id='default_student'):
+        self.cursor = cursor
+        self.student_id = student_id
+        self.terms = {}
+        self.credits = 0.0
+        self.points = 0.0
+        self.load()
+
+    def load(self):
+        """(Re)read this student's totals from the database"""
+        self.cursor.execute('''
+            SELECT year, semester, credits, quality_points FROM term_totals
+            WHERE student_id = ?
+        ''', (self.student_id,))
+        self.terms = {(year, semester): [credits, points]
+                      for year, semester, credits, points in self.cursor.fetchall()}
+        self.credits = sum(values[0] for values in self.terms.values())
+        self.points = sum(values[1] for values in self.terms.values())
+
+    def term(self, year, semester):
+        """Return (credits, quality_points) saved for a single term"""
+        credits, points = self.terms.get((year, semester), (0.0, 0.0))
+        return credits, points
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check or rebuild the term_totals cache")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--db", default="data.db")
+    parser.add_argument("--student", default=None, help="limit to one student_id")
+    args = parser.parse_args(argv)
+
+    # Imported here because migrations builds on this module
+    from gpa.migrations import migrate
+
+    conn = sqlite3.connect(args.db)
+    migrate(conn)
+    cursor = conn.cursor()
+    if args.command == "rebuild":
+        count = rebuild_totals(cursor, args.student)
+        print(f"Rebuilt {count} term totals")
+    else:
+        mismatched = check_totals(cursor, args.student, repair=False)
+        for student, year, semester in mismatched:
+            print(f"Mismatch: {student} {year} {semester}")
+        print(f"{len(mismatched)} mismatched term totals")
+        if mismatched:
+            conn.close()
+            return 1
+    conn.commit()
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,254 @@
+"""Cohort analytics: GPA distribution, exact class rank and per-term trends.
+
+    python -m gpa.cohort --db data.db --workers 4
+    python -m gpa.cohort --db data.db --student student_000042 --output cohort.json
+
+Students are split into contiguous ``student_id`` ranges and the ranges are
+shared out to a ``ProcessPoolExecutor``.  Each worker opens its own
+read-only connection (``mode=ro``, memory-mapped) once and computes the
+cumulative GPA of every student in a range straight from ``courses`` with
+the engine's aggregate, so no GPA state has to be precomputed.  A shard
+comes back as a GPA-sorted list plus mergeable histogram and per-term sums;
+the parent merges the sorted lists, which gives exact ranks and percentiles
+without a second pass over the database.
+"""
+import argparse
+import heapq
+import json
+import math
+import os
+import sqlite3
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+from gpa.engine import aggregate_terms, compute_records
+from gpa.grades import term_key
+
+# Width of one histogram bucket in GPA points
+BIN_WIDTH = 0.1
+# Ranges per worker; more than one evens out uneven ranges
+SHARDS_PER_WORKER = 4
+# Bytes of the database file each worker maps into memory
+MMAP_SIZE = 256 * 1024 * 1024
+# Percentiles included in the summary
+SUMMARY_PERCENTILES = (10, 25, 50, 75, 90, 95, 99)
+
+# Read-only connection of a pool worker, opened by _init_worker
+_worker_conn = None
+
+
+def open_readonly(path):
+    """Open ``path`` read-only; fails instead of creating a missing file"""
+    uri = "file:" + quote(os.path.abspath(path)) + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    conn.execute(f'PRAGMA mmap_size = {MMAP_SIZE}')
+    conn.execute('PRAGMA cache_size = -65536')
+    return conn
+
+
+def _init_worker(path):
+    global _worker_conn
+    _worker_conn = open_readonly(path)
+
+
+def student_ranges(conn, shards):
+    """Split the students into at most ``shards`` (first, last) id ranges"""
+    ids = [row[0] for row in conn.execute(
+        'SELECT DISTINCT student_id FROM term_totals ORDER BY student_id')]
+    if not ids:
+        return []
+    size = math.ceil(len(ids) / max(1, shards))
+    return [(ids[start], ids[min(start + size, len(ids)) - 1])
+            for start in range(0, len(ids), size)]
+
+
+def analyze_range(conn, first, last):
+    """GPA results for students ``first``..``last`` (inclusive)
+
+    Returns (students, histogram, terms): students is [(cumulative_gpa,
+    student_id, credits)] highest GPA first, histogram a Counter of bucket
+    index, and terms {(year, semester): [students, semester GPA sum,
+    cumulative GPA sum]}.
+    """
+    rows = aggregate_terms(conn, student_range=(first, last))
+
+    latest = {}
+    terms = {}
+    for student_id, year, semester, semester_gpa, cumulative_gpa, credits in compute_records(rows):
+        entry = terms.get((year, semester))
+        if entry is None:
+            entry = terms[(year, semester)] = [0, 0.0, 0.0]
+        entry[0] += 1
+        entry[1] += semester_gpa
+        entry[2] += cumulative_gpa
+        # Records are chronological, so the last one per student wins
+        latest[student_id] = (cumulative_gpa, credits)
+
+    students = sorted(((gpa, student_id, credits)
+                       for student_id, (gpa, credits) in latest.items()), reverse=True)
+    histogram = Counter(int(gpa / BIN_WIDTH + 1e-9) for gpa, _, _ in students)
+    return students, histogram, terms
+
+
+def _analyze_shard(bounds):
+    return analyze_range(_worker_conn, *bounds)
+
+
+class CohortReport:
+    """Merged results of every shard"""
+
+    def __init__(self, shards):
+        # Ascending GPA with ids and credits in the same order
+        self.gpas = []
+        self.student_ids = []
+        self.credits = []
+        self.histogram = Counter()
+        self.terms = {}
+        merged = heapq.merge(*(students for students, _, _ in shards), reverse=True)
+        for gpa, student_id, credits in merged:
+            self.gpas.append(gpa)
+            self.student_ids.append(student_id)
+            self.credits.append(credits)
+        for values in (self.gpas, self.student_ids, self.credits):
+            values.reverse()
+        self.positions = {student_id: index for index, student_id in enumerate(self.student_ids)}
+        for _, histogram, terms in shards:
+            self.histogram.update(histogram)
+            for term, (count, semester_sum, cumulative_sum) in terms.items():
+                entry = self.terms.get(term)
+                if entry is None:
+                    entry = self.terms[term] = [0, 0.0, 0.0]
+                entry[0] += count
+                entry[1] += semester_sum
+                entry[2] += cumulative_sum
+
+    def __len__(self):
+        return len(self.gpas)
+
+    def percentile(self, q):
+        """Nearest-rank GPA at percentile ``q`` (0-100)"""
+        if not self.gpas:
+            return None
+        rank = max(1, math.ceil(q / 100 * len(self.gpas)))
+        return self.gpas[min(rank, len(self.gpas)) - 1]
+
+    def rank(self, student_id):
+        """Return (rank, percentile) for a student, or None if unknown
+
+        Rank is competition style: 1 + the number of students with a higher
+        GPA.  The percentile is the share of the cohort at or below them.
+        """
+        index = self.positions.get(student_id)
+        if index is None:
+            return None
+        gpa = self.gpas[index]
+        at_or_below = bisect_right(self.gpas, gpa)
+        return len(self.gpas) - at_or_below + 1, 100.0 * at_or_below / len(self.gpas)
+
+    def deans_list(self, top_percent):
+        """Return (cut GPA, students at or above it) for the top ``top_percent``
+
+        Students tied with the last place inside the cut are all included.
+        """
+        if not self.gpas:
+            return None, 0
+        places = max(1, math.ceil(top_percent / 100 * len(self.gpas)))
+        cut = self.gpas[len(self.gpas) - min(places, len(self.gpas))]
+        return cut, len(self.gpas) - bisect_left(self.gpas, cut)
+
+    def trend(self):
+        """Return [(year, semester, students, mean semester GPA, mean cumulative GPA)]"""
+        return [(year, semester, count, semester_sum / count, cumulative_sum / count)
+                for (year, semester), (count, semester_sum, cumulative_sum)
+                in sorted(self.terms.items(), key=lambda item: term_key(*item[0]))]
+
+    def to_dict(self, top_percent=10.0):
+        cut, listed = self.deans_list(top_percent)
+        return {
+            "students": len(self.gpas),
+            "mean_gpa": sum(self.gpas) / len(self.gpas) if self.gpas else None,
+            "percentiles": {str(q): self.percentile(q) for q in SUMMARY_PERCENTILES},
+            "deans_list": {"top_percent": top_percent, "cut": cut, "students": listed},
+            "histogram": [{"from": round(index * BIN_WIDTH, 2), "students": count}
+                          for index, count in sorted(self.histogram.items())],
+            "trend": [{"year": year, "semester": semester, "students": count,
+                       "mean_semester_gpa": semester_gpa, "mean_cumulative_gpa": cumulative_gpa}
+                      for year, semester, count, semester_gpa, cumulative_gpa in self.trend()],
+        }
+
+
+def analyze(path, workers=None, shards=None):
+    """Compute a CohortReport for the database at ``path``
+
+    ``workers`` of 0 runs every shard in this process (no pool), which is
+    the baseline the parallel runs are compared against.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if shards is None:
+        shards = max(1, workers) * SHARDS_PER_WORKER
+    conn = open_readonly(path)
+    try:
+        ranges = student_ranges(conn, shards)
+        if workers == 0:
+            return CohortReport([analyze_range(conn, first, last) for first, last in ranges])
+    finally:
+        conn.close()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(path,)) as pool:
+        return CohortReport(list(pool.map(_analyze_shard, ranges)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GPA distribution, rank and trends for every student")
+    parser.add_argument("--db", default="data.db")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count; 0 = no pool)")
+    parser.add_argument("--shards", type=int, default=None,
+                        help=f"student ranges (default: {SHARDS_PER_WORKER} per worker)")
+    parser.add_argument("--deans-list", type=float, default=10.0, metavar="PERCENT",
+                        help="top share of the cohort on the dean's list")
+    parser.add_argument("--student", action="append", default=[],
+                        help="print this student's rank (repeatable)")
+    parser.add_argument("--output", help="write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error(f"no database at {args.db}")
+    started = time.perf_counter()
+    report = analyze(args.db, args.workers, args.shards)
+    elapsed = time.perf_counter() - started
+    summary = report.to_dict(args.deans_list)
+
+    print(f"{len(report):,} students analyzed in {elapsed:.2f}s")
+    if not len(report):
+        return 0
+    print(f"Mean GPA {summary['mean_gpa']:.3f}; "
+          + ", ".join(f"p{q} {gpa:.2f}" for q, gpa in summary["percentiles"].items()))
+    cut, listed = report.deans_list(args.deans_list)
+    print(f"Dean's list (top {args.deans_list:g}%): GPA >= {cut:.3f}, {listed:,} students")
+    for year, semester, count, semester_gpa, cumulative_gpa in report.trend():
+        print(f"  {year} {semester:<12} {count:>8,} students  "
+              f"semester {semester_gpa:.3f}  cumulative {cumulative_gpa:.3f}")
+    for student_id in args.student:
+        result = report.rank(student_id)
+        if result is None:
+            print(f"{student_id}: no courses", file=sys.stderr)
+            continue
+        rank, percentile = result
+        gpa = report.gpas[report.positions[student_id]]
+        print(f"{student_id}: GPA {gpa:.3f}, rank {rank:,} of {len(report):,} "
+              f"({percentile:.1f}th percentile)")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            json.dump(summary, out, indent=2)
+            out.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
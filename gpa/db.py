@@ -0,0 +1,160 @@
+"""Connection setup and the bulk write path for the courses table."""
+import sqlite3
+
+from gpa.aggregates import add_course_delta, apply_deltas
+from gpa.journal import record_changes
+from gpa.scales import ScaleCache, active_scale, invalidate_students
+from gpa.snapshots import refresh_from_deltas
+
+# Rows per executemany call when importing large batches
+BATCH_SIZE = 5000
+
+# Connection pragmas tuned for a read-heavy desktop workload
+PRAGMAS = [
+    # Only takes effect before the first table is created, so new files get
+    # it and existing ones are left alone (see gpa.maintenance)
+    ('auto_vacuum', 'INCREMENTAL'),
+    ('journal_mode', 'WAL'),
+    # Safe with WAL: a crash can lose the last commit but never corrupts
+    ('synchronous', 'NORMAL'),
+    # Negative values are KiB, so roughly 64 MB of page cache
+    ('cache_size', -64000),
+    ('mmap_size', 256 * 1024 * 1024),
+    ('temp_store', 'MEMORY'),
+]
+
+
+# Class of the connections connect() creates; gpa.instrument swaps in a subclass
+_connection_factory = sqlite3.Connection
+
+
+def set_connection_factory(factory):
+    global _connection_factory
+    _connection_factory = factory
+
+
+def connect(path='data.db', check_same_thread=True):
+    """Open the database with WAL journaling and the tuned pragmas
+
+    Pass ``check_same_thread=False`` for connections handed between threads
+    (e.g. a pool); the caller must then ensure only one thread uses it at a time.
+    """
+    conn = sqlite3.connect(path, check_same_thread=check_same_thread,
+                           factory=_connection_factory)
+    for name, value in PRAGMAS:
+        conn.execute(f'PRAGMA {name} = {value}')
+    return conn
+
+
+def upsert_courses(conn, rows, scale=None):
+    """Insert or update courses in one transaction and keep term_totals in step
+
+    ``rows`` is an iterable of (student_id, year, semester, course_name, grade,
+    credits).  Later rows win over earlier rows with the same course.  New or
+    regraded rows are recorded under ``scale`` (default: the active scale);
+    unchanged rows keep the scale they were graded under.  Each actual
+    change is appended to the course journal.  Returns the number of rows
+    written.
+    """
+    scale = active_scale(conn) if scale is None else scale
+
+    # Collapse duplicates and group by term so old values are read once per term
+    latest = {}
+    for student_id, year, semester, course_name, grade, credits in rows:
+        latest[(student_id, year, semester, course_name)] = (grade, credits)
+    terms = {}
+    for (student_id, year, semester, course_name), value in latest.items():
+        terms.setdefault((student_id, year, semester), {})[course_name] = value
+
+    scales = ScaleCache(conn)
+    cursor = conn.cursor()
+    if not conn.in_transaction:
+        cursor.execute('BEGIN IMMEDIATE')
+    try:
+        deltas = {}
+        changes = []
+        for term, courses in terms.items():
+            cursor.execute('''
+                SELECT course_name, grade, credits, scale_id FROM courses
+                WHERE student_id = ? AND year = ? AND semester = ?
+            ''', term)
+            existing = {name: (grade, credits, scale_id)
+                        for name, grade, credits, scale_id in cursor.fetchall()}
+            for course_name, (grade, credits) in courses.items():
+                old = existing.get(course_name)
+                if old is not None and old[:2] == (grade, credits):
+                    continue
+                changes.append(term + (course_name, old, (grade, credits, scale.id)))
+                if old is not None:
+                    old = (old[1], scales[old[2]].quality_points(old[0], old[1]))
+                add_course_delta(deltas, term, old, (credits, scale.quality_points(grade, credits)))
+
+        params = [key + value + (scale.id,) for key, value in latest.items()]
+        for start in range(0, len(params), BATCH_SIZE):
+            cursor.executemany('''
+                INSERT INTO courses (student_id, year, semester, course_name, grade, credits,
+                                     scale_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (student_id, year, semester, course_name) DO UPDATE SET
+                    scale_id = CASE
+                        WHEN grade = excluded.grade AND credits = excluded.credits THEN scale_id
+                        ELSE excluded.scale_id
+                    END,
+                    grade = excluded.grade,
+                    credits = excluded.credits,
+                    date_added = CURRENT_TIMESTAMP
+            ''', params[start:start + BATCH_SIZE])
+
+        apply_deltas(cursor, deltas)
+        # Rewrites only the changed terms and those after them
+        refresh_from_deltas(cursor, deltas)
+        invalidate_students(cursor, {term[0] for term in deltas})
+        record_changes(cursor, changes)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return len(params)
+
+
+def delete_courses(conn, rows):
+    """Delete courses given as (student_id, year, semester, course_name) in one transaction
+
+    term_totals, snapshots and the journal are kept in step as in
+    upsert_courses.  Returns the number of rows deleted.
+    """
+    scales = ScaleCache(conn)
+    cursor = conn.cursor()
+    if not conn.in_transaction:
+        cursor.execute('BEGIN IMMEDIATE')
+    try:
+        deltas = {}
+        changes = []
+        for key in dict.fromkeys(rows):
+            cursor.execute('''
+                SELECT grade, credits, scale_id FROM courses
+                WHERE student_id = ? AND year = ? AND semester = ? AND course_name = ?
+            ''', key)
+            old = cursor.fetchone()
+            if old is None:
+                continue
+            cursor.execute('''
+                DELETE FROM courses
+                WHERE student_id = ? AND year = ? AND semester = ? AND course_name = ?
+            ''', key)
+            grade, credits, scale_id = old
+            changes.append(key + (old, None))
+            add_course_delta(deltas, key[:3],
+                             (credits, scales[scale_id].quality_points(grade, credits)),
+                             None)
+
+        apply_deltas(cursor, deltas)
+        refresh_from_deltas(cursor, deltas)
+        invalidate_students(cursor, {term[0] for term in deltas})
+        record_changes(cursor, changes)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return len(changes)
+
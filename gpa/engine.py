@@ -0,0 +1,140 @@
+"""Headless batch GPA engine.
+
+Recomputes semester and running cumulative GPA for every student and term
+from the ``courses`` table in a single aggregate pass, without Tkinter::
+
+    python -m gpa.engine recompute --db data.db
+"""
+import argparse
+import sqlite3
+import time
+
+from gpa.db import connect
+from gpa.grades import term_key
+from gpa.migrations import migrate
+
+
+def aggregate_terms(conn, student_ids=None, student_range=None):
+    """Yield (student_id, year, semester, credits, quality_points) per term
+
+    Limit the rows with ``student_ids`` or an inclusive (first, last)
+    ``student_range``.  Rows come back grouped by student; terms within a
+    student are unordered.  Each course is scored under the grading scale
+    it was recorded with.
+    """
+    query = '''
+        SELECT c.student_id, c.year, c.semester,
+               SUM(c.credits), SUM(c.credits * COALESCE(g.points, 0))
+        FROM courses AS c
+        LEFT JOIN grading_scale_points AS g
+            ON g.scale_id = c.scale_id AND g.grade = c.grade
+    '''
+    params = ()
+    if student_ids:
+        query += ' WHERE c.student_id IN (%s)' % ', '.join('?' * len(student_ids))
+        params = tuple(student_ids)
+    elif student_range is not None:
+        query += ' WHERE c.student_id BETWEEN ? AND ?'
+        params = tuple(student_range)
+    query += ' GROUP BY c.student_id, c.year, c.semester ORDER BY c.student_id'
+    return conn.execute(query, params)
+
+
+def running_gpa(terms):
+    """Turn one student's term totals into GPA rows in chronological order
+
+    ``terms`` holds (year, semester, credits, quality_points) tuples.  Returns
+    (year, semester, semester_gpa, cumulative_gpa, cumulative_credits) tuples.
+    """
+    records = []
+    total_credits = 0.0
+    total_points = 0.0
+    for year, semester, credits, points in sorted(terms, key=lambda t: term_key(t[0], t[1])):
+        total_credits += credits
+        total_points += points
+        semester_gpa = points / credits if credits > 0 else 0.0
+        cumulative_gpa = total_points / total_credits if total_credits > 0 else 0.0
+        records.append((year, semester, semester_gpa, cumulative_gpa, total_credits))
+    return records
+
+
+def compute_records(rows):
+    """Yield (student_id, year, semester, semester_gpa, cumulative_gpa, total_credits)
+
+    ``rows`` must be grouped by student, as returned by aggregate_terms.
+    """
+    current = None
+    terms = []
+    for student_id, year, semester, credits, points in rows:
+        if student_id != current:
+            if terms:
+                for record in running_gpa(terms):
+                    yield (current,) + record
+            current = student_id
+            terms = []
+        terms.append((year, semester, credits, points))
+    if terms:
+        for record in running_gpa(terms):
+            yield (current,) + record
+
+
+def cumulative_by_student(conn, student_ids=None):
+    """Return {student_id: (cumulative_gpa, total_credits)}"""
+    result = {}
+    for student_id, _, _, _, cumulative_gpa, total_credits in compute_records(
+            aggregate_terms(conn, student_ids)):
+        # Records are chronological, so the last one per student wins
+        result[student_id] = (cumulative_gpa, total_credits)
+    return result
+
+
+def write_records(conn, records):
+    """Upsert gpa_records for the given terms in a single transaction"""
+    records = list(records)
+    try:
+        conn.executemany('''
+            INSERT INTO gpa_records
+            (student_id, year, semester, semester_gpa, cumulative_gpa, total_credits)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (student_id, year, semester) DO UPDATE SET
+                semester_gpa = excluded.semester_gpa,
+                cumulative_gpa = excluded.cumulative_gpa,
+                total_credits = excluded.total_credits,
+                date_calculated = CURRENT_TIMESTAMP
+        ''', records)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return len(records)
+
+
+def recompute(conn, student_ids=None):
+    """Recompute and store gpa_records; returns (rows_written, seconds)"""
+    start = time.perf_counter()
+    count = write_records(conn, compute_records(aggregate_terms(conn, student_ids)))
+    return count, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch GPA engine")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    recompute_parser = subparsers.add_parser(
+        "recompute", help="recompute gpa_records for every student and term")
+    recompute_parser.add_argument("--db", default="data.db")
+    recompute_parser.add_argument("--student", action="append", dest="students",
+                                  help="limit to a student_id (repeatable)")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    migrate(conn)
+    count, elapsed = recompute(conn, args.students)
+    conn.close()
+
+    rate = count / elapsed if elapsed > 0 else float("inf")
+    print(f"Wrote {count} gpa_records in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
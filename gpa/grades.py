@@ -0,0 +1,24 @@
+"""Grading scale used across the app and the headless tools."""
+
+# Grade to GPA mapping
+grade_points = {
+    "A+": 4.0, "A": 4.0, "A-": 3.7, "B+": 3.3, "B": 3.0, "B-": 2.7,
+    "C+": 2.3, "C": 2.0, "C-": 1.7, "D+": 1.3, "D": 1.1,
+    "D-": 1.0, "F": 0.0
+}
+
+
+def quality_points(grade, credits):
+    """Grade points weighted by credits (unknown grades count as 0)"""
+    return grade_points.get(grade, 0) * credits
+
+# Academic terms in chronological order
+YEARS = ["Year 1", "Year 2", "Year 3", "Year 4", "Year 5"]
+SEMESTERS = ["Semester 1", "Semester 2", "Summer"]
+
+
+def term_key(year, semester):
+    """Sort key placing (year, semester) pairs in chronological order"""
+    year_index = YEARS.index(year) if year in YEARS else len(YEARS)
+    semester_index = SEMESTERS.index(semester) if semester in SEMESTERS else len(SEMESTERS)
+    return (year_index, year, semester_index, semester)
@@ -0,0 +1,355 @@
+"""Virtualized course grid for the Tkinter app.
+
+Course data lives in a plain list of ``[course, grade, credits]`` strings.
+Only enough row widgets to fill the visible area are created; scrolling
+rebinds that fixed pool to different model indices instead of creating or
+destroying widgets, so large semesters stay responsive.
+
+Every edit is recorded in an ``EditHistory`` as a delta naming one row, so
+undo and redo touch that row of the model and at most the visible slots.
+"""
+import tkinter as tk
+from collections import deque
+from tkinter import ttk
+
+# Fallback row height in pixels until Tk reports the real one
+DEFAULT_ROW_HEIGHT = 28
+# Edits kept for undo; the oldest are dropped first
+UNDO_LIMIT = 500
+
+INSERT = "insert"
+DELETE = "delete"
+SET = "set"
+
+
+class EditHistory:
+    """Undo and redo stacks of row deltas
+
+    Entries are (INSERT, index, values), (DELETE, index, values) or
+    (SET, index, old_values, new_values).  Consecutive edits to the same
+    cell are merged, so undo reverts a typed word rather than one keystroke.
+    """
+
+    def __init__(self, limit=UNDO_LIMIT):
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+        # (index, column) of the cell the last merged SET came from
+        self._cell = None
+
+    def record(self, entry, cell=None):
+        if (cell is not None and cell == self._cell and self.undo_stack
+                and self.undo_stack[-1][0] == SET):
+            self.undo_stack[-1] = self.undo_stack[-1][:3] + (entry[3],)
+        else:
+            self.undo_stack.append(entry)
+        self._cell = cell
+        self.redo_stack.clear()
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self._cell = None
+
+    def pop_undo(self):
+        self._cell = None
+        if not self.undo_stack:
+            return None
+        entry = self.undo_stack.pop()
+        self.redo_stack.append(entry)
+        return entry
+
+    def pop_redo(self):
+        self._cell = None
+        if not self.redo_stack:
+            return None
+        entry = self.redo_stack.pop()
+        self.undo_stack.append(entry)
+        return entry
+
+
+
+class _RowSlot:
+    """One recycled row of widgets bound to a model index (or None)"""
+
+    def __init__(self, grid, position, grade_values):
+        self.grid = grid
+        self.index = None
+
+        self.course_var = tk.StringVar()
+        self.grade_var = tk.StringVar()
+        self.credits_var = tk.StringVar()
+
+        frame = grid.rows_frame
+        self.course_entry = tk.Entry(frame, width=25, font=("Arial", 10),
+                                     textvariable=self.course_var)
+        self.grade_dropdown = ttk.Combobox(frame, textvariable=self.grade_var,
+                                           values=grade_values, width=8)
+        self.credits_entry = tk.Entry(frame, width=8, font=("Arial", 10),
+                                      textvariable=self.credits_var)
+        self.delete_button = tk.Button(frame, text="Delete",
+                                       command=lambda: grid.request_delete(self.index),
+                                       bg="red", fg="white", font=("Arial", 8))
+        self.widgets = (self.course_entry, self.grade_dropdown,
+                        self.credits_entry, self.delete_button)
+        for column, widget in enumerate(self.widgets):
+            widget.grid(row=position, column=column, padx=2, pady=2)
+            grid.bind_wheel(widget)
+
+        # Column order matches the model: course, grade, credits
+        for column, var in enumerate((self.course_var, self.grade_var, self.credits_var)):
+            var.trace_add("write", lambda *args, column=column, var=var:
+                          grid.on_slot_edit(self, column, var.get()))
+
+    def bind_to(self, index, values):
+        """Show model row ``index`` (or hide the slot when index is None)"""
+        self.index = index
+        if index is None:
+            for widget in self.widgets:
+                widget.grid_remove()
+            return
+        self.course_var.set(values[0])
+        self.grade_var.set(values[1])
+        self.credits_var.set(values[2])
+        for widget in self.widgets:
+            widget.grid()
+
+    def destroy(self):
+        for widget in self.widgets:
+            widget.destroy()
+
+
+class CourseGrid:
+    """Scrollable course table that materializes widgets for visible rows only
+
+    ``on_change`` is called after the user edits a cell and after undo or
+    redo.  ``on_delete`` receives the model index when a row's Delete
+    button is pressed and defaults to deleting that row.
+    """
+
+    def __init__(self, master, grade_values, visible_rows=8, bg="#f0f0f0",
+                 on_change=None, on_delete=None):
+        self.rows = []
+        self.top = 0
+        self.slots = []
+        self.grade_values = list(grade_values)
+        self.row_height = DEFAULT_ROW_HEIGHT
+        self.on_change = on_change
+        self.on_delete = on_delete
+        self.history = EditHistory()
+        # Set while slots are rebound so variable traces don't write back
+        self._binding = False
+
+        self.frame = tk.Frame(master, bg=bg)
+        self.rows_frame = tk.Frame(self.frame, bg=bg)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self.yview)
+        self.rows_frame.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.bind_wheel(self.rows_frame)
+        self.rows_frame.bind("<Configure>", self._on_resize)
+
+        self._ensure_slots(visible_rows)
+
+    # -- model -------------------------------------------------------------
+
+    def set_rows(self, rows):
+        """Replace the whole model, e.g. when switching terms; clears undo history"""
+        self.rows = [[str(course), str(grade), str(credits)] for course, grade, credits in rows]
+        self.top = 0
+        self.history.clear()
+        self.render()
+
+    def append(self, course="", grade="A", credits=""):
+        """Add a row at the end and scroll it into view; returns its index"""
+        values = [str(course), str(grade), str(credits)]
+        self.rows.append(values)
+        index = len(self.rows) - 1
+        self.history.record((INSERT, index, tuple(values)))
+        self.see(index)
+        return index
+
+    def insert(self, index, values):
+        """Insert a [course, grade, credits] row at ``index``"""
+        values = [str(value) for value in values]
+        self.rows.insert(index, values)
+        self.history.record((INSERT, index, tuple(values)))
+        self.render()
+
+    def delete(self, index):
+        """Remove a row by index without rebuilding any widgets"""
+        if 0 <= index < len(self.rows):
+            self.history.record((DELETE, index, tuple(self.rows[index])))
+            del self.rows[index]
+            self._clamp_top()
+            self.render()
+
+    def set_row(self, index, values):
+        """Overwrite one row, refreshing only its slot if it is visible"""
+        values = [str(value) for value in values]
+        self.history.record((SET, index, tuple(self.rows[index]), tuple(values)))
+        self.rows[index] = values
+        slot = self._slot_for(index)
+        if slot is not None:
+            self._bind_slot(slot, index)
+
+    def undo(self):
+        """Revert the latest edit; returns False when there is nothing to undo"""
+        entry = self.history.pop_undo()
+        if entry is None:
+            return False
+        kind, index = entry[:2]
+        if kind == INSERT:
+            self._remove_row(index)
+        elif kind == DELETE:
+            self._insert_row(index, entry[2])
+        else:
+            self._store_row(index, entry[2])
+        self._changed()
+        return True
+
+    def redo(self):
+        """Reapply the latest undone edit; returns False when there is none"""
+        entry = self.history.pop_redo()
+        if entry is None:
+            return False
+        kind, index = entry[:2]
+        if kind == INSERT:
+            self._insert_row(index, entry[2])
+        elif kind == DELETE:
+            self._remove_row(index)
+        else:
+            self._store_row(index, entry[3])
+        self._changed()
+        return True
+
+    def _insert_row(self, index, values):
+        self.rows.insert(index, list(values))
+        self.see(index)
+
+    def _remove_row(self, index):
+        del self.rows[index]
+        self._clamp_top()
+        self.render()
+
+    def _store_row(self, index, values):
+        """Overwrite one row and bring it into view"""
+        self.rows[index] = list(values)
+        slot = self._slot_for(index)
+        if slot is None:
+            self.see(index)
+        else:
+            self._bind_slot(slot, index)
+
+    def request_delete(self, index):
+        if index is None:
+            return
+        if self.on_delete is not None:
+            self.on_delete(index)
+        else:
+            self.delete(index)
+
+    def on_slot_edit(self, slot, column, value):
+        if self._binding or slot.index is None:
+            return
+        row = self.rows[slot.index]
+        old = tuple(row)
+        row[column] = value
+        self.history.record((SET, slot.index, old, tuple(row)), cell=(slot.index, column))
+        self._changed()
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+    # -- view --------------------------------------------------------------
+
+    def render(self):
+        """Rebind every slot to the rows currently in view"""
+        for position, slot in enumerate(self.slots):
+            index = self.top + position
+            self._bind_slot(slot, index if index < len(self.rows) else None)
+        self._update_scrollbar()
+
+    def see(self, index):
+        """Scroll so that ``index`` is visible"""
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + len(self.slots):
+            self.top = index - len(self.slots) + 1
+        self._clamp_top()
+        self.render()
+
+    def yview(self, *args):
+        """Scrollbar protocol: ("moveto", fraction) or ("scroll", n, units|pages)"""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= max(1, len(self.slots) - 1)
+            self.top += step
+        self._clamp_top()
+        self.render()
+
+    def bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        # X11 reports the wheel as buttons 4 and 5
+        widget.bind("<Button-4>", lambda event: self.yview("scroll", -1, "units"))
+        widget.bind("<Button-5>", lambda event: self.yview("scroll", 1, "units"))
+
+    def set_grade_values(self, grade_values):
+        """Change the grades offered in every row's dropdown"""
+        self.grade_values = list(grade_values)
+        for slot in self.slots:
+            slot.grade_dropdown.config(values=self.grade_values)
+
+    def set_background(self, color):
+        for widget in (self.frame, self.rows_frame):
+            try:
+                widget.config(bg=color)
+            except tk.TclError:
+                pass
+
+    def _on_wheel(self, event):
+        self.yview("scroll", -1 if event.delta > 0 else 1, "units")
+
+    def _on_resize(self, event):
+        if self.slots:
+            self.row_height = max(self.slots[0].course_entry.winfo_reqheight() + 4,
+                                  DEFAULT_ROW_HEIGHT // 2)
+        wanted = max(1, event.height // self.row_height)
+        if wanted > len(self.slots):
+            self._ensure_slots(wanted)
+            self._clamp_top()
+            self.render()
+
+    def _ensure_slots(self, count):
+        while len(self.slots) < count:
+            self.slots.append(_RowSlot(self, len(self.slots), self.grade_values))
+        self.render()
+
+    def _slot_for(self, index):
+        position = index - self.top
+        if 0 <= position < len(self.slots):
+            return self.slots[position]
+        return None
+
+    def _bind_slot(self, slot, index):
+        self._binding = True
+        try:
+            slot.bind_to(index, self.rows[index] if index is not None else None)
+        finally:
+            self._binding = False
+
+    def _clamp_top(self):
+        self.top = max(0, min(self.top, len(self.rows) - len(self.slots)))
+
+    def _update_scrollbar(self):
+        if not self.rows:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        first = self.top / len(self.rows)
+        last = min(1.0, (self.top + len(self.slots)) / len(self.rows))
+        self.scrollbar.set(first, last)
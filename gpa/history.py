@@ -0,0 +1,133 @@
+"""Lazily paged GPA history viewer.
+
+Records are read with keyset pagination over the unique
+(student_id, year, semester) index, so opening the window costs one page
+no matter how large gpa_records grows.  The next page is fetched when the
+scrollbar nears the bottom, and year/semester filters are applied in SQL.
+Since the unique key was added each term holds a single, latest record.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+from gpa.grades import SEMESTERS, YEARS
+
+PAGE_SIZE = 100
+# Fetch the next page once the view shows past this fraction of loaded rows
+PREFETCH_AT = 0.9
+
+ALL = "All"
+
+
+class HistoryPager:
+    """Keyset-paginated reader for one student's gpa_records"""
+
+    def __init__(self, conn, student_id, year=None, semester=None, page_size=PAGE_SIZE):
+        self.conn = conn
+        self.student_id = student_id
+        self.year = year
+        self.semester = semester
+        self.page_size = page_size
+        self.last_key = None
+        self.exhausted = False
+
+    def next_page(self):
+        """Return the next list of record tuples (empty once exhausted)"""
+        if self.exhausted:
+            return []
+
+        query = '''
+            SELECT year, semester, semester_gpa, cumulative_gpa, total_credits, date_calculated
+            FROM gpa_records
+            WHERE student_id = ?
+        '''
+        params = [self.student_id]
+        if self.year:
+            query += ' AND year = ?'
+            params.append(self.year)
+        if self.semester:
+            query += ' AND semester = ?'
+            params.append(self.semester)
+        if self.last_key is not None:
+            query += ' AND (year, semester) > (?, ?)'
+            params.extend(self.last_key)
+        query += ' ORDER BY year, semester LIMIT ?'
+        params.append(self.page_size)
+
+        rows = self.conn.execute(query, params).fetchall()
+        if len(rows) < self.page_size:
+            self.exhausted = True
+        if rows:
+            self.last_key = rows[-1][:2]
+        return rows
+
+
+class HistoryWindow:
+    """Toplevel showing gpa_records a page at a time"""
+
+    columns = ("Year", "Semester", "Semester GPA", "Cumulative GPA", "Total Credits", "Date")
+
+    def __init__(self, master, conn, student_id, page_size=PAGE_SIZE):
+        self.conn = conn
+        self.student_id = student_id
+        self.page_size = page_size
+        self.pager = None
+
+        self.window = tk.Toplevel(master)
+        self.window.title("All GPA Records")
+        self.window.geometry("700x500")
+
+        # Filters
+        filter_frame = tk.Frame(self.window)
+        filter_frame.pack(fill="x", pady=5)
+        tk.Label(filter_frame, text="Year:").pack(side="left", padx=5)
+        self.year_var = tk.StringVar(value=ALL)
+        year_combo = ttk.Combobox(filter_frame, textvariable=self.year_var,
+                                  values=[ALL] + YEARS, width=10, state="readonly")
+        year_combo.pack(side="left")
+        tk.Label(filter_frame, text="Semester:").pack(side="left", padx=5)
+        self.semester_var = tk.StringVar(value=ALL)
+        semester_combo = ttk.Combobox(filter_frame, textvariable=self.semester_var,
+                                      values=[ALL] + SEMESTERS, width=12, state="readonly")
+        semester_combo.pack(side="left")
+        for combo in (year_combo, semester_combo):
+            combo.bind("<<ComboboxSelected>>", lambda event: self.reload())
+
+        # Create Treeview for displaying records
+        body = tk.Frame(self.window)
+        body.pack(fill="both", expand=True)
+        self.tree = ttk.Treeview(body, columns=self.columns, show="headings", height=15)
+        for col in self.columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100)
+
+        self.scrollbar = ttk.Scrollbar(body, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_scroll)
+
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.reload()
+
+    def reload(self):
+        """Start over with the current filters"""
+        year = self.year_var.get()
+        semester = self.semester_var.get()
+        self.pager = HistoryPager(self.conn, self.student_id,
+                                  None if year == ALL else year,
+                                  None if semester == ALL else semester,
+                                  self.page_size)
+        self.tree.delete(*self.tree.get_children())
+        self.load_page()
+
+    def load_page(self):
+        for year, semester, sem_gpa, cum_gpa, credits, date in self.pager.next_page():
+            date_formatted = date.split()[0] if date else "N/A"  # Just show date part
+            self.tree.insert("", "end", values=(year, semester, f"{sem_gpa:.2f}",
+                                                f"{cum_gpa:.2f}", f"{credits:.1f}",
+                                                date_formatted))
+
+    def on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if float(last) >= PREFETCH_AT and not self.pager.exhausted:
+            # Defer so the Treeview finishes its own scroll update first
+            self.window.after_idle(self.load_page)
@@ -0,0 +1,240 @@
+"""Opt-in timing of SQL statements and UI hot paths.
+
+    python V2.0.py --instrument                  # F12 opens the overlay
+    python V2.0.py --instrument-dump perf.json   # also write stats on exit
+
+When enabled, ``install()`` makes ``gpa.db.connect`` create
+``InstrumentedConnection`` objects whose cursors time every statement,
+count the rows fetched and the SQLite VM steps spent (a proxy for rows
+scanned), and ``instrument_methods`` replaces chosen methods on one object
+with timed wrappers.  Nothing is patched unless instrumentation is turned
+on, so a normal run executes exactly the same code as before.
+"""
+import json
+import sqlite3
+import threading
+import time
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+
+import gpa.db
+
+# VM instructions between progress-handler calls; counted steps are multiples of this
+PROGRESS_STEPS = 100
+# Longest SQL label kept, after whitespace is collapsed
+LABEL_LENGTH = 160
+# Milliseconds between overlay refreshes
+OVERLAY_REFRESH_MS = 1000
+
+def sql_label(sql):
+    return " ".join(sql.split())[:LABEL_LENGTH]
+
+
+class Instrumentation:
+    """Thread-safe call counts and timings keyed by (kind, name)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (kind, name) -> [calls, seconds, max seconds, rows, vm steps]
+        self._stats = {}
+        self.started = time.time()
+
+    def record(self, kind, name, seconds, rows=0, steps=0, calls=1):
+        with self._lock:
+            entry = self._stats.get((kind, name))
+            if entry is None:
+                entry = self._stats[(kind, name)] = [0, 0.0, 0.0, 0, 0]
+            entry[0] += calls
+            entry[1] += seconds
+            if calls and seconds > entry[2]:
+                entry[2] = seconds
+            entry[3] += rows
+            entry[4] += steps
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        """Return one dict per entry, most total time first"""
+        with self._lock:
+            items = [(key, list(entry)) for key, entry in self._stats.items()]
+        rows = []
+        for (kind, name), (calls, seconds, longest, fetched, steps) in items:
+            rows.append({"kind": kind, "name": name, "calls": calls,
+                         "total_ms": seconds * 1000,
+                         "mean_ms": seconds * 1000 / calls if calls else 0.0,
+                         "max_ms": longest * 1000, "rows": fetched, "vm_steps": steps})
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as out:
+            json.dump({"started": self.started, "dumped": time.time(),
+                       "stats": self.snapshot()}, out, indent=2)
+            out.write("\n")
+
+    def timed(self, kind, name, func):
+        """Wrap ``func`` so each call is recorded under (kind, name)"""
+        record = self.record
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(kind, name, time.perf_counter() - start)
+
+        wrapper.__name__ = getattr(func, "__name__", name)
+        wrapper.__doc__ = getattr(func, "__doc__", None)
+        return wrapper
+
+    def instrument_methods(self, obj, names):
+        """Shadow bound methods on ``obj`` with timed wrappers
+
+        Call this before the methods are handed out as callbacks (e.g.
+        before building widgets), since earlier references stay untimed.
+        """
+        for name in names:
+            setattr(obj, name, self.timed("ui", f"{type(obj).__name__}.{name}",
+                                          getattr(obj, name)))
+
+    def install(self):
+        """Make gpa.db.connect return instrumented connections"""
+        gpa.db.set_connection_factory(type("InstrumentedConnection", (InstrumentedConnection,),
+                                           {"instrumentation": self}))
+
+    def uninstall(self):
+        gpa.db.set_connection_factory(sqlite3.Connection)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that reports statement time, rows fetched and VM steps"""
+
+    _label = None
+
+    def _report(self, start, steps_before, rows=0, calls=0):
+        conn = self.connection
+        conn.instrumentation.record("sql", self._label, time.perf_counter() - start, rows,
+                                    conn.vm_steps - steps_before, calls)
+
+    def execute(self, sql, parameters=()):
+        self._label = sql_label(sql)
+        start, steps = time.perf_counter(), self.connection.vm_steps
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._report(start, steps, calls=1)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._label = sql_label(sql)
+        start, steps = time.perf_counter(), self.connection.vm_steps
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._report(start, steps, rows=max(self.rowcount, 0), calls=1)
+
+    def fetchone(self):
+        start, steps = time.perf_counter(), self.connection.vm_steps
+        row = super().fetchone()
+        self._report(start, steps, rows=row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        start, steps = time.perf_counter(), self.connection.vm_steps
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._report(start, steps, rows=len(rows))
+        return rows
+
+    def fetchall(self):
+        start, steps = time.perf_counter(), self.connection.vm_steps
+        rows = super().fetchall()
+        self._report(start, steps, rows=len(rows))
+        return rows
+
+    def __next__(self):
+        start, steps = time.perf_counter(), self.connection.vm_steps
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._report(start, steps)
+            raise
+        self._report(start, steps, rows=1)
+        return row
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors are InstrumentedCursors"""
+
+    # Set on the subclass created by Instrumentation.install
+    instrumentation = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.vm_steps = 0
+        self.set_progress_handler(self._progress, PROGRESS_STEPS)
+
+    def _progress(self):
+        self.vm_steps += PROGRESS_STEPS
+        return 0
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class PerfOverlay:
+    """Toplevel listing the hottest statements and UI paths, refreshed live"""
+
+    columns = ("Kind", "Name", "Calls", "Total ms", "Mean ms", "Max ms", "Rows", "VM steps")
+
+    def __init__(self, master, instrumentation):
+        self.instrumentation = instrumentation
+        self.window = tk.Toplevel(master)
+        self.window.title("Performance")
+        self.window.geometry("900x400")
+
+        button_frame = tk.Frame(self.window)
+        button_frame.pack(fill="x", pady=5)
+        tk.Button(button_frame, text="Reset", command=self.reset).pack(side="left", padx=5)
+        tk.Button(button_frame, text="Dump JSON", command=self.dump).pack(side="left")
+
+        self.tree = ttk.Treeview(self.window, columns=self.columns, show="headings")
+        for col in self.columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=420 if col == "Name" else 70,
+                             anchor="w" if col in ("Kind", "Name") else "e")
+        self.tree.pack(fill="both", expand=True)
+        self.refresh()
+
+    def refresh(self):
+        """Repopulate the table and schedule the next refresh"""
+        if not self.window.winfo_exists():
+            return
+        self._populate()
+        self.window.after(OVERLAY_REFRESH_MS, self.refresh)
+
+    def _populate(self):
+        self.tree.delete(*self.tree.get_children())
+        for row in self.instrumentation.snapshot():
+            self.tree.insert("", "end", values=(
+                row["kind"], row["name"], row["calls"], f"{row['total_ms']:.1f}",
+                f"{row['mean_ms']:.2f}", f"{row['max_ms']:.2f}", row["rows"], row["vm_steps"]))
+
+    def reset(self):
+        self.instrumentation.reset()
+        # The refresh loop started in __init__ keeps running; don't start another
+        self._populate()
+
+    def dump(self):
+        path = filedialog.asksaveasfilename(parent=self.window, defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            self.instrumentation.dump(path)
+            messagebox.showinfo("Performance", f"Wrote {path}", parent=self.window)
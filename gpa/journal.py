@@ -0,0 +1,236 @@
+"""Append-only journal of course changes with point-in-time transcripts.
+
+    python -m gpa.journal log --student default_student
+    python -m gpa.journal show --student default_student --at 120
+    python -m gpa.journal show --student default_student --time "2026-01-31 23:59:59"
+
+Every write through ``gpa.db`` appends one ``course_journal`` row per
+course added, edited, regraded or deleted, holding the old and new
+(grade, credits, scale_id).  Rows are never updated or removed.  After
+``CHECKPOINT_INTERVAL`` entries for a student, a checkpoint stores that
+student's transcript as of the latest entry.
+
+A past transcript is rebuilt by replaying deltas from whichever end is
+nearer: forward from the closest checkpoint at or before the target, or
+backward from the live ``courses`` rows by undoing newer entries.  Neither
+direction needs a copy of the database.
+"""
+import argparse
+import json
+import sys
+
+from gpa.grades import term_key
+
+# Journal entries per student between checkpoints
+CHECKPOINT_INTERVAL = 100
+
+ADD = "add"
+EDIT = "edit"
+GRADE = "grade"
+DELETE = "delete"
+
+
+def create_tables(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS course_journal (
+            -- No AUTOINCREMENT: rows are never deleted, so rowids are never reused
+            seq INTEGER PRIMARY KEY,
+            student_id TEXT NOT NULL,
+            year TEXT NOT NULL,
+            semester TEXT NOT NULL,
+            course_name TEXT NOT NULL,
+            op TEXT NOT NULL,
+            old_grade TEXT,
+            old_credits REAL,
+            old_scale_id INTEGER,
+            new_grade TEXT,
+            new_credits REAL,
+            new_scale_id INTEGER,
+            recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_course_journal_student
+        ON course_journal (student_id, seq)
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS journal_checkpoints (
+            student_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            courses TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (student_id, seq)
+        )
+    ''')
+
+
+def classify(old, new):
+    """Name the change between two (grade, credits, ...) values; either may be None"""
+    if old is None:
+        return ADD
+    if new is None:
+        return DELETE
+    if old[1] == new[1]:
+        return GRADE
+    return EDIT
+
+
+def record_changes(cursor, changes):
+    """Append journal rows and checkpoint students that are due
+
+    ``changes`` holds (student_id, year, semester, course_name, old, new)
+    where old and new are (grade, credits, scale_id) or None.  Runs inside
+    the caller's transaction, after the course rows have been written.
+    """
+    rows = []
+    students = set()
+    for student_id, year, semester, course_name, old, new in changes:
+        rows.append((student_id, year, semester, course_name, classify(old, new))
+                    + (old or (None, None, None)) + (new or (None, None, None)))
+        students.add(student_id)
+    cursor.executemany('''
+        INSERT INTO course_journal
+        (student_id, year, semester, course_name, op,
+         old_grade, old_credits, old_scale_id, new_grade, new_credits, new_scale_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    for student_id in students:
+        cursor.execute('''
+            SELECT COUNT(*), MAX(seq) FROM course_journal
+            WHERE student_id = ? AND seq > COALESCE(
+                (SELECT MAX(seq) FROM journal_checkpoints WHERE student_id = ?), 0)
+        ''', (student_id, student_id))
+        pending, last_seq = cursor.fetchone()
+        if pending >= CHECKPOINT_INTERVAL:
+            write_checkpoint(cursor, student_id, last_seq)
+    return len(rows)
+
+
+def _live_courses(cursor, student_id):
+    cursor.execute('''
+        SELECT year, semester, course_name, grade, credits, scale_id FROM courses
+        WHERE student_id = ?
+    ''', (student_id,))
+    return {(year, semester, name): (grade, credits, scale_id)
+            for year, semester, name, grade, credits, scale_id in cursor.fetchall()}
+
+
+def write_checkpoint(cursor, student_id, seq):
+    """Store the student's live transcript as the state after journal entry ``seq``"""
+    courses = [list(key) + list(value) for key, value in
+               sorted(_live_courses(cursor, student_id).items())]
+    cursor.execute('''
+        INSERT OR REPLACE INTO journal_checkpoints (student_id, seq, courses)
+        VALUES (?, ?, ?)
+    ''', (student_id, seq, json.dumps(courses, separators=(",", ":"))))
+
+
+def latest_seq(cursor, student_id):
+    cursor.execute('SELECT MAX(seq) FROM course_journal WHERE student_id = ?', (student_id,))
+    return cursor.fetchone()[0] or 0
+
+
+def seq_at(cursor, student_id, timestamp):
+    """Last journal entry recorded at or before ``timestamp`` ('YYYY-MM-DD HH:MM:SS', UTC)"""
+    cursor.execute('''
+        SELECT MAX(seq) FROM course_journal WHERE student_id = ? AND recorded_at <= ?
+    ''', (student_id, timestamp))
+    return cursor.fetchone()[0] or 0
+
+
+def _entries(cursor, student_id, after, upto, descending=False):
+    cursor.execute(f'''
+        SELECT year, semester, course_name, old_grade, old_credits, old_scale_id,
+               new_grade, new_credits, new_scale_id
+        FROM course_journal
+        WHERE student_id = ? AND seq > ? AND seq <= ?
+        ORDER BY seq {'DESC' if descending else 'ASC'}
+    ''', (student_id, after, upto))
+    return cursor.fetchall()
+
+
+def _apply(courses, key, value):
+    if value[0] is None:
+        courses.pop(key, None)
+    else:
+        courses[key] = value
+
+
+def transcript_at(cursor, student_id, seq=None):
+    """Return the student's courses just after journal entry ``seq`` (default: now)
+
+    Rows are (year, semester, course_name, grade, credits, scale_id) in
+    chronological term order.
+    """
+    head = latest_seq(cursor, student_id)
+    seq = head if seq is None else min(seq, head)
+    cursor.execute('''
+        SELECT seq, courses FROM journal_checkpoints
+        WHERE student_id = ? AND seq <= ? ORDER BY seq DESC LIMIT 1
+    ''', (student_id, seq))
+    checkpoint = cursor.fetchone()
+
+    # Replay whichever side has fewer entries; seq numbers are shared by all
+    # students, so this only estimates the count of this student's entries
+    if checkpoint is not None and seq - checkpoint[0] <= head - seq:
+        courses = {tuple(row[:3]): tuple(row[3:]) for row in json.loads(checkpoint[1])}
+        for entry in _entries(cursor, student_id, checkpoint[0], seq):
+            _apply(courses, entry[:3], entry[6:])
+    else:
+        courses = _live_courses(cursor, student_id)
+        for entry in _entries(cursor, student_id, seq, head, descending=True):
+            _apply(courses, entry[:3], entry[3:6])
+
+    return sorted((key + value for key, value in courses.items()),
+                  key=lambda row: (term_key(row[0], row[1]), row[2]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Course change journal")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    log_parser = subparsers.add_parser("log", help="list journal entries")
+    log_parser.add_argument("--limit", type=int, default=50)
+    show_parser = subparsers.add_parser("show", help="print a transcript as of a past point")
+    show_parser.add_argument("--at", type=int, default=None, metavar="SEQ",
+                             help="journal entry to stop at (default: latest)")
+    show_parser.add_argument("--time", default=None,
+                             help="stop at the last entry recorded by this UTC time")
+    for subparser in (log_parser, show_parser):
+        subparser.add_argument("--db", default="data.db")
+        subparser.add_argument("--student", default="default_student")
+    args = parser.parse_args(argv)
+
+    # Imported here because migrations builds on this module
+    from gpa.db import connect
+    from gpa.migrations import migrate
+
+    conn = connect(args.db)
+    migrate(conn)
+    cursor = conn.cursor()
+    if args.command == "log":
+        cursor.execute('''
+            SELECT seq, recorded_at, op, year, semester, course_name,
+                   old_grade, old_credits, new_grade, new_credits
+            FROM course_journal WHERE student_id = ?
+            ORDER BY seq DESC LIMIT ?
+        ''', (args.student, args.limit))
+        for seq, recorded_at, op, year, semester, name, old_grade, old_credits, \
+                new_grade, new_credits in cursor.fetchall():
+            old = f"{old_grade} ({old_credits:g})" if old_grade is not None else "-"
+            new = f"{new_grade} ({new_credits:g})" if new_grade is not None else "-"
+            print(f"{seq:>8} {recorded_at}  {op:<6} {year} {semester}  {name}: {old} -> {new}")
+    else:
+        seq = args.at
+        if args.time is not None:
+            seq = seq_at(cursor, args.student, args.time)
+        rows = transcript_at(cursor, args.student, seq)
+        for year, semester, name, grade, credits, scale_id in rows:
+            print(f"{year} {semester:<12} {name:<30} {grade:<3} {credits:>5.1f}  scale {scale_id}")
+        print(f"{len(rows)} courses as of journal entry "
+              f"{seq if seq is not None else latest_seq(cursor, args.student)}", file=sys.stderr)
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,346 @@
+"""Database upkeep: ANALYZE, incremental vacuum and online backups.
+
+    python -m gpa.maintenance run --db data.db
+    python -m gpa.maintenance run --db data.db --full-vacuum   # one-time switch for older files
+    python -m gpa.maintenance run --data-dir profiles          # every profile of a sharded store
+    python -m gpa.maintenance log --db data.db
+
+A run performs these tasks in order and records each one in
+``maintenance_log`` with its duration and the file size before and after:
+
+* analyze -- refresh the planner statistics, bounded by ``analysis_limit``.
+* vacuum  -- return free pages to the filesystem with ``incremental_vacuum``
+  in small steps, then truncate the WAL.  ``connect()`` creates new files in
+  incremental mode; an older one still in ``auto_vacuum = NONE`` is skipped:
+  converting it takes a full VACUUM, which locks the file while it is
+  rewritten, so that only happens when ``--full-vacuum`` is given on the
+  command line.
+* backup  -- copy the database with ``Connection.backup`` a few pages at a
+  time, sleeping between steps so the app's own writes are never held up.
+  Skipped when nothing was saved since the last backup.
+
+In the app, ``MaintenanceScheduler`` starts a run on a worker thread after
+the UI has been idle for a while, at most once per ``INTERVAL_HOURS``.
+"""
+import argparse
+import glob
+import logging
+import os
+import sqlite3
+import time
+from collections import namedtuple
+
+from gpa.startup import BackgroundLoader
+
+log = logging.getLogger(__name__)
+
+# Hours between maintenance runs started by the app
+INTERVAL_HOURS = 24
+# Milliseconds without key or mouse input before the app starts a due run
+IDLE_MS = 60 * 1000
+# Rows sampled per index by ANALYZE (SQLite's suggested bound)
+ANALYSIS_LIMIT = 400
+# Pages freed per incremental_vacuum step, and the pause after each
+VACUUM_STEP_PAGES = 256
+VACUUM_STEP_SLEEP = 0.005
+# PRAGMA auto_vacuum value under which incremental_vacuum frees pages
+AUTO_VACUUM_INCREMENTAL = 2
+# Pages copied per backup step, and the pause after each
+BACKUP_PAGES = 256
+BACKUP_SLEEP = 0.005
+# Backups kept per database; older ones are deleted
+KEEP_BACKUPS = 7
+
+TASKS = ("analyze", "vacuum", "backup")
+
+# rows: pages freed or pages copied, depending on the task
+TaskResult = namedtuple("TaskResult", "task seconds bytes_before bytes_after rows detail")
+
+
+def create_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS maintenance_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_started TIMESTAMP NOT NULL,
+            task TEXT NOT NULL,
+            seconds REAL NOT NULL,
+            bytes_before INTEGER,
+            bytes_after INTEGER,
+            rows INTEGER,
+            detail TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_maintenance_log_task
+        ON maintenance_log (task, run_started)
+    ''')
+
+
+def file_size(path):
+    """Bytes on disk for the database and its WAL"""
+    return sum(os.path.getsize(name) for name in (path, path + "-wal") if os.path.exists(name))
+
+
+def _analyze(conn, path, options):
+    conn.execute(f'PRAGMA analysis_limit = {ANALYSIS_LIMIT}')
+    conn.execute('ANALYZE')
+    conn.commit()
+    return 0, None
+
+
+def _vacuum(conn, path, options):
+    mode = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+    free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    if options.get("full_vacuum"):
+        # auto_vacuum only changes on an empty database or through a full VACUUM,
+        # which holds an exclusive lock while the whole file is rewritten
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('VACUUM')
+        detail = ("full VACUUM" if mode == AUTO_VACUUM_INCREMENTAL
+                  else "converted to incremental auto_vacuum")
+    elif mode != AUTO_VACUUM_INCREMENTAL:
+        return 0, (f"skipped: {free} free pages but auto_vacuum is not incremental; run "
+                   "`python -m gpa.maintenance run --full-vacuum` once to enable it")
+    else:
+        detail = None
+        remaining = free
+        while remaining > 0:
+            # Each step is its own short write transaction.  execute() would step
+            # the pragma once and free a single page; executescript runs it out
+            conn.executescript(f'PRAGMA incremental_vacuum({VACUUM_STEP_PAGES});')
+            remaining = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            time.sleep(VACUUM_STEP_SLEEP)
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+    return free, detail
+
+
+def _fingerprint(conn):
+    """Changes whenever courses, GPA records or scales are saved"""
+    journal = conn.execute('SELECT MAX(seq) FROM course_journal').fetchone()[0]
+    records = conn.execute('SELECT COUNT(*), MAX(date_calculated) FROM gpa_records').fetchone()
+    scales = conn.execute('SELECT MAX(id) FROM grading_scales').fetchone()[0]
+    return f"journal={journal} records={records[0]}@{records[1]} scales={scales}"
+
+
+def _backup(conn, path, options):
+    fingerprint = _fingerprint(conn)
+    last = conn.execute('''
+        SELECT detail FROM maintenance_log WHERE task = 'backup' AND rows > 0
+        ORDER BY id DESC LIMIT 1
+    ''').fetchone()
+    if last is not None and last[0] == fingerprint and not options.get("force_backup"):
+        return 0, "unchanged since the last backup"
+
+    backup_dir = options.get("backup_dir") or os.path.join(os.path.dirname(os.path.abspath(path)),
+                                                           "backups")
+    os.makedirs(backup_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    pattern = os.path.join(backup_dir, f"{glob.escape(stem)}-{'[0-9]' * 8}-{'[0-9]' * 6}.db")
+    # Left behind if an earlier backup was cut short
+    for partial in glob.glob(pattern + ".tmp"):
+        os.remove(partial)
+
+    target = os.path.join(backup_dir, f"{stem}-{time.strftime('%Y%m%d-%H%M%S')}.db")
+    copied = [0]
+
+    def progress(status, remaining, total):
+        copied[0] = total
+
+    destination = sqlite3.connect(target + ".tmp")
+    try:
+        conn.backup(destination, pages=BACKUP_PAGES, progress=progress, sleep=BACKUP_SLEEP)
+    finally:
+        destination.close()
+    os.replace(target + ".tmp", target)
+
+    backups = sorted(glob.glob(pattern))
+    for old in backups[:-KEEP_BACKUPS]:
+        os.remove(old)
+    return copied[0], fingerprint
+
+
+_TASK_FUNCTIONS = {"analyze": _analyze, "vacuum": _vacuum, "backup": _backup}
+
+
+def run_maintenance(path, tasks=TASKS, **options):
+    """Run ``tasks`` against the database at ``path`` and log them; returns TaskResults
+
+    Options: ``backup_dir`` (default: backups/ beside the database),
+    ``full_vacuum`` and ``force_backup``.
+    """
+    # Imported here because migrations builds on this module
+    from gpa.db import connect
+    from gpa.migrations import migrate
+
+    conn = connect(path)
+    try:
+        migrate(conn)
+        run_started = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+        size_at_start = file_size(path)
+        started = time.perf_counter()
+        results = []
+        for task in tasks:
+            before = file_size(path)
+            task_started = time.perf_counter()
+            rows, detail = _TASK_FUNCTIONS[task](conn, path, options)
+            result = TaskResult(task, time.perf_counter() - task_started, before,
+                                file_size(path), rows, detail)
+            results.append(result)
+            log.info("%s %s: %.3fs, %+d bytes%s", path, task, result.seconds,
+                     result.bytes_after - result.bytes_before,
+                     f" ({detail})" if detail else "")
+        total = TaskResult("run", time.perf_counter() - started, size_at_start,
+                           file_size(path), sum(result.rows for result in results),
+                           ",".join(tasks))
+        results.append(total)
+        log.info("%s maintenance took %.2fs and reclaimed %d bytes", path, total.seconds,
+                 total.bytes_before - total.bytes_after)
+
+        conn.executemany('''
+            INSERT INTO maintenance_log
+            (run_started, task, seconds, bytes_before, bytes_after, rows, detail)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [(run_started,) + tuple(result) for result in results])
+        conn.commit()
+    finally:
+        conn.close()
+    return results
+
+
+def is_due(path, interval_hours=INTERVAL_HOURS):
+    """True when no run is logged within the last ``interval_hours``"""
+    conn = sqlite3.connect(path)
+    try:
+        row = conn.execute('''
+            SELECT 1 FROM maintenance_log
+            WHERE task = 'run' AND run_started > datetime('now', ?)
+            LIMIT 1
+        ''', (f"-{float(interval_hours)} hours",)).fetchone()
+    except sqlite3.OperationalError:
+        # No maintenance_log yet: never run
+        return True
+    finally:
+        conn.close()
+    return row is None
+
+
+class MaintenanceScheduler:
+    """Start a due maintenance run on a worker thread once the UI goes idle
+
+    Key presses and mouse clicks anywhere in the app restart the idle
+    timer.  ``db_path`` may be changed at any time (e.g. when switching to
+    another profile's shard); the next run uses the new value.
+    """
+
+    def __init__(self, root, db_path, idle_ms=IDLE_MS, interval_hours=INTERVAL_HOURS,
+                 **options):
+        self.root = root
+        self.db_path = db_path
+        self.idle_ms = idle_ms
+        self.interval_hours = interval_hours
+        self.options = options
+        self.results = None
+        self._after_id = None
+        self._running = None
+        self._closed = False
+        for sequence in ("<KeyPress>", "<ButtonPress>"):
+            root.bind_all(sequence, self.activity, add="+")
+        self.activity()
+
+    def activity(self, event=None):
+        if self._closed:
+            return
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = self.root.after(self.idle_ms, self._on_idle)
+
+    def _on_idle(self):
+        self._after_id = None
+        if self._running is None and not self._closed:
+            self._running = BackgroundLoader(self.root, self._run_if_due, self._finished,
+                                             name="gpa-maintenance")
+
+    def _run_if_due(self):
+        db_path = self.db_path
+        try:
+            if not is_due(db_path, self.interval_hours):
+                return None
+            return run_maintenance(db_path, **self.options)
+        except sqlite3.Error as error:
+            # Typically a lock held too long by a save; retried after the next idle period
+            log.warning("%s maintenance failed: %s", db_path, error)
+            return None
+
+    def _finished(self, results):
+        self._running = None
+        if results is not None:
+            self.results = results
+        self.activity()
+
+    def close(self):
+        self._closed = True
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Database maintenance")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="run maintenance now")
+    run_parser.add_argument("--task", action="append", dest="tasks", choices=TASKS,
+                            help="only run these tasks (repeatable)")
+    run_parser.add_argument("--backup-dir", default=None)
+    run_parser.add_argument("--full-vacuum", action="store_true",
+                            help="convert to incremental vacuum even if the file is large")
+    run_parser.add_argument("--force-backup", action="store_true",
+                            help="back up even if nothing changed")
+    log_parser = subparsers.add_parser("log", help="show recent maintenance runs")
+    log_parser.add_argument("--limit", type=int, default=20)
+    for subparser in (run_parser, log_parser):
+        subparser.add_argument("--db", default=None, help="database file (default data.db)")
+        subparser.add_argument("--data-dir", default=None, help="every shard of a sharded store")
+    args = parser.parse_args(argv)
+
+    if args.data_dir is not None:
+        from gpa.profiles import ShardedStore
+        # The shards only; the catalog is a small list of file names
+        store = ShardedStore(args.data_dir)
+        paths = [store.database_for(student_id) for student_id in store.profiles()]
+        store.close()
+    else:
+        paths = [args.db or 'data.db']
+
+    if args.command == "log":
+        for path in paths:
+            conn = sqlite3.connect(path)
+            try:
+                rows = conn.execute('''
+                    SELECT run_started, seconds, bytes_before, bytes_after, rows, detail
+                    FROM maintenance_log WHERE task = 'run' ORDER BY id DESC LIMIT ?
+                ''', (args.limit,)).fetchall()
+            except sqlite3.OperationalError:
+                rows = []
+            finally:
+                conn.close()
+            for run_started, seconds, before, after, count, detail in rows:
+                print(f"{path}  {run_started}  {seconds:>7.2f}s  "
+                      f"reclaimed {(before - after) / 1024:>10.1f} KB  {detail}")
+        return 0
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    options = {"backup_dir": args.backup_dir, "full_vacuum": args.full_vacuum,
+               "force_backup": args.force_backup}
+    tasks = tuple(args.tasks) if args.tasks else TASKS
+    reclaimed = 0
+    started = time.perf_counter()
+    for path in paths:
+        results = run_maintenance(path, tasks, **options)
+        reclaimed += results[-1].bytes_before - results[-1].bytes_after
+    print(f"Maintained {len(paths)} database(s) in {time.perf_counter() - started:.2f}s, "
+          f"reclaimed {reclaimed / 1024:.1f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,242 @@
+"""Versioned schema upgrades driven by ``PRAGMA user_version``.
+
+Each migration runs once, in its own transaction, and bumps user_version
+when it commits.  Databases created by older releases start at version 0
+and are upgraded in place; every step is written to tolerate objects that
+already exist.
+"""
+import argparse
+import sqlite3
+
+from gpa.aggregates import create_table as create_totals_table
+from gpa.aggregates import rebuild_totals
+from gpa.journal import create_tables as create_journal_tables
+from gpa.maintenance import create_table as create_maintenance_table
+from gpa.scales import DEFAULT_SCALE_ID
+from gpa.scales import create_tables as create_scale_tables
+from gpa.snapshots import create_table as create_snapshots_table
+from gpa.snapshots import rebuild_snapshots
+
+
+def create_base_tables(cursor):
+    """Version 1: the original courses and gpa_records tables"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS courses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id TEXT DEFAULT 'default_student',
+            year TEXT NOT NULL,
+            semester TEXT NOT NULL,
+            course_name TEXT NOT NULL,
+            grade TEXT NOT NULL,
+            credits REAL NOT NULL,
+            date_added TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS gpa_records (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id TEXT DEFAULT 'default_student',
+            year TEXT NOT NULL,
+            semester TEXT NOT NULL,
+            semester_gpa REAL NOT NULL,
+            cumulative_gpa REAL NOT NULL,
+            total_credits REAL NOT NULL,
+            date_calculated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def add_term_totals(cursor):
+    """Version 2: cached per-term credit and quality-point totals"""
+    create_totals_table(cursor)
+
+
+def add_course_key(cursor):
+    """Version 3: unique (student_id, year, semester, course_name) on courses
+
+    Duplicate rows for the same course collapse to the most recent one.
+    """
+    cursor.execute('''
+        DELETE FROM courses WHERE id NOT IN (
+            SELECT MAX(id) FROM courses
+            GROUP BY student_id, year, semester, course_name
+        )
+    ''')
+    if cursor.rowcount > 0:
+        rebuild_totals(cursor)
+
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_courses_natural_key
+        ON courses (student_id, year, semester, course_name)
+    ''')
+
+
+def add_query_indexes(cursor):
+    """Version 4: covering index for term aggregates and a unique gpa_records key
+
+    gpa_records is first reduced to the latest row per term, which is what
+    the history view showed first anyway.
+    """
+    # Covers every "grade, credits for a student/term" aggregate without
+    # touching the table rows
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_courses_term_grades
+        ON courses (student_id, year, semester, grade, credits)
+    ''')
+
+    cursor.execute('''
+        DELETE FROM gpa_records WHERE id NOT IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY student_id, year, semester
+                    ORDER BY date_calculated DESC, id DESC
+                ) AS rank
+                FROM gpa_records
+            ) WHERE rank = 1
+        )
+    ''')
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_gpa_records_term
+        ON gpa_records (student_id, year, semester)
+    ''')
+
+
+def add_transfer_checkpoints(cursor):
+    """Version 5: resume points for streaming imports and exports"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS transfer_checkpoints (
+            name TEXT PRIMARY KEY,
+            position TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def add_grading_scales(cursor):
+    """Version 6: versioned grading scales and the scale each course was graded under
+
+    Existing courses are tagged with the default scale seeded from grade_points.
+    """
+    create_scale_tables(cursor)
+
+    cursor.execute('PRAGMA table_info(courses)')
+    if 'scale_id' not in [row[1] for row in cursor.fetchall()]:
+        # No REFERENCES clause: SQLite rejects it on ADD COLUMN with a
+        # non-NULL default when foreign keys are enforced
+        cursor.execute(f'''
+            ALTER TABLE courses
+            ADD COLUMN scale_id INTEGER NOT NULL DEFAULT {int(DEFAULT_SCALE_ID)}
+        ''')
+
+    # Term aggregates now group by scale too; keep them index-only
+    cursor.execute('DROP INDEX IF EXISTS idx_courses_term_grades')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_courses_term_scale_grades
+        ON courses (student_id, year, semester, scale_id, grade, credits)
+    ''')
+
+
+def add_term_snapshots(cursor):
+    """Version 7: per-term snapshots with running cumulative totals
+
+    Existing gpa_records are brought in line with the snapshots, so each
+    record's cumulative GPA covers the terms up to and including its own.
+    """
+    create_snapshots_table(cursor)
+    rebuild_snapshots(cursor)
+
+
+def add_course_journal(cursor):
+    """Version 8: append-only course change journal and its checkpoints
+
+    Nothing is backfilled; transcripts from before the journal started
+    replay back to the courses as they stood at this upgrade.
+    """
+    create_journal_tables(cursor)
+
+
+def add_profiles(cursor):
+    """Version 9: profiles registered before they have any saved courses"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS profiles (
+            student_id TEXT PRIMARY KEY,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def add_maintenance_log(cursor):
+    """Version 10: history of maintenance runs (ANALYZE, vacuum, backup)"""
+    create_maintenance_table(cursor)
+
+
+# (version, description, step) in upgrade order
+MIGRATIONS = [
+    (1, "base tables", create_base_tables),
+    (2, "term totals cache", add_term_totals),
+    (3, "unique course key", add_course_key),
+    (4, "query indexes and unique gpa_records term", add_query_indexes),
+    (5, "import/export checkpoints", add_transfer_checkpoints),
+    (6, "grading scales", add_grading_scales),
+    (7, "term snapshots", add_term_snapshots),
+    (8, "course journal", add_course_journal),
+    (9, "student profiles", add_profiles),
+    (10, "maintenance log", add_maintenance_log),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn, target=None):
+    """Upgrade the schema to ``target`` (default: latest); returns versions applied"""
+    target = LATEST_VERSION if target is None else target
+    current = get_version(conn)
+    applied = []
+
+    for version, _, step in MIGRATIONS:
+        if version <= current or version > target:
+            continue
+        cursor = conn.cursor()
+        if conn.in_transaction:
+            conn.commit()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            step(cursor)
+            # PRAGMA does not accept bound parameters
+            cursor.execute(f'PRAGMA user_version = {int(version)}')
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        applied.append(version)
+
+    return applied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Upgrade the GPA database schema")
+    parser.add_argument("--db", default="data.db")
+    parser.add_argument("--target", type=int, default=None,
+                        help="stop at this schema version")
+    parser.add_argument("--status", action="store_true",
+                        help="only print the current schema version")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    if args.status:
+        print(f"Schema version {get_version(conn)} (latest {LATEST_VERSION})")
+    else:
+        for version in migrate(conn, args.target):
+            print(f"Applied migration {version}: {MIGRATIONS[version - 1][1]}")
+        print(f"Schema version {get_version(conn)}")
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,244 @@
+"""Target-GPA planner: the lowest grades in remaining courses that reach a target.
+
+    python -m gpa.planner --target 3.5 --course Thesis=4 --course Elective=3
+    python -m gpa.planner --target 3.2 --remaining 10 --credits 3
+
+Quality points are scaled to integer hundredths and the reachable totals
+are tracked as a bitset (a Python int), one shift per distinct grade value
+per course.  That is a dynamic program over point sums, so twelve grade
+levels over ten or more courses cost a few hundred integer operations
+instead of 12^n combinations.  Among all plans reaching the target the one
+with the fewest quality points is chosen, spread as evenly as possible.
+
+Each course's weight is rounded down to whole hundredths, so a plan found
+by the program reaches the target with the exact points too; the GPA it
+reports is computed from those exact points.
+"""
+import argparse
+import math
+import sys
+import time
+from collections import namedtuple
+
+from gpa.aggregates import TermTotals
+from gpa.db import connect
+from gpa.migrations import migrate
+from gpa.scales import active_scale
+
+# Quality points are compared in hundredths
+UNITS = 100
+
+# assignments: [(course, credits, grade)]; required_average: points per credit needed
+Plan = namedtuple("Plan", "assignments cumulative_gpa required_average")
+
+
+def _levels(scale):
+    """Distinct (points, grade) pairs, lowest first; ties keep the lesser grade"""
+    by_points = {}
+    for grade in scale.grades:
+        # Later grades in scale order are the lesser label (A after A+)
+        by_points[scale.points_for(grade)] = grade
+    return sorted(by_points.items())
+
+
+def _weight(points, credits):
+    """Quality points in whole UNITS, rounded down (with slack for float noise)"""
+    return math.floor(points * credits * UNITS + 1e-6)
+
+
+def plan_grades(current_credits, current_points, courses, target, scale):
+    """Cheapest grades for ``courses`` [(name, credits)] reaching ``target``
+
+    Returns a Plan, or None if even the top grade everywhere falls short.
+    """
+    courses = [(name, float(credits)) for name, credits in courses]
+    total_credits = current_credits + sum(credits for _, credits in courses)
+    if total_credits <= 0:
+        return None
+    required = target * total_credits - current_points
+    # Round the requirement up so float noise can't undershoot the target
+    need = max(0, math.ceil(required * UNITS - 1e-6))
+    levels = _levels(scale)
+
+    # layers[i] has bit s set when the first i courses can sum to s units
+    layers = [1]
+    weights = []
+    for _, credits in courses:
+        course_weights = [_weight(points, credits) for points, _ in levels]
+        reachable = 0
+        previous = layers[-1]
+        for weight in set(course_weights):
+            reachable |= previous << weight
+        layers.append(reachable)
+        weights.append(course_weights)
+
+    above = layers[-1] >> need
+    if not above:
+        return None
+    # Lowest reachable total at or above the requirement
+    total = need + (above & -above).bit_length() - 1
+
+    # Walk back, giving each course the level nearest the average still owed
+    assignments = []
+    remaining = total
+    remaining_credits = sum(credits for _, credits in courses)
+    for index in range(len(courses) - 1, -1, -1):
+        name, credits = courses[index]
+        average = remaining / (remaining_credits * UNITS) if remaining_credits else 0.0
+        options = [(abs(points - average), level)
+                   for level, (points, _) in enumerate(levels)
+                   if weights[index][level] <= remaining
+                   and layers[index] >> (remaining - weights[index][level]) & 1]
+        level = min(options)[1]
+        assignments.append((name, credits, levels[level][1]))
+        remaining -= weights[index][level]
+        remaining_credits -= credits
+    assignments.reverse()
+
+    new_points = current_points + sum(scale.quality_points(grade, credits)
+                                      for _, credits, grade in assignments)
+    credits_left = total_credits - current_credits
+    return Plan(assignments, new_points / total_credits,
+                max(0.0, required) / credits_left if credits_left else 0.0)
+
+
+def parse_courses(text):
+    """Parse dialog lines of "Name, credits" (or just credits) into [(name, credits)]"""
+    courses = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line:
+            continue
+        name, _, credits = line.rpartition(",")
+        try:
+            credits = float(credits)
+        except ValueError:
+            raise ValueError(f"line {number}: expected 'Name, credits'") from None
+        if credits <= 0:
+            raise ValueError(f"line {number}: credits must be positive")
+        courses.append((name.strip() or f"Course {len(courses) + 1}", credits))
+    return courses
+
+
+class PlannerDialog:
+    """Toplevel asking for a target GPA and the remaining courses"""
+
+    def __init__(self, master, credits, points, scale):
+        # Imported here so the command-line planner runs without Tk
+        import tkinter as tk
+        from tkinter import messagebox, ttk
+
+        self.messagebox = messagebox
+        self.credits = credits
+        self.points = points
+        self.scale = scale
+
+        self.window = tk.Toplevel(master)
+        self.window.title("Target GPA Planner")
+        self.window.geometry("420x460")
+
+        current = points / credits if credits else 0.0
+        tk.Label(self.window, text=f"Saved cumulative GPA: {current:.2f} over {credits:.1f} credits",
+                 font=("Arial", 11)).pack(pady=5)
+
+        target_frame = tk.Frame(self.window)
+        target_frame.pack(pady=5)
+        tk.Label(target_frame, text="Target GPA:").pack(side="left")
+        self.target_var = tk.StringVar(value="3.50")
+        tk.Entry(target_frame, textvariable=self.target_var, width=8).pack(side="left", padx=5)
+
+        tk.Label(self.window, text="Remaining courses (one per line: Name, credits)").pack()
+        self.courses_text = tk.Text(self.window, height=6, width=40)
+        self.courses_text.insert("1.0", "Course 1, 3\nCourse 2, 3\n")
+        self.courses_text.pack(padx=10)
+
+        tk.Button(self.window, text="Plan", command=self.plan, bg="lightblue").pack(pady=5)
+
+        self.tree = ttk.Treeview(self.window, columns=("Course", "Credits", "Grade"),
+                                 show="headings", height=8)
+        for col in ("Course", "Credits", "Grade"):
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=120)
+        self.tree.pack(fill="both", expand=True, padx=10)
+        self.result_label = tk.Label(self.window, text="", font=("Arial", 11, "bold"))
+        self.result_label.pack(pady=5)
+
+    def plan(self):
+        try:
+            target = float(self.target_var.get())
+            courses = parse_courses(self.courses_text.get("1.0", "end"))
+        except ValueError as error:
+            self.messagebox.showwarning("Planner", str(error), parent=self.window)
+            return
+        if not courses:
+            self.messagebox.showwarning("Planner", "Enter at least one remaining course.",
+                                        parent=self.window)
+            return
+
+        self.tree.delete(*self.tree.get_children())
+        plan = plan_grades(self.credits, self.points, courses, target, self.scale)
+        if plan is None:
+            self.result_label.config(text=f"A {target:.2f} GPA is out of reach", fg="red")
+            return
+        for name, credits, grade in plan.assignments:
+            self.tree.insert("", "end", values=(name, f"{credits:.1f}", grade))
+        self.result_label.config(
+            text=f"Cumulative GPA {plan.cumulative_gpa:.2f} "
+                 f"(average {plan.required_average:.2f} needed)", fg="blue")
+
+
+def parse_course(text):
+    """Parse NAME=CREDITS (or bare CREDITS) from the command line"""
+    name, _, credits = text.rpartition("=")
+    try:
+        return name or None, float(credits)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected NAME=CREDITS, got {text!r}") from None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find the grades needed to reach a target GPA")
+    parser.add_argument("--db", default="data.db")
+    parser.add_argument("--student", default="default_student")
+    parser.add_argument("--target", type=float, required=True)
+    parser.add_argument("--course", type=parse_course, action="append", default=[],
+                        help="remaining course as NAME=CREDITS (repeatable)")
+    parser.add_argument("--remaining", type=int, default=0,
+                        help="add this many unnamed courses of --credits each")
+    parser.add_argument("--credits", type=float, default=3.0)
+    args = parser.parse_args(argv)
+
+    courses = [(name or f"Course {index}", credits)
+               for index, (name, credits) in enumerate(args.course, 1)]
+    courses += [(f"Course {len(courses) + index}", args.credits)
+                for index in range(1, args.remaining + 1)]
+    if not courses:
+        parser.error("give at least one --course or --remaining")
+
+    conn = connect(args.db)
+    migrate(conn)
+    totals = TermTotals(conn.cursor(), args.student)
+    scale = active_scale(conn)
+    conn.close()
+
+    started = time.perf_counter()
+    plan = plan_grades(totals.credits, totals.points, courses, args.target, scale)
+    elapsed = time.perf_counter() - started
+
+    current = totals.points / totals.credits if totals.credits else 0.0
+    print(f"Current GPA {current:.2f} over {totals.credits:.1f} credits")
+    if plan is None:
+        best = max(scale.points) * sum(credits for _, credits in courses)
+        ceiling = (totals.points + best) / (totals.credits + sum(c for _, c in courses))
+        print(f"A {args.target:.2f} cumulative GPA is out of reach with these courses "
+              f"(at most {ceiling:.2f})", file=sys.stderr)
+        return 1
+    for name, credits, grade in plan.assignments:
+        print(f"  {name:<24} {credits:>5.1f}  {grade}")
+    print(f"Cumulative GPA {plan.cumulative_gpa:.2f} "
+          f"(average {plan.required_average:.2f} needed; planned in {elapsed * 1000:.2f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,308 @@
+"""Student profiles and the storage layouts that hold them.
+
+    python V2.0.py --db data.db --student student_000042
+    python V2.0.py --data-dir profiles --student student_000042
+    python -m gpa.profiles list --data-dir profiles
+    python -m gpa.profiles add student_000042 --db data.db
+    python -m gpa.profiles split --db data.db --data-dir profiles
+
+Two interchangeable stores answer "which database holds this student":
+
+* ``SingleFileStore`` -- every profile in one file, found through the
+  indexed ``student_id`` columns.  Switching profiles reuses the open
+  connection.
+* ``ShardedStore`` -- one database file per student under ``shards/``, plus
+  ``catalog.db`` mapping student ids to files.  A student's writes lock only
+  their own file, and vacuuming or backing up one profile never touches the
+  others.  New shards are copied from a migrated, empty template, so they
+  don't have to run the migration chain.  Reads that span profiles attach
+  the shards to the catalog connection a few at a time.
+
+Both expose the same methods, so the app and tools only ever ask the store
+for ``connect(student_id)``.  Grading scales live in each database file, so
+in a sharded store a new scale version applies to the shards it is added to.
+"""
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import time
+
+from gpa.aggregates import rebuild_totals
+from gpa.db import connect
+from gpa.migrations import LATEST_VERSION, get_version, migrate
+
+DEFAULT_STUDENT = "default_student"
+# Shards attached to the catalog connection at once (SQLite allows 10 by default)
+ATTACH_BATCH = 8
+# Longest readable prefix of a student id kept in a shard's file name
+SHARD_NAME_LENGTH = 48
+# A shard holds one student, so most of its ~30 tables and indexes fit in a
+# single page; small pages keep an empty shard near 30 KB instead of 120 KB
+SHARD_PAGE_SIZE = 1024
+
+
+class SingleFileStore:
+    """Every profile in one database file"""
+
+    layout = "single"
+
+    def __init__(self, path='data.db'):
+        self.path = path
+
+    def database_for(self, student_id):
+        return self.path
+
+    def connect(self, student_id, check_same_thread=True):
+        conn = connect(self.path, check_same_thread=check_same_thread)
+        migrate(conn)
+        return conn
+
+    def profiles(self, conn=None):
+        """Return every student id, including ones with nothing saved yet"""
+        own = conn is None
+        conn = conn or self.connect(None)
+        try:
+            return [row[0] for row in conn.execute('''
+                SELECT student_id FROM profiles
+                UNION SELECT student_id FROM term_totals
+                ORDER BY 1
+            ''')]
+        finally:
+            if own:
+                conn.close()
+
+    def add_profile(self, student_id, conn=None):
+        own = conn is None
+        conn = conn or self.connect(None)
+        try:
+            conn.execute('INSERT OR IGNORE INTO profiles (student_id) VALUES (?)', (student_id,))
+            conn.commit()
+        finally:
+            if own:
+                conn.close()
+
+    def summaries(self):
+        """Return {student_id: (credits, quality_points)} across every profile"""
+        conn = self.connect(None)
+        try:
+            return {student_id: (credits, points) for student_id, credits, points in conn.execute('''
+                SELECT student_id, SUM(credits), SUM(quality_points) FROM term_totals
+                GROUP BY student_id
+            ''')}
+        finally:
+            conn.close()
+
+    def close(self):
+        pass
+
+
+class ShardedStore:
+    """One database file per student, located through a catalog
+
+    The catalog connection may be used from more than one thread (the app
+    opens the first profile on its startup thread), but never concurrently.
+    """
+
+    layout = "sharded"
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.shard_dir = os.path.join(directory, "shards")
+        os.makedirs(self.shard_dir, exist_ok=True)
+        self.catalog = connect(os.path.join(directory, "catalog.db"), check_same_thread=False)
+        self.catalog.execute('''
+            CREATE TABLE IF NOT EXISTS profiles (
+                student_id TEXT PRIMARY KEY,
+                shard TEXT NOT NULL UNIQUE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        self.catalog.commit()
+        # student_id -> shard path, filled as profiles are looked up
+        self._paths = {}
+        self._template = None
+
+    @staticmethod
+    def shard_name(student_id):
+        """A file name that is readable, filesystem-safe and unique per id"""
+        readable = re.sub(r"[^A-Za-z0-9_.-]", "_", student_id)[:SHARD_NAME_LENGTH]
+        digest = hashlib.sha1(student_id.encode("utf-8")).hexdigest()[:10]
+        return f"{readable}-{digest}.db"
+
+    def database_for(self, student_id):
+        path = self._paths.get(student_id)
+        if path is None:
+            row = self.catalog.execute('SELECT shard FROM profiles WHERE student_id = ?',
+                                       (student_id,)).fetchone()
+            name = row[0] if row else self.shard_name(student_id)
+            path = self._paths[student_id] = os.path.join(self.shard_dir, name)
+        return path
+
+    def _template_path(self):
+        """An empty database at the latest schema version, built once per process"""
+        if self._template is None:
+            path = os.path.join(self.directory, "template.db")
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+            conn = sqlite3.connect(path)
+            # Only takes effect before the first table is created
+            conn.execute(f'PRAGMA page_size = {SHARD_PAGE_SIZE}')
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            migrate(conn)
+            conn.close()
+            self._template = path
+        return self._template
+
+    def add_profile(self, student_id, conn=None):
+        """Register ``student_id`` and create its shard if it is new"""
+        path = self.database_for(student_id)
+        if not os.path.exists(path):
+            shutil.copyfile(self._template_path(), path)
+        self.catalog.execute('INSERT OR IGNORE INTO profiles (student_id, shard) VALUES (?, ?)',
+                             (student_id, os.path.basename(path)))
+        self.catalog.commit()
+        return path
+
+    def connect(self, student_id, check_same_thread=True):
+        path = self.database_for(student_id)
+        if not os.path.exists(path):
+            self.add_profile(student_id)
+        conn = connect(path, check_same_thread=check_same_thread)
+        # Shards created by an older release are upgraded on first open
+        if get_version(conn) < LATEST_VERSION:
+            migrate(conn)
+        return conn
+
+    def profiles(self, conn=None):
+        return [row[0] for row in self.catalog.execute(
+            'SELECT student_id FROM profiles ORDER BY student_id')]
+
+    def attached(self, student_ids):
+        """Yield batches of (alias, student_id) whose shards are attached to the catalog"""
+        student_ids = list(student_ids)
+        for start in range(0, len(student_ids), ATTACH_BATCH):
+            batch = [(f"shard{index}", student_id) for index, student_id
+                     in enumerate(student_ids[start:start + ATTACH_BATCH])]
+            for alias, student_id in batch:
+                self.catalog.execute(f'ATTACH DATABASE ? AS {alias}',
+                                     (self.database_for(student_id),))
+            try:
+                yield batch
+            finally:
+                for alias, _ in batch:
+                    self.catalog.execute(f'DETACH DATABASE {alias}')
+
+    def summaries(self):
+        """Return {student_id: (credits, quality_points)} across every profile"""
+        result = {}
+        for batch in self.attached(self.profiles()):
+            query = ' UNION ALL '.join(
+                f'SELECT ?, SUM(credits), SUM(quality_points) FROM {alias}.term_totals'
+                for alias, _ in batch)
+            for student_id, credits, points in self.catalog.execute(
+                    query, [student_id for _, student_id in batch]):
+                result[student_id] = (credits or 0.0, points or 0.0)
+        return result
+
+    def split(self, source_path, student_ids=None):
+        """Copy students out of a single-file database into their own shards
+
+        Returns the number of profiles written.  Course history in the
+        journal is not copied; each shard's journal starts empty.
+        """
+        source = SingleFileStore(source_path)
+        student_ids = student_ids or source.profiles()
+        for student_id in student_ids:
+            self.add_profile(student_id)
+            conn = self.connect(student_id)
+            cursor = conn.cursor()
+            cursor.execute('ATTACH DATABASE ? AS source', (source_path,))
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                cursor.execute('DELETE FROM courses')
+                cursor.execute('DELETE FROM gpa_records')
+                cursor.execute('DELETE FROM grading_scale_points')
+                cursor.execute('DELETE FROM grading_scales')
+                cursor.execute('INSERT INTO grading_scales SELECT * FROM source.grading_scales')
+                cursor.execute('''
+                    INSERT INTO grading_scale_points SELECT * FROM source.grading_scale_points
+                ''')
+                cursor.execute('''
+                    INSERT INTO courses (student_id, year, semester, course_name, grade,
+                                         credits, date_added, scale_id)
+                    SELECT student_id, year, semester, course_name, grade,
+                           credits, date_added, scale_id
+                    FROM source.courses WHERE student_id = ?
+                ''', (student_id,))
+                cursor.execute('''
+                    INSERT INTO gpa_records (student_id, year, semester, semester_gpa,
+                                             cumulative_gpa, total_credits, date_calculated)
+                    SELECT student_id, year, semester, semester_gpa,
+                           cumulative_gpa, total_credits, date_calculated
+                    FROM source.gpa_records WHERE student_id = ?
+                ''', (student_id,))
+                rebuild_totals(cursor)
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+            finally:
+                cursor.execute('DETACH DATABASE source')
+                conn.close()
+        return len(student_ids)
+
+    def close(self):
+        self.catalog.close()
+
+
+def open_store(db_path=None, data_dir=None):
+    """ShardedStore when ``data_dir`` is given, else a SingleFileStore"""
+    if data_dir is not None:
+        return ShardedStore(data_dir)
+    return SingleFileStore(db_path or 'data.db')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage student profiles")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="list profiles with their cumulative GPA")
+    add_parser = subparsers.add_parser("add", help="register a profile")
+    add_parser.add_argument("student")
+    subparsers.add_parser("split", help="copy a single-file database into per-student shards")
+    for subparser in subparsers.choices.values():
+        subparser.add_argument("--db", default=None, help="single-file database (default data.db)")
+        subparser.add_argument("--data-dir", default=None, help="directory of a sharded store")
+    args = parser.parse_args(argv)
+
+    if args.command == "split":
+        if args.data_dir is None:
+            parser.error("split needs --data-dir")
+        store = ShardedStore(args.data_dir)
+        started = time.perf_counter()
+        count = store.split(args.db or 'data.db')
+        store.close()
+        print(f"Split {count} profiles into {args.data_dir} in {time.perf_counter() - started:.2f}s")
+        return 0
+
+    store = open_store(args.db, args.data_dir)
+    try:
+        if args.command == "add":
+            store.add_profile(args.student)
+            print(f"Added profile {args.student} ({store.layout} layout)")
+        else:
+            summaries = store.summaries()
+            for student_id in store.profiles():
+                credits, points = summaries.get(student_id, (0.0, 0.0))
+                gpa = points / credits if credits else 0.0
+                print(f"{student_id:<32} {gpa:>5.2f}  {credits:>6.1f} credits")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
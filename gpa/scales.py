@@ -0,0 +1,313 @@
+"""Versioned grading scales stored in the database.
+
+A scale version is immutable once created: editing a scale adds a new
+version and makes it the active one.  New or regraded course rows are
+tagged with the active scale's id, so historical rows keep the points they
+were graded under.
+
+Each version compiles to a dense integer code per grade and an ``array`` of
+points indexed by that code.  ``rescore`` uses it to compute every
+student's GPA under a chosen scale, memoized per (student, scale version)
+in ``scale_gpa_cache``.  Students with no credits in a grade whose points
+changed reuse the previous version's result instead of being recomputed.
+
+    python -m gpa.scales list --db data.db
+    python -m gpa.scales add --name Standard --file scale.json --db data.db
+    python -m gpa.scales rescore --scale 2 --db data.db
+"""
+import argparse
+import json
+import sqlite3
+from array import array
+
+from gpa.grades import grade_points
+
+# The scale seeded from grade_points by the migration
+DEFAULT_SCALE_ID = 1
+DEFAULT_SCALE_NAME = "Standard"
+
+
+class GradingScale:
+    """One compiled scale version"""
+
+    def __init__(self, scale_id, name, version, grades):
+        self.id = scale_id
+        self.name = name
+        self.version = version
+        self.grades = [grade for grade, _ in grades]
+        self.codes = {grade: code for code, grade in enumerate(self.grades)}
+        # Unknown grades share one extra code worth 0 points
+        self.unknown_code = len(self.grades)
+        self.points = array('d', [points for _, points in grades] + [0.0])
+
+    def code(self, grade):
+        return self.codes.get(grade, self.unknown_code)
+
+    def points_for(self, grade):
+        return self.points[self.code(grade)]
+
+    def quality_points(self, grade, credits):
+        return self.points[self.code(grade)] * credits
+
+    def mapping(self):
+        return {grade: self.points[code] for code, grade in enumerate(self.grades)}
+
+
+def create_tables(cursor):
+    """Create the scale tables and seed the default scale from grade_points"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS grading_scales (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            active INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (name, version)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS grading_scale_points (
+            scale_id INTEGER NOT NULL,
+            code INTEGER NOT NULL,
+            grade TEXT NOT NULL,
+            points REAL NOT NULL,
+            PRIMARY KEY (scale_id, grade),
+            UNIQUE (scale_id, code)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scale_gpa_cache (
+            student_id TEXT NOT NULL,
+            scale_id INTEGER NOT NULL,
+            credits REAL NOT NULL,
+            quality_points REAL NOT NULL,
+            PRIMARY KEY (scale_id, student_id)
+        )
+    ''')
+    # Invalidation deletes by student across every scale
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_scale_gpa_cache_student
+        ON scale_gpa_cache (student_id)
+    ''')
+
+    cursor.execute('SELECT 1 FROM grading_scales WHERE id = ?', (DEFAULT_SCALE_ID,))
+    if cursor.fetchone() is None:
+        insert_scale(cursor, DEFAULT_SCALE_NAME, grade_points, scale_id=DEFAULT_SCALE_ID)
+        cursor.execute('UPDATE grading_scales SET active = 1 WHERE id = ?', (DEFAULT_SCALE_ID,))
+
+
+def insert_scale(cursor, name, mapping, scale_id=None):
+    """Store ``mapping`` as the next version of ``name``; returns the new id"""
+    cursor.execute('SELECT COALESCE(MAX(version), 0) + 1 FROM grading_scales WHERE name = ?',
+                   (name,))
+    version = cursor.fetchone()[0]
+    cursor.execute('INSERT INTO grading_scales (id, name, version) VALUES (?, ?, ?)',
+                   (scale_id, name, version))
+    new_id = cursor.lastrowid if scale_id is None else scale_id
+    cursor.executemany('''
+        INSERT INTO grading_scale_points (scale_id, code, grade, points) VALUES (?, ?, ?, ?)
+    ''', [(new_id, code, grade, float(points))
+          for code, (grade, points) in enumerate(mapping.items())])
+    return new_id
+
+
+def load_scale(conn, scale_id):
+    """Read and compile the GradingScale for ``scale_id``
+
+    Loops that score many rows should look scales up through a ScaleCache.
+    """
+    row = conn.execute('SELECT name, version FROM grading_scales WHERE id = ?',
+                       (scale_id,)).fetchone()
+    if row is None:
+        raise KeyError(f"unknown grading scale {scale_id}")
+    grades = conn.execute('''
+        SELECT grade, points FROM grading_scale_points WHERE scale_id = ? ORDER BY code
+    ''', (scale_id,)).fetchall()
+    return GradingScale(scale_id, row[0], row[1], grades)
+
+
+class ScaleCache(dict):
+    """Compiled scales for one batch of work on one connection, by scale id
+
+    ``cache[scale_id]`` compiles each scale the first time it is used.  A
+    version never changes once created, so entries stay valid for as long
+    as the batch holds the cache; a new batch starts a new cache.
+    """
+
+    def __init__(self, conn):
+        super().__init__()
+        self.conn = conn
+
+    def __missing__(self, scale_id):
+        scale = self[scale_id] = load_scale(self.conn, scale_id)
+        return scale
+
+
+def active_scale(conn):
+    """Return the scale new grades are recorded under"""
+    row = conn.execute('SELECT id FROM grading_scales WHERE active = 1').fetchone()
+    return load_scale(conn, row[0] if row else DEFAULT_SCALE_ID)
+
+
+def create_scale_version(conn, name, mapping, activate=True):
+    """Add a new version of a scale (optionally making it active); returns it"""
+    cursor = conn.cursor()
+    try:
+        scale_id = insert_scale(cursor, name, mapping)
+        if activate:
+            cursor.execute('UPDATE grading_scales SET active = (id = ?)', (scale_id,))
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return load_scale(conn, scale_id)
+
+
+def previous_version(conn, scale):
+    row = conn.execute('''
+        SELECT id FROM grading_scales WHERE name = ? AND version < ?
+        ORDER BY version DESC LIMIT 1
+    ''', (scale.name, scale.version)).fetchone()
+    return load_scale(conn, row[0]) if row else None
+
+
+def invalidate_students(cursor, student_ids):
+    """Drop memoized GPAs for students whose courses changed"""
+    cursor.executemany('DELETE FROM scale_gpa_cache WHERE student_id = ?',
+                       [(student_id,) for student_id in student_ids])
+
+
+def _student_filter(student_ids, column="student_id"):
+    if not student_ids:
+        return "", ()
+    return f" AND {column} IN ({', '.join('?' * len(student_ids))})", tuple(student_ids)
+
+
+def rescore(conn, scale_id, student_ids=None, base_scale_id=None):
+    """GPA of every (or the given) student with all courses scored under one scale
+
+    Returns {student_id: (gpa, credits)}.  Results are memoized; when
+    ``base_scale_id`` (default: the previous version of the same scale) has
+    memoized results, students holding no grade whose points differ between
+    the two versions reuse them as-is.
+    """
+    scale = load_scale(conn, scale_id)
+    where, params = _student_filter(student_ids)
+    cursor = conn.cursor()
+
+    try:
+        base = load_scale(conn, base_scale_id) if base_scale_id else previous_version(conn, scale)
+        if base is not None:
+            changed = [grade for grade in set(base.grades) | set(scale.grades)
+                       if base.points_for(grade) != scale.points_for(grade)]
+            # Carry forward results for students untouched by the scale change
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO scale_gpa_cache (student_id, scale_id, credits, quality_points)
+                SELECT student_id, ?, credits, quality_points FROM scale_gpa_cache
+                WHERE scale_id = ? {where}
+                  AND student_id NOT IN (
+                      SELECT student_id FROM courses
+                      WHERE grade IN ({', '.join('?' * len(changed))})
+                  )
+            ''', (scale.id, base.id) + params + tuple(changed))
+
+        # Score everyone still missing from one (student, grade) aggregate pass
+        where_courses, params_courses = _student_filter(student_ids, "c.student_id")
+        cursor.execute(f'''
+            SELECT c.student_id, c.grade, SUM(c.credits) FROM courses AS c
+            WHERE NOT EXISTS (
+                SELECT 1 FROM scale_gpa_cache AS m
+                WHERE m.scale_id = ? AND m.student_id = c.student_id
+            ) {where_courses}
+            GROUP BY c.student_id, c.grade
+            ORDER BY c.student_id
+        ''', (scale.id,) + params_courses)
+
+        fresh = []
+        current = None
+        credits_by_code = None
+        for student_id, grade, credits in cursor.fetchall():
+            if student_id != current:
+                if current is not None:
+                    fresh.append(_score(current, credits_by_code, scale))
+                current = student_id
+                credits_by_code = array('d', bytes(8 * len(scale.points)))
+            credits_by_code[scale.code(grade)] += credits
+        if current is not None:
+            fresh.append(_score(current, credits_by_code, scale))
+
+        cursor.executemany('''
+            INSERT OR REPLACE INTO scale_gpa_cache (student_id, scale_id, credits, quality_points)
+            VALUES (?, ?, ?, ?)
+        ''', [(student_id, scale.id, credits, points) for student_id, credits, points in fresh])
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+    cursor.execute(f'''
+        SELECT student_id, credits, quality_points FROM scale_gpa_cache
+        WHERE scale_id = ? {where}
+    ''', (scale.id,) + params)
+    return {student_id: (points / credits if credits > 0 else 0.0, credits)
+            for student_id, credits, points in cursor.fetchall()}
+
+
+def _score(student_id, credits_by_code, scale):
+    credits = sum(credits_by_code)
+    points = sum(c * p for c, p in zip(credits_by_code, scale.points))
+    return student_id, credits, points
+
+
+def main(argv=None):
+    # Imported here because migrations builds on this module
+    from gpa.db import connect
+    from gpa.migrations import migrate
+
+    parser = argparse.ArgumentParser(description="Manage versioned grading scales")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="list scale versions")
+    show_parser = subparsers.add_parser("show", help="print a scale's grade points")
+    show_parser.add_argument("--scale", type=int, default=None, help="default: active")
+    add_parser = subparsers.add_parser("add", help="add a scale version from JSON")
+    add_parser.add_argument("--name", default=DEFAULT_SCALE_NAME)
+    add_parser.add_argument("--file", required=True,
+                            help='JSON object mapping grade to points, e.g. {"A": 4.0}')
+    add_parser.add_argument("--no-activate", action="store_true")
+    rescore_parser = subparsers.add_parser("rescore", help="GPA of every student under a scale")
+    rescore_parser.add_argument("--scale", type=int, required=True)
+    rescore_parser.add_argument("--student", action="append", dest="students")
+    for sub in subparsers.choices.values():
+        sub.add_argument("--db", default="data.db")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    migrate(conn)
+    try:
+        if args.command == "list":
+            for scale_id, name, version, active, created in conn.execute('''
+                SELECT id, name, version, active, created_at FROM grading_scales ORDER BY id
+            '''):
+                marker = "*" if active else " "
+                print(f"{marker} {scale_id:>4}  {name} v{version}  ({created})")
+        elif args.command == "show":
+            scale = load_scale(conn, args.scale) if args.scale else active_scale(conn)
+            print(json.dumps(scale.mapping(), indent=2))
+        elif args.command == "add":
+            with open(args.file, encoding="utf-8") as source:
+                mapping = json.load(source)
+            scale = create_scale_version(conn, args.name, mapping, not args.no_activate)
+            print(f"Created {scale.name} v{scale.version} (id {scale.id})")
+        else:
+            results = rescore(conn, args.scale, args.students)
+            for student_id in sorted(results)[:20]:
+                gpa, credits = results[student_id]
+                print(f"{student_id}: {gpa:.2f} over {credits:.1f} credits")
+            print(f"{len(results)} students scored")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
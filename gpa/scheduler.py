@@ -0,0 +1,151 @@
+"""Debounced, off-main-thread recalculation for the live GPA labels.
+
+Edits call ``schedule()``; bursts inside the debounce window collapse into a
+single computation.  The database work runs on a worker thread that owns
+its own SQLite connection, and results are handed back to Tk by polling a
+queue from ``root.after`` because Tk widgets must only be touched from the
+main thread.  A newer request interrupts any computation still running for
+an older one, and stale results are dropped.
+"""
+import queue
+import sqlite3
+import threading
+
+from gpa.db import connect
+
+# Milliseconds to wait for more edits before recalculating
+DEFAULT_DELAY_MS = 150
+# Milliseconds between checks for a finished computation
+POLL_MS = 15
+
+
+class RecalcScheduler:
+    """Coalesce recalculation requests and run them on a worker thread
+
+    ``snapshot()`` runs on the Tk thread and captures the inputs,
+    ``compute(conn, inputs)`` runs on the worker with its own connection,
+    and ``apply(result)`` runs back on the Tk thread.
+    """
+
+    def __init__(self, root, db_path, snapshot, compute, apply,
+                 delay_ms=DEFAULT_DELAY_MS):
+        self.root = root
+        self.db_path = db_path
+        self.snapshot = snapshot
+        self.compute = compute
+        self.apply = apply
+        self.delay_ms = delay_ms
+
+        self._after_id = None
+        self._poll_id = None
+        self._generation = 0
+        self._applied = 0
+        self._pending = None
+        self._busy = False
+        self._closed = False
+        self._conn = None
+        self._cond = threading.Condition()
+        self._results = queue.SimpleQueue()
+
+        self._thread = threading.Thread(target=self._run, name="gpa-recalc", daemon=True)
+        self._thread.start()
+
+    def schedule(self):
+        """Request a recalculation after the debounce window"""
+        if self._closed:
+            return
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = self.root.after(self.delay_ms, self._submit)
+
+    def flush(self):
+        """Start a pending (or fresh) recalculation immediately"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._submit()
+
+    def close(self):
+        """Stop the worker thread and cancel outstanding callbacks"""
+        for after_id in (self._after_id, self._poll_id):
+            if after_id is not None:
+                try:
+                    self.root.after_cancel(after_id)
+                except Exception:
+                    pass
+        self._after_id = self._poll_id = None
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def _submit(self):
+        self._after_id = None
+        if self._closed:
+            return
+        inputs = self.snapshot()
+        with self._cond:
+            self._generation += 1
+            self._pending = (self._generation, inputs)
+            interrupt = self._busy
+            self._cond.notify()
+        # Abort a query still running for older input; the worker drops it
+        if interrupt and self._conn is not None:
+            self._conn.interrupt()
+        if self._poll_id is None:
+            self._poll_id = self.root.after(POLL_MS, self._poll)
+
+    def _run(self):
+        # The connection is created here so it belongs to the worker thread
+        self._conn = connect(self.db_path)
+        try:
+            while True:
+                with self._cond:
+                    while self._pending is None and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        return
+                    generation, inputs = self._pending
+                    self._pending = None
+                    self._busy = True
+                try:
+                    result = self.compute(self._conn, inputs)
+                except sqlite3.OperationalError as error:
+                    with self._cond:
+                        # An interrupt aimed at an older job can land on this
+                        # one; run it again unless newer input already queued
+                        if "interrupt" in str(error) and self._pending is None \
+                                and generation == self._generation:
+                            self._pending = (generation, inputs)
+                        else:
+                            self._results.put((generation, error))
+                    continue
+                except Exception as error:
+                    self._results.put((generation, error))
+                    continue
+                finally:
+                    with self._cond:
+                        self._busy = False
+                if generation == self._generation:
+                    self._results.put((generation, result))
+        finally:
+            self._conn.close()
+
+    def _poll(self):
+        self._poll_id = None
+        latest = None
+        while True:
+            try:
+                generation, result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self._generation:
+                latest = (generation, result)
+
+        if latest is not None:
+            self._applied = latest[0]
+            if isinstance(latest[1], Exception):
+                # Raised inside a Tk callback, so Tk reports it
+                raise latest[1]
+            self.apply(latest[1])
+
+        if self._applied < self._generation and not self._closed:
+            self._poll_id = self.root.after(POLL_MS, self._poll)
@@ -0,0 +1,296 @@
+"""JSON HTTP service over the GPA calculations.
+
+    python -m gpa.service --db data.db --port 8080 --readers 4
+
+Endpoints (student ids and term names are URL-encoded path segments)::
+
+    GET /health
+    GET /students/<id>/gpa                            cumulative and per-term GPA
+    GET /students/<id>/terms/<year>/<semester>        one term's GPA and courses
+    PUT /students/<id>/terms/<year>/<semester>/courses
+        {"courses": [{"course_name": "Math", "grade": "A", "credits": 3}]}
+
+Both GETs answer 404 for a student with no saved courses; a known student's
+term without courses comes back with zero totals.
+
+Each client connection is served on its own thread.  Reads borrow one of a
+fixed number of connections; under WAL they neither block nor are blocked
+by the writer.  Every write goes through a single connection behind a lock,
+so SQLite never sees two writers racing for the database lock.
+"""
+import argparse
+import json
+import queue
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from gpa.aggregates import TermTotals
+from gpa.db import connect, upsert_courses
+from gpa.grades import term_key
+from gpa.migrations import migrate
+from gpa.scales import ScaleCache, active_scale
+from gpa.transfer import validate_course
+
+READERS = 4
+# Seconds a request waits for a pooled connection before answering 503
+POOL_TIMEOUT = 5.0
+# Largest accepted request body, in bytes
+MAX_BODY = 1024 * 1024
+
+
+class ServiceError(Exception):
+    """An error reported to the client with an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ConnectionPool:
+    """A fixed set of reader connections plus one serialized writer"""
+
+    def __init__(self, path, readers=READERS, timeout=POOL_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._writer = connect(path, check_same_thread=False)
+        migrate(self._writer)
+        self._write_lock = threading.Lock()
+        self._readers = queue.Queue()
+        self._all = [self._writer]
+        for _ in range(readers):
+            conn = connect(path, check_same_thread=False)
+            self._all.append(conn)
+            self._readers.put(conn)
+
+    @contextmanager
+    def reader(self):
+        try:
+            conn = self._readers.get(timeout=self.timeout)
+        except queue.Empty:
+            raise ServiceError(503, "no database connection available") from None
+        try:
+            yield conn
+        finally:
+            # End the read transaction so the WAL can be checkpointed
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self):
+        if not self._write_lock.acquire(timeout=self.timeout):
+            raise ServiceError(503, "database writer busy")
+        try:
+            yield self._writer
+        finally:
+            self._write_lock.release()
+
+    def close(self):
+        for conn in self._all:
+            conn.close()
+
+
+def _gpa(credits, points):
+    return points / credits if credits > 0 else 0.0
+
+
+def student_summary(conn, student_id):
+    """Cumulative GPA and per-term breakdown from the cached term totals"""
+    totals = TermTotals(conn.cursor(), student_id)
+    if not totals.terms:
+        raise ServiceError(404, f"no courses for student {student_id!r}")
+    terms = []
+    for year, semester in sorted(totals.terms, key=lambda term: term_key(*term)):
+        credits, points = totals.term(year, semester)
+        terms.append({"year": year, "semester": semester, "credits": credits,
+                      "semester_gpa": _gpa(credits, points)})
+    return {"student_id": student_id, "cumulative_gpa": _gpa(totals.credits, totals.points),
+            "total_credits": totals.credits, "terms": terms}
+
+
+def term_detail(conn, student_id, year, semester):
+    """One term's GPA and its courses, each scored under its own scale"""
+    totals = TermTotals(conn.cursor(), student_id)
+    if not totals.terms:
+        raise ServiceError(404, f"no courses for student {student_id!r}")
+    credits, points = totals.term(year, semester)
+    scales = ScaleCache(conn)
+    courses = [
+        {"course_name": course_name, "grade": grade, "credits": course_credits,
+         "quality_points": scales[scale_id].quality_points(grade, course_credits)}
+        for course_name, grade, course_credits, scale_id in conn.execute('''
+            SELECT course_name, grade, credits, scale_id FROM courses
+            WHERE student_id = ? AND year = ? AND semester = ?
+            ORDER BY date_added
+        ''', (student_id, year, semester))
+    ]
+    return {"student_id": student_id, "year": year, "semester": semester,
+            "credits": credits, "semester_gpa": _gpa(credits, points),
+            "cumulative_gpa": _gpa(totals.credits, totals.points),
+            "total_credits": totals.credits, "courses": courses}
+
+
+def save_courses(conn, student_id, year, semester, courses):
+    """Validate and upsert a term's courses; returns the number written"""
+    if not isinstance(courses, list):
+        raise ServiceError(400, '"courses" must be a list')
+    scale = active_scale(conn)
+    rows = []
+    for position, course in enumerate(courses, 1):
+        if not isinstance(course, dict):
+            raise ServiceError(400, f"course {position}: expected an object")
+        record = dict(course, student_id=student_id, year=year, semester=semester)
+        try:
+            rows.append(validate_course(record, scale.codes))
+        except ValueError as error:
+            raise ServiceError(400, f"course {position}: {error}") from None
+    try:
+        return upsert_courses(conn, rows, scale)
+    except sqlite3.OperationalError as error:
+        raise ServiceError(503, str(error)) from None
+
+
+# (method, pattern, handler name); groups are URL-decoded path segments
+ROUTES = [
+    ("GET", re.compile(r"^/health$"), "get_health"),
+    ("GET", re.compile(r"^/students/([^/]+)/gpa$"), "get_student"),
+    ("GET", re.compile(r"^/students/([^/]+)/terms/([^/]+)/([^/]+)$"), "get_term"),
+    ("PUT", re.compile(r"^/students/([^/]+)/terms/([^/]+)/([^/]+)/courses$"), "put_courses"),
+]
+
+
+class GPARequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so load tests measure requests rather than TCP handshakes
+    protocol_version = "HTTP/1.1"
+    server_version = "GPAService/1.0"
+    # Headers and body go out as separate writes; without TCP_NODELAY each
+    # keep-alive response stalls on the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def dispatch(self, method):
+        path = urlsplit(self.path).path
+        try:
+            allowed = False
+            for route_method, pattern, name in ROUTES:
+                match = pattern.match(path)
+                if match is None:
+                    continue
+                allowed = True
+                if route_method == method:
+                    args = [unquote(group) for group in match.groups()]
+                    self.send_json(200, getattr(self, name)(*args))
+                    return
+            raise ServiceError(405 if allowed else 404,
+                               "method not allowed" if allowed else "not found")
+        except ServiceError as error:
+            self.reply_error(method, error.status, str(error))
+        except sqlite3.Error as error:
+            self.reply_error(method, 500, f"database error: {error}")
+
+    def reply_error(self, method, status, message):
+        if method == "PUT":
+            # The body may be unread; don't let it leak into the next request
+            self.close_connection = True
+        self.send_json(status, {"error": message})
+
+    def read_json(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            raise ServiceError(400, "invalid Content-Length") from None
+        if length > MAX_BODY:
+            raise ServiceError(413, "request body too large")
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            raise ServiceError(400, "request body is not valid JSON") from None
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def get_health(self):
+        with self.server.pool.reader() as conn:
+            conn.execute('SELECT 1').fetchone()
+        return {"status": "ok"}
+
+    def get_student(self, student_id):
+        with self.server.pool.reader() as conn:
+            return student_summary(conn, student_id)
+
+    def get_term(self, student_id, year, semester):
+        with self.server.pool.reader() as conn:
+            return term_detail(conn, student_id, year, semester)
+
+    def put_courses(self, student_id, year, semester):
+        payload = self.read_json()
+        if not isinstance(payload, dict):
+            raise ServiceError(400, "expected a JSON object")
+        with self.server.pool.writer() as conn:
+            saved = save_courses(conn, student_id, year, semester, payload.get("courses"))
+        with self.server.pool.reader() as conn:
+            result = term_detail(conn, student_id, year, semester)
+        result["saved"] = saved
+        return result
+
+
+class GPAServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, pool, verbose=False):
+        super().__init__(address, GPARequestHandler)
+        self.pool = pool
+        self.verbose = verbose
+
+    def server_close(self):
+        super().server_close()
+        self.pool.close()
+
+
+def make_server(db_path, host="127.0.0.1", port=8080, readers=READERS, verbose=False):
+    """Create (but do not start) a server; port 0 picks a free port"""
+    return GPAServer((host, port), ConnectionPool(db_path, readers), verbose)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve GPA calculations over HTTP")
+    parser.add_argument("--db", default="data.db")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--readers", type=int, default=READERS,
+                        help="pooled read connections")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.db, args.host, args.port, args.readers, args.verbose)
+    host, port = server.server_address[:2]
+    print(f"Serving {args.db} on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,168 @@
+"""Materialized per-term GPA snapshots with running prefix sums.
+
+``term_snapshots`` stores, for every (student_id, year, semester), the term's
+own credits and quality points next to the running totals through that term
+in chronological order.  When courses in term T change, only T and the terms
+after it are rewritten, continuing from the stored prefix of the term before
+T; earlier terms and the ``courses`` table are not read again.  Existing
+``gpa_records`` rows for the rewritten terms are refreshed in the same pass,
+and the record of a term whose last course was removed is deleted, so a
+historical correction never leaves a record stale.
+"""
+from gpa.grades import term_key
+
+
+def create_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS term_snapshots (
+            student_id TEXT NOT NULL,
+            year TEXT NOT NULL,
+            semester TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            credits REAL NOT NULL,
+            quality_points REAL NOT NULL,
+            cumulative_credits REAL NOT NULL,
+            cumulative_points REAL NOT NULL,
+            PRIMARY KEY (student_id, year, semester)
+        )
+    ''')
+    # Chronological order within a student; position 0 is the first term
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_term_snapshots_position
+        ON term_snapshots (student_id, position)
+    ''')
+
+
+def _gpa(credits, points):
+    return points / credits if credits > 0 else 0.0
+
+
+def _ordered_terms(cursor, student_id):
+    cursor.execute('''
+        SELECT year, semester, credits, quality_points FROM term_totals
+        WHERE student_id = ?
+    ''', (student_id,))
+    return sorted(cursor.fetchall(), key=lambda term: term_key(term[0], term[1]))
+
+
+def _store(cursor, student_id, terms, start, credits, points):
+    """Rewrite snapshots from ``terms[start]`` on, continuing from the given prefix"""
+    cursor.execute('DELETE FROM term_snapshots WHERE student_id = ? AND position >= ?',
+                   (student_id, start))
+    snapshots = []
+    records = []
+    for position in range(start, len(terms)):
+        year, semester, term_credits, term_points = terms[position]
+        credits += term_credits
+        points += term_points
+        snapshots.append((student_id, year, semester, position, term_credits, term_points,
+                          credits, points))
+        records.append((_gpa(term_credits, term_points), _gpa(credits, points), credits,
+                        student_id, year, semester))
+    cursor.executemany('''
+        INSERT INTO term_snapshots
+        (student_id, year, semester, position, credits, quality_points,
+         cumulative_credits, cumulative_points)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', snapshots)
+    # Only terms someone already calculated have a record to correct
+    cursor.executemany('''
+        UPDATE gpa_records SET
+            semester_gpa = ?, cumulative_gpa = ?, total_credits = ?,
+            date_calculated = CURRENT_TIMESTAMP
+        WHERE student_id = ? AND year = ? AND semester = ?
+    ''', records)
+    return len(snapshots)
+
+
+def _drop_orphan_records(cursor, student_id=None):
+    """Delete gpa_records of terms that no longer have a term_totals row"""
+    query = '''
+        DELETE FROM gpa_records WHERE NOT EXISTS (
+            SELECT 1 FROM term_totals AS t
+            WHERE t.student_id = gpa_records.student_id
+              AND t.year = gpa_records.year AND t.semester = gpa_records.semester
+        )
+    '''
+    params = ()
+    if student_id is not None:
+        query += ' AND student_id = ?'
+        params = (student_id,)
+    cursor.execute(query, params)
+
+
+def refresh_snapshots(cursor, student_id, year, semester):
+    """Recompute snapshots for (year, semester) and every later term
+
+    Reads term_totals, so call it after the deltas for the change are
+    applied, inside the same transaction.  Returns the number of terms
+    rewritten.
+    """
+    terms = _ordered_terms(cursor, student_id)
+    changed = term_key(year, semester)
+    start = next((index for index, term in enumerate(terms)
+                  if term_key(term[0], term[1]) >= changed), len(terms))
+
+    credits = points = 0.0
+    if start > 0:
+        cursor.execute('''
+            SELECT year, semester, cumulative_credits, cumulative_points FROM term_snapshots
+            WHERE student_id = ? AND position = ?
+        ''', (student_id, start - 1))
+        prefix = cursor.fetchone()
+        if prefix is not None and tuple(prefix[:2]) == tuple(terms[start - 1][:2]):
+            credits, points = prefix[2], prefix[3]
+        else:
+            # The stored prefix doesn't match term_totals; rebuild this student
+            start = 0
+    _drop_orphan_records(cursor, student_id)
+    return _store(cursor, student_id, terms, start, credits, points)
+
+
+def refresh_from_deltas(cursor, deltas):
+    """Refresh each student's snapshots from their earliest changed term
+
+    ``deltas`` is keyed by (student_id, year, semester) as for apply_deltas.
+    """
+    earliest = {}
+    for student_id, year, semester in deltas:
+        current = earliest.get(student_id)
+        if current is None or term_key(year, semester) < term_key(*current):
+            earliest[student_id] = (year, semester)
+    return sum(refresh_snapshots(cursor, student_id, year, semester)
+               for student_id, (year, semester) in earliest.items())
+
+
+def rebuild_snapshots(cursor, student_id=None):
+    """Recreate snapshots (and refresh or drop gpa_records) from term_totals"""
+    query = 'SELECT student_id, year, semester, credits, quality_points FROM term_totals'
+    params = ()
+    if student_id is None:
+        cursor.execute('DELETE FROM term_snapshots')
+    else:
+        cursor.execute('DELETE FROM term_snapshots WHERE student_id = ?', (student_id,))
+        query += ' WHERE student_id = ?'
+        params = (student_id,)
+
+    by_student = {}
+    for row in cursor.execute(query, params).fetchall():
+        by_student.setdefault(row[0], []).append(row[1:])
+    _drop_orphan_records(cursor, student_id)
+    count = 0
+    for student, terms in by_student.items():
+        terms.sort(key=lambda term: term_key(term[0], term[1]))
+        count += _store(cursor, student, terms, 0, 0.0, 0.0)
+    return count
+
+
+def term_snapshot(cursor, student_id, year, semester):
+    """Return (semester_gpa, cumulative_gpa, cumulative_credits) through a term, or None"""
+    cursor.execute('''
+        SELECT credits, quality_points, cumulative_credits, cumulative_points
+        FROM term_snapshots WHERE student_id = ? AND year = ? AND semester = ?
+    ''', (student_id, year, semester))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    credits, points, cumulative_credits, cumulative_points = row
+    return _gpa(credits, points), _gpa(cumulative_credits, cumulative_points), cumulative_credits
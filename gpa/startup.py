@@ -0,0 +1,90 @@
+"""Staged application startup.
+
+The window is built and painted before the database is touched.
+``BackgroundLoader`` runs the slow part (opening the connection, applying
+any pending migrations and reading the first term) on a worker thread and
+hands the result back to the Tk thread.  Migrations are skipped by
+``migrate`` unless the schema version changed, so after the first launch
+that step is a single ``PRAGMA user_version`` read.
+
+``StartupProfile`` times each phase for ``--profile-startup``; when it is not
+enabled, recording a phase costs two ``perf_counter`` calls.
+"""
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Milliseconds between checks for the loader's result
+POLL_MS = 15
+
+
+class StartupProfile:
+    """Wall-clock phases of one launch, relative to when it was created"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        # (name, thread name, start, end) in seconds since ``started``
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, threading.current_thread().name,
+                                start - self.started, time.perf_counter() - self.started))
+
+    def mark(self, name):
+        """Record an instant, e.g. the first paint"""
+        now = time.perf_counter() - self.started
+        self.phases.append((name, threading.current_thread().name, now, now))
+
+    def report(self, out=None):
+        if not self.enabled:
+            return
+        out = out or sys.stderr
+        print("Startup profile (ms since launch):", file=out)
+        for name, thread, start, end in sorted(self.phases, key=lambda phase: phase[2]):
+            duration = f"{(end - start) * 1000:>8.1f} ms" if end > start else " " * 11
+            print(f"  {start * 1000:>8.1f} {duration}  {name} [{thread}]", file=out)
+
+
+class BackgroundLoader:
+    """Run ``load()`` on a worker thread, then ``done(result)`` on the Tk thread
+
+    An exception from ``load`` is re-raised inside a Tk callback so Tk
+    reports it like any other callback error.
+    """
+
+    def __init__(self, root, load, done, name="gpa-startup"):
+        self.root = root
+        self.done = done
+        self._results = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, args=(load,),
+                                        name=name, daemon=True)
+        self._thread.start()
+        self._poll_id = self.root.after(POLL_MS, self._poll)
+
+    def _run(self, load):
+        try:
+            self._results.put((True, load()))
+        except Exception as error:
+            self._results.put((False, error))
+
+    def _poll(self):
+        try:
+            ok, result = self._results.get_nowait()
+        except queue.Empty:
+            self._poll_id = self.root.after(POLL_MS, self._poll)
+            return
+        self._poll_id = None
+        if not ok:
+            raise result
+        self.done(result)
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
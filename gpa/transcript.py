@@ -0,0 +1,200 @@
+"""Compact in-memory transcripts for bulk analytics.
+
+``fetchall()`` materializes every course as a tuple of fresh str and float
+objects, several hundred bytes per row.  Two denser forms are offered:
+
+* ``CourseRecord`` -- a ``__slots__`` object, for a single student's few dozen rows
+* ``TranscriptColumns`` -- one ``array`` per column, with students, terms,
+  (scale, grade) pairs and optionally course names interned to integer
+  codes.  A row costs about 10-20 bytes, and GPA aggregation runs straight
+  over the columns.
+
+Columns are filled from ``courses`` in ``fetchmany`` chunks, so loading never
+holds more than one chunk of row tuples at a time.
+"""
+import sys
+from array import array
+
+from gpa.scales import ScaleCache
+
+# Rows per fetchmany while loading
+CHUNK_SIZE = 50000
+
+
+class CourseRecord:
+    """One course row without a per-instance __dict__"""
+
+    __slots__ = ("student_id", "year", "semester", "course_name", "grade", "credits",
+                 "scale_id")
+
+    def __init__(self, student_id, year, semester, course_name, grade, credits, scale_id):
+        self.student_id = student_id
+        self.year = year
+        self.semester = semester
+        self.course_name = course_name
+        self.grade = grade
+        self.credits = credits
+        self.scale_id = scale_id
+
+    def __repr__(self):
+        return (f"CourseRecord({self.student_id!r}, {self.year!r}, {self.semester!r}, "
+                f"{self.course_name!r}, {self.grade!r}, {self.credits!r}, {self.scale_id!r})")
+
+
+def _where(student_ids):
+    if not student_ids:
+        return "", ()
+    return f" WHERE student_id IN ({', '.join('?' * len(student_ids))})", tuple(student_ids)
+
+
+def load_records(conn, student_ids=None):
+    """Return CourseRecords for the given students (meant for small sets)
+
+    Repeated strings (student, term and grade) are shared between records.
+    """
+    where, params = _where(student_ids)
+    shared = {}
+    share = shared.setdefault
+    return [CourseRecord(share(student_id, student_id), share(year, year),
+                         share(semester, semester), course_name, share(grade, grade),
+                         credits, scale_id)
+            for student_id, year, semester, course_name, grade, credits, scale_id
+            in conn.execute(f'''
+                SELECT student_id, year, semester, course_name, grade, credits, scale_id
+                FROM courses{where}
+            ''', params)]
+
+
+class _Interner:
+    """Assigns dense integer codes to repeated values"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def nbytes(self):
+        return (sys.getsizeof(self.values) + sys.getsizeof(self.codes)
+                + sum(sys.getsizeof(value) for value in self.values))
+
+
+class TranscriptColumns:
+    """Column-oriented course rows backed by ``array``"""
+
+    def __init__(self, with_names=False):
+        self.student_codes = array('I')
+        self.term_codes = array('H')
+        self.grade_codes = array('H')
+        self.credits = array('d')
+        self.name_codes = array('I') if with_names else None
+        self.students = _Interner()
+        # (year, semester) pairs
+        self.terms = _Interner()
+        # (scale_id, grade) pairs; ``points`` is indexed by the same code
+        self.grades = _Interner()
+        self.points = array('d')
+        self.names = _Interner() if with_names else None
+
+    def __len__(self):
+        return len(self.credits)
+
+    def append(self, student_id, year, semester, course_name, grade, credits, scale_id):
+        self.student_codes.append(self.students.code(student_id))
+        self.term_codes.append(self.terms.code((year, semester)))
+        self.grade_codes.append(self.grades.code((scale_id, grade)))
+        self.credits.append(credits)
+        if self.name_codes is not None:
+            self.name_codes.append(self.names.code(course_name))
+
+    def resolve_points(self, conn):
+        """Look up points for (scale, grade) codes added since the last call"""
+        scales = ScaleCache(conn)
+        for scale_id, grade in self.grades.values[len(self.points):]:
+            self.points.append(scales[scale_id].points_for(grade))
+
+    def _check_points(self):
+        if len(self.points) < len(self.grades.values):
+            raise ValueError("grade points not resolved; call resolve_points(conn) first")
+
+    @classmethod
+    def load(cls, conn, student_ids=None, with_names=False, chunk_size=CHUNK_SIZE):
+        """Read ``courses`` (optionally for some students) in chunks"""
+        columns = cls(with_names)
+        where, params = _where(student_ids)
+        name_column = "course_name" if with_names else "NULL"
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT student_id, year, semester, {name_column}, grade, credits, scale_id
+            FROM courses{where}
+        ''', params)
+        append = columns.append
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                append(*row)
+        columns.resolve_points(conn)
+        return columns
+
+    def record(self, index):
+        """Rebuild row ``index`` as a CourseRecord"""
+        year, semester = self.terms.values[self.term_codes[index]]
+        scale_id, grade = self.grades.values[self.grade_codes[index]]
+        name = self.names.values[self.name_codes[index]] if self.name_codes is not None else None
+        return CourseRecord(self.students.values[self.student_codes[index]], year, semester,
+                            name, grade, self.credits[index], scale_id)
+
+    def student_totals(self):
+        """Return (credits, points) arrays indexed by student code"""
+        self._check_points()
+        count = len(self.students.values)
+        credits = array('d', bytes(8 * count))
+        points = array('d', bytes(8 * count))
+        grade_points = self.points
+        for student, grade, course_credits in zip(self.student_codes, self.grade_codes,
+                                                   self.credits):
+            credits[student] += course_credits
+            points[student] += course_credits * grade_points[grade]
+        return credits, points
+
+    def cumulative_gpa(self):
+        """Return {student_id: (cumulative_gpa, total_credits)}"""
+        credits, points = self.student_totals()
+        return {student_id: (points[code] / credits[code] if credits[code] > 0 else 0.0,
+                             credits[code])
+                for code, student_id in enumerate(self.students.values)}
+
+    def term_totals(self):
+        """Return {(student_id, year, semester): (credits, points)}"""
+        self._check_points()
+        totals = {}
+        grade_points = self.points
+        for student, term, grade, course_credits in zip(self.student_codes, self.term_codes,
+                                                         self.grade_codes, self.credits):
+            entry = totals.get((student, term))
+            if entry is None:
+                entry = totals[(student, term)] = [0.0, 0.0]
+            entry[0] += course_credits
+            entry[1] += course_credits * grade_points[grade]
+        students = self.students.values
+        terms = self.terms.values
+        return {(students[student],) + terms[term]: tuple(entry)
+                for (student, term), entry in totals.items()}
+
+    def nbytes(self):
+        """Approximate memory held by the columns and intern tables"""
+        columns = [self.student_codes, self.term_codes, self.grade_codes, self.credits,
+                   self.points]
+        interners = [self.students, self.terms, self.grades]
+        if self.name_codes is not None:
+            columns.append(self.name_codes)
+            interners.append(self.names)
+        return (sum(column.buffer_info()[1] * column.itemsize for column in columns)
+                + sum(interner.nbytes() for interner in interners))
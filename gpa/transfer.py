@@ -0,0 +1,252 @@
+"""Streaming transcript import and GPA record export.
+
+Both directions hold at most one batch in memory, report progress, and
+record a checkpoint after every committed batch so an interrupted run can
+continue where it stopped::
+
+    python -m gpa.transfer import transcripts.csv --db data.db --resume
+    python -m gpa.transfer export gpa.jsonl --db data.db
+
+CSV files need a header row.  JSON is read and written as JSON Lines (one
+object per line), which is what allows constant-memory streaming.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from gpa.db import connect, upsert_courses
+from gpa.grades import grade_points
+from gpa.migrations import migrate
+from gpa.scales import active_scale
+
+# Rows per executemany batch / fetchmany page
+CHUNK_SIZE = 10000
+
+COURSE_FIELDS = ["student_id", "year", "semester", "course_name", "grade", "credits"]
+RECORD_FIELDS = ["student_id", "year", "semester", "semester_gpa",
+                 "cumulative_gpa", "total_credits", "date_calculated"]
+
+
+class TransferError(ValueError):
+    """A source row failed validation while importing in strict mode"""
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return "jsonl" if os.path.splitext(path)[1].lower() in (".json", ".jsonl") else "csv"
+
+
+def read_records(path, fmt=None):
+    """Yield one dict per source row without loading the file"""
+    fmt = detect_format(path, fmt)
+    with open(path, newline="", encoding="utf-8") as source:
+        if fmt == "csv":
+            yield from csv.DictReader(source)
+        else:
+            for line in source:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def validate_course(record, grades=grade_points):
+    """Return a courses row tuple, or raise ValueError explaining the problem"""
+    grade = str(record.get("grade", "")).strip()
+    if grade not in grades:
+        raise ValueError(f"unknown grade {grade!r}")
+    try:
+        credits = float(record.get("credits", ""))
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid credits {record.get('credits')!r}")
+    if credits <= 0:
+        raise ValueError(f"credits must be positive, got {credits}")
+
+    values = {}
+    for field in ("year", "semester", "course_name"):
+        values[field] = str(record.get(field) or "").strip()
+        if not values[field]:
+            raise ValueError(f"missing {field}")
+    student_id = str(record.get("student_id") or "default_student").strip()
+    return (student_id, values["year"], values["semester"], values["course_name"],
+            grade, credits)
+
+
+def load_checkpoint(conn, name):
+    row = conn.execute('SELECT position FROM transfer_checkpoints WHERE name = ?',
+                       (name,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def save_checkpoint(conn, name, position):
+    """Record progress; runs inside the caller's transaction"""
+    conn.execute('''
+        INSERT INTO transfer_checkpoints (name, position) VALUES (?, ?)
+        ON CONFLICT (name) DO UPDATE SET
+            position = excluded.position,
+            updated_at = CURRENT_TIMESTAMP
+    ''', (name, json.dumps(position)))
+
+
+def clear_checkpoint(conn, name):
+    conn.execute('DELETE FROM transfer_checkpoints WHERE name = ?', (name,))
+    conn.commit()
+
+
+def import_courses(conn, path, fmt=None, chunk_size=CHUNK_SIZE, resume=False,
+                   strict=False, progress=None):
+    """Stream a CSV/JSONL transcript into courses in chunked transactions
+
+    Returns a dict with ``rows`` (imported), ``skipped`` (resumed past),
+    ``rejected`` and the first few ``errors``.
+    """
+    name = "import:" + os.path.abspath(path)
+    start_at = 0
+    if resume:
+        checkpoint = load_checkpoint(conn, name)
+        start_at = checkpoint["records"] if checkpoint else 0
+
+    # Grades are checked against, and recorded under, the active scale
+    scale = active_scale(conn)
+    stats = {"rows": 0, "skipped": start_at, "rejected": 0, "errors": []}
+    started = time.perf_counter()
+    position = 0
+    batch = []
+
+    def flush():
+        # The checkpoint write opens the transaction that upsert_courses
+        # commits, so rows and resume point land together
+        save_checkpoint(conn, name, {"records": position})
+        stats["rows"] += upsert_courses(conn, batch, scale)
+        batch.clear()
+        if progress is not None:
+            progress(stats["rows"], time.perf_counter() - started)
+
+    for record in read_records(path, fmt):
+        position += 1
+        if position <= start_at:
+            continue
+        try:
+            batch.append(validate_course(record, scale.codes))
+        except ValueError as error:
+            if strict:
+                raise TransferError(f"{path}: record {position}: {error}") from None
+            stats["rejected"] += 1
+            if len(stats["errors"]) < 20:
+                stats["errors"].append(f"record {position}: {error}")
+            continue
+        if len(batch) >= chunk_size:
+            flush()
+    if batch:
+        flush()
+
+    clear_checkpoint(conn, name)
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def export_gpa_records(conn, path, fmt=None, chunk_size=CHUNK_SIZE, resume=False,
+                       progress=None):
+    """Stream gpa_records to CSV/JSONL ordered by (student_id, year, semester)
+
+    With ``resume`` the file is appended to, starting after the last key
+    written by the interrupted run.  Returns the number of rows written.
+    """
+    fmt = detect_format(path, fmt)
+    name = "export:" + os.path.abspath(path)
+    last_key = load_checkpoint(conn, name) if resume else None
+    append = last_key is not None and os.path.exists(path)
+
+    query = 'SELECT ' + ', '.join(RECORD_FIELDS) + ' FROM gpa_records'
+    params = ()
+    if append:
+        # Keyset continuation over the unique (student_id, year, semester) index
+        query += ' WHERE (student_id, year, semester) > (?, ?, ?)'
+        params = tuple(last_key)
+    query += ' ORDER BY student_id, year, semester'
+
+    started = time.perf_counter()
+    count = 0
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+
+    with open(path, "a" if append else "w", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out) if fmt == "csv" else None
+        if writer is not None and not append:
+            writer.writerow(RECORD_FIELDS)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                if writer is not None:
+                    writer.writerow(row)
+                else:
+                    out.write(json.dumps(dict(zip(RECORD_FIELDS, row))) + "\n")
+            out.flush()
+            count += len(rows)
+            save_checkpoint(conn, name, list(rows[-1][:3]))
+            conn.commit()
+            if progress is not None:
+                progress(count, time.perf_counter() - started)
+
+    clear_checkpoint(conn, name)
+    return count
+
+
+def print_progress(count, elapsed):
+    rate = count / elapsed if elapsed > 0 else 0
+    print(f"\r{count:,} rows ({rate:,.0f} rows/sec)", end="", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream transcripts in and GPA records out")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="load courses from CSV/JSONL")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--strict", action="store_true",
+                               help="stop at the first invalid row")
+
+    export_parser = subparsers.add_parser("export", help="write gpa_records to CSV/JSONL")
+    export_parser.add_argument("path")
+
+    for sub in (import_parser, export_parser):
+        sub.add_argument("--db", default="data.db")
+        sub.add_argument("--format", choices=["csv", "jsonl"], default=None)
+        sub.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        sub.add_argument("--resume", action="store_true",
+                         help="continue from the last checkpoint for this file")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    migrate(conn)
+    try:
+        if args.command == "import":
+            try:
+                stats = import_courses(conn, args.path, args.format, args.chunk_size,
+                                       args.resume, args.strict, print_progress)
+            except TransferError as error:
+                print(f"\nImport stopped: {error}", file=sys.stderr)
+                return 1
+            print(file=sys.stderr)
+            for message in stats["errors"]:
+                print(f"Rejected {message}", file=sys.stderr)
+            print(f"Imported {stats['rows']:,} rows, rejected {stats['rejected']:,}, "
+                  f"resumed past {stats['skipped']:,} in {stats['seconds']:.1f}s")
+        else:
+            started = time.perf_counter()
+            count = export_gpa_records(conn, args.path, args.format, args.chunk_size,
+                                       args.resume, print_progress)
+            print(file=sys.stderr)
+            print(f"Exported {count:,} gpa_records in {time.perf_counter() - started:.1f}s")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
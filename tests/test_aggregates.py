@@ -0,0 +1,86 @@
+"""term_totals kept in step with courses by the write paths"""
+import random
+import sqlite3
+import unittest
+
+from gpa.aggregates import TOLERANCE, check_totals, compute_totals, rebuild_totals
+from gpa.db import delete_courses, upsert_courses
+from gpa.grades import grade_points
+from gpa.migrations import migrate
+from gpa.scales import create_scale_version
+
+STUDENTS = ["student_a", "student_b", "student_c"]
+TERMS = [("Year 1", "Semester 1"), ("Year 1", "Semester 2"), ("Year 2", "Summer")]
+COURSES = ["Algebra", "Biology", "Chemistry"]
+
+
+class TermTotalsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        migrate(self.conn)
+        self.cursor = self.conn.cursor()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def stored(self):
+        return {row[:3]: row[3:] for row in self.cursor.execute(
+            'SELECT student_id, year, semester, credits, quality_points FROM term_totals')}
+
+    def test_no_drift_after_random_upserts_and_deletes(self):
+        rng = random.Random(5)
+        for step in range(300):
+            if step == 150:
+                # Later rows are scored under a second scale version
+                create_scale_version(self.conn, "Standard", dict(grade_points, **{"B": 3.2}))
+            rows = [(rng.choice(STUDENTS),) + rng.choice(TERMS) + (rng.choice(COURSES),)
+                    for _ in range(rng.randint(1, 4))]
+            if rng.random() < 0.3:
+                delete_courses(self.conn, rows)
+            else:
+                upsert_courses(self.conn, [row + (rng.choice(list(grade_points)),
+                                                  rng.choice([0.5, 1.0, 3.0, 4.0]))
+                                           for row in rows])
+            self.assertEqual(check_totals(self.cursor), [], f"after step {step}")
+
+    def test_emptied_term_has_no_row(self):
+        upsert_courses(self.conn, [("student_a", "Year 1", "Semester 1", "Algebra", "A", 3.0),
+                                   ("student_a", "Year 1", "Semester 2", "Biology", "B", 1.1),
+                                   ("student_a", "Year 1", "Semester 2", "Chemistry", "C", 2.2)])
+        delete_courses(self.conn, [("student_a", "Year 1", "Semester 2", "Biology"),
+                                   ("student_a", "Year 1", "Semester 2", "Chemistry")])
+        self.assertEqual(list(self.stored()), [("student_a", "Year 1", "Semester 1")])
+        self.assertEqual(check_totals(self.cursor), [])
+
+    def test_check_reports_and_repairs_drift(self):
+        upsert_courses(self.conn, [("student_a", "Year 1", "Semester 1", "Algebra", "A", 3.0)])
+        self.cursor.execute("UPDATE term_totals SET quality_points = quality_points + 1")
+        self.cursor.execute('''
+            INSERT INTO term_totals (student_id, year, semester, credits, quality_points)
+            VALUES ('student_b', 'Year 1', 'Semester 1', 0, 0)
+        ''')
+        self.assertEqual(check_totals(self.cursor, repair=True),
+                         [("student_a", "Year 1", "Semester 1"),
+                          ("student_b", "Year 1", "Semester 1")])
+        self.assertEqual(check_totals(self.cursor), [])
+        self.assertEqual(list(self.stored()), [("student_a", "Year 1", "Semester 1")])
+
+    def test_rebuild_matches_incremental_totals(self):
+        rng = random.Random(6)
+        for _ in range(50):
+            upsert_courses(self.conn, [(rng.choice(STUDENTS),) + rng.choice(TERMS)
+                                       + (rng.choice(COURSES), rng.choice(list(grade_points)),
+                                          rng.choice([1.0, 3.0]))])
+        incremental = self.stored()
+        rebuild_totals(self.cursor)
+        rebuilt = self.stored()
+        self.assertEqual(set(incremental), set(rebuilt))
+        for key, (credits, points) in rebuilt.items():
+            self.assertLess(abs(incremental[key][0] - credits), TOLERANCE)
+            self.assertLess(abs(incremental[key][1] - points), TOLERANCE)
+        self.assertEqual(set(compute_totals(self.cursor)), set(rebuilt))
+
+
+if __name__ == "__main__":
+    unittest.main()
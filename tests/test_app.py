@@ -0,0 +1,66 @@
+"""Live GPA labels of the app (against benchmarks.tkstub) before and after saving"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks import tkstub
+from benchmarks.bench_app import load_app_module, wait_until_ready
+from gpa.profiles import SingleFileStore
+
+
+class LiveGpaTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.module = load_app_module()
+        cls.module.messagebox.showinfo = lambda *args, **kwargs: None
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="gpa_app_test_")
+        store = SingleFileStore(os.path.join(self.directory, "data.db"))
+        self.app = self.module.GPACalculator(self.module.tk.Tk(), store=store, maintenance=False)
+        wait_until_ready(self.app)
+        self.app.course_grid.set_rows([("Math", "A", "3"), ("Phys", "F", "3")])
+        self.app.save_data()
+        tkstub.run_pending()
+
+    def tearDown(self):
+        self.app.recalc.close()
+        self.app.conn.close()
+        shutil.rmtree(self.directory)
+
+    def live_summary(self):
+        """(semester GPA, cumulative GPA) as the next debounced update shows them"""
+        summary = self.app.compute_gpa_summary(self.app.conn, self.app.snapshot_gpa_inputs())
+        return round(summary[0], 6), round(summary[1], 6)
+
+    def saved_summary(self):
+        self.app.save_data()
+        tkstub.run_pending()
+        return self.live_summary()
+
+    def test_saved_rows(self):
+        self.assertEqual(self.live_summary(), (2.0, 2.0))
+
+    def test_delete_then_recalculate(self):
+        self.app.course_grid.delete(1)
+        self.assertEqual(self.live_summary(), (4.0, 4.0))
+        self.assertEqual(self.saved_summary(), (4.0, 4.0))
+        self.assertEqual(self.app.totals.credits, 3.0)
+
+    def test_rename_then_recalculate(self):
+        self.app.course_grid.set_row(1, ("Physics", "F", "3"))
+        self.assertEqual(self.live_summary(), (2.0, 2.0))
+        self.assertEqual(self.saved_summary(), (2.0, 2.0))
+        self.assertEqual(self.app.totals.credits, 6.0)
+
+    def test_incomplete_row_keeps_its_saved_course(self):
+        # save_data neither rewrites nor deletes a named row with bad credits
+        self.app.course_grid.set_row(1, ("Phys", "F", "x"))
+        self.assertEqual(self.live_summary(), (4.0, 2.0))
+        self.assertEqual(self.saved_summary(), (4.0, 2.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
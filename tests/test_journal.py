@@ -0,0 +1,85 @@
+"""Point-in-time transcripts rebuilt from the course journal"""
+import random
+import sqlite3
+import unittest
+from unittest import mock
+
+from gpa import journal
+from gpa.db import delete_courses, upsert_courses
+from gpa.grades import grade_points, term_key
+from gpa.migrations import migrate
+
+STUDENTS = ["student_a", "student_b"]
+TERMS = [("Year 1", "Semester 1"), ("Year 1", "Semester 2"), ("Year 2", "Semester 1")]
+COURSES = ["Algebra", "Biology", "Chemistry", "Drawing"]
+
+
+def live_transcript(cursor, student_id):
+    cursor.execute('''
+        SELECT year, semester, course_name, grade, credits, scale_id FROM courses
+        WHERE student_id = ?
+    ''', (student_id,))
+    return sorted(cursor.fetchall(), key=lambda row: (term_key(row[0], row[1]), row[2]))
+
+
+class TranscriptAtTest(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        migrate(self.conn)
+        self.cursor = self.conn.cursor()
+
+    def tearDown(self):
+        self.conn.close()
+
+    def random_changes(self, rng, count):
+        """Apply random adds, edits, regrades and deletes; returns [(student, seq, transcript)]"""
+        states = []
+        for _ in range(count):
+            student_id = rng.choice(STUDENTS)
+            year, semester = rng.choice(TERMS)
+            course_name = rng.choice(COURSES)
+            if rng.random() < 0.25:
+                delete_courses(self.conn, [(student_id, year, semester, course_name)])
+            else:
+                upsert_courses(self.conn, [(student_id, year, semester, course_name,
+                                            rng.choice(list(grade_points)),
+                                            float(rng.choice([1, 3, 4])))])
+            states.append((student_id, journal.latest_seq(self.cursor, student_id),
+                           live_transcript(self.cursor, student_id)))
+        return states
+
+    def assert_states_replay(self, states):
+        for student_id, seq, expected in states:
+            self.assertEqual(journal.transcript_at(self.cursor, student_id, seq), expected,
+                             f"{student_id} at journal entry {seq}")
+
+    def test_replays_every_state_without_checkpoints(self):
+        states = self.random_changes(random.Random(1), 120)
+        self.assertEqual(self.cursor.execute(
+            'SELECT COUNT(*) FROM journal_checkpoints').fetchone()[0], 0)
+        self.assert_states_replay(states)
+
+    def test_replays_forward_and_backward_from_checkpoints(self):
+        with mock.patch.object(journal, "CHECKPOINT_INTERVAL", 7):
+            states = self.random_changes(random.Random(2), 200)
+        self.assertGreater(self.cursor.execute(
+            'SELECT COUNT(*) FROM journal_checkpoints').fetchone()[0], 10)
+        # Entries just after a checkpoint replay forward from it; those
+        # near the head replay backward from the live rows
+        self.assert_states_replay(states)
+
+    def test_latest_transcript_matches_live_rows(self):
+        self.random_changes(random.Random(3), 60)
+        for student_id in STUDENTS:
+            self.assertEqual(journal.transcript_at(self.cursor, student_id),
+                             live_transcript(self.cursor, student_id))
+
+    def test_before_first_entry_is_empty(self):
+        self.random_changes(random.Random(4), 20)
+        for student_id in STUDENTS:
+            self.assertEqual(journal.transcript_at(self.cursor, student_id, 0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Target-GPA planner against brute force over every grade combination"""
+import itertools
+import os
+import random
+import subprocess
+import sys
+import unittest
+
+from gpa.grades import grade_points
+from gpa.planner import plan_grades
+from gpa.scales import GradingScale
+
+SCALE = GradingScale(1, "Standard", 1, list(grade_points.items()))
+
+
+def cheapest_points(current_credits, current_points, credits, target):
+    """Fewest quality points over every grade combination reaching ``target``, or None"""
+    required = target * (current_credits + sum(credits)) - current_points
+    best = None
+    for grades in itertools.product(SCALE.grades, repeat=len(credits)):
+        points = sum(SCALE.quality_points(grade, value) for grade, value in zip(grades, credits))
+        if points >= required - 1e-9 and (best is None or points < best):
+            best = points
+    return best
+
+
+class PlanGradesTest(unittest.TestCase):
+
+    def check(self, current_credits, current_points, credits, target):
+        courses = [(f"Course {index}", value) for index, value in enumerate(credits, 1)]
+        plan = plan_grades(current_credits, current_points, courses, target, SCALE)
+        expected = cheapest_points(current_credits, current_points, credits, target)
+        case = (current_credits, current_points, credits, target)
+        if expected is None:
+            self.assertIsNone(plan, case)
+            return
+        self.assertIsNotNone(plan, case)
+        self.assertEqual([(name, value) for name, value, _ in plan.assignments], courses)
+        points = sum(SCALE.quality_points(grade, value) for _, value, grade in plan.assignments)
+        self.assertAlmostEqual(points, expected, places=9, msg=case)
+        # The reported GPA is the one the chosen grades actually give
+        total_credits = current_credits + sum(credits)
+        self.assertAlmostEqual(plan.cumulative_gpa, (current_points + points) / total_credits,
+                               places=12, msg=case)
+        self.assertGreaterEqual(plan.cumulative_gpa, target - 1e-9, case)
+
+    def test_matches_brute_force_on_small_inputs(self):
+        rng = random.Random(7)
+        for _ in range(150):
+            current_credits = float(rng.choice([0, 15, 30, 60]))
+            current_points = round(current_credits * rng.uniform(1.5, 4.0), 2)
+            credits = [rng.choice([1.0, 1.5, 2.0, 3.0, 4.0]) for _ in range(rng.randint(1, 3))]
+            target = round(rng.uniform(1.0, 4.0), 2)
+            self.check(current_credits, current_points, credits, target)
+
+    def test_out_of_reach(self):
+        self.assertIsNone(plan_grades(60, 60.0, [("Thesis", 3)], 3.9, SCALE))
+
+    def test_already_reached_needs_only_the_lowest_grades(self):
+        plan = plan_grades(30, 120.0, [("Elective", 3)], 2.0, SCALE)
+        self.assertEqual(plan.assignments, [("Elective", 3.0, "F")])
+
+    def test_rounding_never_undershoots_the_target(self):
+        # A- over 2.67 credits is 9.879 points; rounded to 9.88 it would
+        # wrongly clear a requirement of 9.8795
+        plan = plan_grades(0, 0.0, [("Lab", 2.67)], 3.7002, SCALE)
+        self.assertEqual(plan.assignments, [("Lab", 2.67, "A")])
+        self.check(0, 0.0, [2.67], 3.7002)
+
+    def test_fractional_credits_reach_the_target_with_exact_points(self):
+        rng = random.Random(11)
+        for _ in range(100):
+            credits = [rng.choice([0.33, 1.33, 2.67, 3.0]) for _ in range(rng.randint(1, 3))]
+            target = round(rng.uniform(1.0, 3.9), 2)
+            courses = [(f"Course {index}", value) for index, value in enumerate(credits, 1)]
+            plan = plan_grades(12.0, 36.0, courses, target, SCALE)
+            if plan is None:
+                continue
+            points = sum(SCALE.quality_points(grade, value)
+                         for _, value, grade in plan.assignments)
+            gpa = (36.0 + points) / (12.0 + sum(credits))
+            self.assertAlmostEqual(plan.cumulative_gpa, gpa, places=12)
+            self.assertGreaterEqual(gpa, target - 1e-9, (credits, target))
+
+    def test_command_line_planner_does_not_need_tk(self):
+        code = "import sys; sys.modules['tkinter'] = None; import gpa.planner"
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        subprocess.run([sys.executable, "-c", code], cwd=root, check=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
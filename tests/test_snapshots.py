@@ -0,0 +1,112 @@
+"""Incrementally refreshed term snapshots against a full rebuild"""
+import sqlite3
+import unittest
+
+from gpa.db import delete_courses, upsert_courses
+from gpa.engine import recompute
+from gpa.migrations import migrate
+from gpa.snapshots import rebuild_snapshots, term_snapshot
+
+STUDENT = "student_a"
+TERMS = [("Year 1", "Semester 1"), ("Year 1", "Semester 2"), ("Year 1", "Summer"),
+         ("Year 2", "Semester 1"), ("Year 2", "Semester 2")]
+
+
+class SnapshotRefreshTest(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        migrate(self.conn)
+        self.cursor = self.conn.cursor()
+        rows = []
+        for index, (year, semester) in enumerate(TERMS):
+            rows.append((STUDENT, year, semester, "Core", "B+", 3.0))
+            rows.append((STUDENT, year, semester, "Elective", ["A", "C", "B-"][index % 3], 4.0))
+            rows.append(("student_b", year, semester, "Core", "A-", 3.0))
+        upsert_courses(self.conn, rows)
+        # gpa_records exist for every term, so refreshes have records to correct
+        recompute(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def stored(self):
+        snapshots = self.cursor.execute('''
+            SELECT student_id, year, semester, position, credits, quality_points,
+                   cumulative_credits, cumulative_points
+            FROM term_snapshots ORDER BY student_id, position
+        ''').fetchall()
+        records = self.cursor.execute('''
+            SELECT student_id, year, semester, semester_gpa, cumulative_gpa, total_credits
+            FROM gpa_records ORDER BY student_id, year, semester
+        ''').fetchall()
+        return snapshots, records
+
+    def record(self, student_id, year, semester):
+        """(semester_gpa, cumulative_gpa, total_credits) of a gpa_records row, or None"""
+        return self.cursor.execute('''
+            SELECT semester_gpa, cumulative_gpa, total_credits FROM gpa_records
+            WHERE student_id = ? AND year = ? AND semester = ?
+        ''', (student_id, year, semester)).fetchone()
+
+    def assert_matches_rebuild(self):
+        incremental = self.stored()
+        rebuild_snapshots(self.cursor)
+        rebuilt = self.stored()
+        for got_rows, want_rows in zip(incremental, rebuilt):
+            self.assertEqual(len(got_rows), len(want_rows))
+            for got, want in zip(got_rows, want_rows):
+                self.assertEqual(got[:3], want[:3])
+                for got_value, want_value in zip(got[3:], want[3:]):
+                    self.assertAlmostEqual(got_value, want_value, places=9, msg=got[:3])
+
+    def test_regrade_in_an_earlier_term(self):
+        upsert_courses(self.conn, [(STUDENT, "Year 1", "Semester 2", "Core", "D", 3.0)])
+        self.assert_matches_rebuild()
+
+    def test_credit_change_in_the_first_term(self):
+        upsert_courses(self.conn, [(STUDENT, "Year 1", "Semester 1", "Elective", "A", 1.0)])
+        self.assert_matches_rebuild()
+
+    def test_new_term_inserted_before_later_terms(self):
+        upsert_courses(self.conn, [(STUDENT, "Year 3", "Semester 1", "Thesis", "A", 6.0)])
+        upsert_courses(self.conn, [(STUDENT, "Year 1", "Summer", "Lab", "B", 2.0),
+                                   (STUDENT, "Year 2", "Summer", "Lab", "C+", 2.0)])
+        self.assert_matches_rebuild()
+
+    def test_earlier_term_emptied(self):
+        delete_courses(self.conn, [(STUDENT, "Year 1", "Semester 2", "Core"),
+                                   (STUDENT, "Year 1", "Semester 2", "Elective")])
+        self.assertIsNone(term_snapshot(self.cursor, STUDENT, "Year 1", "Semester 2"))
+        # The emptied term's record goes; other students' records stay
+        self.assertIsNone(self.record(STUDENT, "Year 1", "Semester 2"))
+        self.assertIsNotNone(self.record("student_b", "Year 1", "Semester 2"))
+        self.assert_matches_rebuild()
+
+    def test_emptied_term_record_is_dropped_and_later_records_follow(self):
+        self.conn.close()
+        self.conn = sqlite3.connect(":memory:")
+        migrate(self.conn)
+        self.cursor = self.conn.cursor()
+        upsert_courses(self.conn, [(STUDENT, "Year 1", "Semester 1", "Math", "A", 3.0),
+                                   (STUDENT, "Year 1", "Semester 2", "Phys", "F", 3.0),
+                                   (STUDENT, "Year 2", "Semester 1", "Chem", "A", 3.0)])
+        recompute(self.conn)
+        self.assertEqual(self.record(STUDENT, "Year 1", "Semester 2"), (0.0, 2.0, 6.0))
+
+        delete_courses(self.conn, [(STUDENT, "Year 1", "Semester 2", "Phys")])
+        self.assertIsNone(self.record(STUDENT, "Year 1", "Semester 2"))
+        self.assertEqual(self.record(STUDENT, "Year 2", "Semester 1"), (4.0, 4.0, 6.0))
+        self.assert_matches_rebuild()
+
+    def test_later_cumulative_gpa_follows_earlier_edit(self):
+        before = term_snapshot(self.cursor, STUDENT, "Year 2", "Semester 2")
+        upsert_courses(self.conn, [(STUDENT, "Year 1", "Semester 1", "Core", "F", 3.0)])
+        after = term_snapshot(self.cursor, STUDENT, "Year 2", "Semester 2")
+        self.assertEqual(after[0], before[0])
+        self.assertLess(after[1], before[1])
+        self.assert_matches_rebuild()
+
+
+if __name__ == "__main__":
+    unittest.main()